@@ -1,13 +1,37 @@
+import time
+# Timed so the startup profile shows what a cold process pays for imports
+IMPORT_START = time.perf_counter()
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
-import time
-import ta
+import re
 from typing import Dict, Optional
-import requests
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
+import uuid
+import os
+from terminal.backtest import DEFAULT_FEE_BPS, equity_curve, summarize
+from terminal.barstore import BarStore
+from terminal.cache import SharedCache
+from terminal.calendars import calendar_for
+from terminal.charts import build_forecast_figure, build_price_figure, line_chart_data, line_chart_spec, visible_window
+from terminal.columnar import BufferPool
+from terminal.data import date_range_key, load_market_overview, load_price_data, load_shared_price_data
+from terminal.downsample import DEFAULT_POINT_BUDGET
+from terminal.fundamentals import INTRADAY_TTL, FundamentalsPrefetcher, FundamentalsStore
+from terminal.indicators import MAX_WINDOW, IndicatorEngine
+from terminal.jobs import Job, JobExecutor, submit_backtest, submit_forecast, submit_prediction, submit_snapshot
+from terminal.metrics import TRACE_PATH, Metrics
+from terminal.prediction import ModelCache
+from terminal.profiling import Profiler
+from terminal.providers import CountingProvider, provider_from_env
+from terminal.pyramid import BarPyramid
+from terminal.quotes import QuoteTable
+from terminal.scheduler import RefreshScheduler
+from terminal.screener import DEFAULT_QUERY, PricePanel, load_histories, screen
+from terminal.store import DATA_DIR, HistoryStore
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
 
 # Page Configuration Settings
 st.set_page_config(
@@ -22,6 +46,28 @@ st.set_page_config(
     }
 )
 
+@st.cache_resource
+def get_metrics():
+    """Process-wide stage timings and upstream traffic, traced to ML_TERMINAL_TRACE if set"""
+    return Metrics(TRACE_PATH)
+
+@st.cache_resource
+def get_profiler():
+    """Process-wide startup and rerun timings, published to data/profile.json"""
+    # Resolved when a run starts, on the script thread
+    return Profiler(calls=lambda: get_provider().calls, on_run=get_metrics().record_run)
+
+get_profiler().record_import("Home.py imports", IMPORT_SECONDS)
+
+@st.cache_resource
+def page_css() -> str:
+    """Theme stylesheet, read from assets/theme.css once per process"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "theme.css")) as f:
+        return f"<style>\n{f.read()}</style>"
+
+# One style block before any content, so nothing renders unstyled first
+st.markdown(page_css(), unsafe_allow_html=True)
+
 # Define common stock categories and symbols for quick access
 # Update COMMON_STOCKS to include Indian stocks
 COMMON_STOCKS = {
@@ -34,27 +80,6 @@ COMMON_STOCKS = {
     "Indian Banks": ["HDFCBANK.NS", "SBIN.NS", "ICICIBANK.NS", "AXISBANK.NS", "KOTAKBANK.NS"]
 }
 
-# Add this CSS for loading animation
-st.markdown("""
-    <style>
-    /* Loading Animation */
-    .loading-spinner {
-        width: 40px;
-        height: 40px;
-        border: 4px solid #f3f3f3;
-        border-top: 4px solid #64ffda;
-        border-radius: 50%;
-        animation: spin 1s linear infinite;
-        margin: 20px auto;
-    }
-
-    @keyframes spin {
-        0% { transform: rotate(0deg); }
-        100% { transform: rotate(360deg); }
-    }
-    </style>
-""", unsafe_allow_html=True)
-
 # Update the MARKET_INDICES dictionary
 MARKET_INDICES = {
     "US Markets": [
@@ -77,168 +102,242 @@ MARKET_INDICES = {
 # Update the fetch_market_overview function to handle Indian market data
 def fetch_market_overview():
     """Fetch real-time market data for overview section"""
-    market_data = {}
-    
-    for category, symbols in MARKET_INDICES.items():
-        market_data[category] = []
-        for item in symbols:
-            try:
-                ticker = yf.Ticker(item["symbol"])
-                info = ticker.fast_info
-                current_price = info.last_price if hasattr(info, 'last_price') else 0
-                prev_close = info.previous_close if hasattr(info, 'previous_close') else 0
-                change = ((current_price - prev_close) / prev_close) * 100 if prev_close != 0 else 0
-                
-                # Format price based on market type
-                if "Indian Markets" in category:
-                    price_str = f"₹{current_price:,.2f}"
-                else:
-                    price_str = f"${current_price:,.2f}"
-                
-                market_data[category].append({
-                    "name": item["name"],
-                    "price": price_str,
-                    "change": change,
-                    "raw_price": current_price  # Keep raw price for sorting if needed
-                })
-            except Exception:
-                continue
-    
-    return market_data
-
-def fetch_stock_data(symbol: str):
-    """Fetches comprehensive stock data for a given symbol"""
-    with st.spinner('Loading stock data...'):
-        try:
-            ticker = yf.Ticker(symbol)
-            history = ticker.history(period="1y")
+    return load_market_overview(MARKET_INDICES, cached_quote_fetcher())
 
-            if history.empty:
-                st.error("No price data available")
-                return None
+@st.cache_resource
+def get_provider():
+    """Market data provider selected by the ML_TERMINAL_PROVIDER environment variable"""
+    # Counted and timed so the profile and metrics show every upstream call
+    return CountingProvider(provider_from_env(), observe=get_metrics().observe_call)
 
-            current_price = float(history['Close'].iloc[-1])
-            
-            with st.spinner('Fetching company information...'):
-                info = ticker.info
+@st.cache_resource
+def get_history_store():
+    """Process-wide OHLCV store shared by every session and rerun"""
+    return HistoryStore()
 
-            # Get earnings data
-            with st.spinner('Loading financial data...'):
-                try:
-                    income_stmt = ticker.income_stmt
-                    if income_stmt is not None and not income_stmt.empty:
-                        # Extract quarterly data
-                        quarterly_data = {
-                            'Revenue': income_stmt.loc['Total Revenue'].iloc[:4],
-                            'Earnings': income_stmt.loc['Net Income'].iloc[:4]
-                        }
-                        earnings_df = pd.DataFrame(quarterly_data)
-                        has_earnings = True
-                    else:
-                        earnings_df = None
-                        has_earnings = False
-                except:
-                    earnings_df = None
-                    has_earnings = False
+# Seconds a cached quote or stock data bundle is served before refetching
+QUOTE_TTL = 15
+STOCK_DATA_TTL = 60
+SCREENER_TTL = 300
+
+# Seconds a finished analytics job result is served from the shared cache. Their
+# keys include the data version, so these only bound how long memory is held
+BACKTEST_TTL = 1800
+PREDICTION_TTL = 3600
+FORECAST_TTL = 900
+
+# Bars loaded before the sidebar start date so SMA_200 is defined from the first shown bar
+WARMUP_BARS = MAX_WINDOW
+
+# Years of history before the displayed range the prediction models train on
+PREDICTION_TRAIN_YEARS = 3
+
+# Seconds between progress updates of a running pool job
+JOB_POLL_SECONDS = 0.5
+
+@st.cache_resource
+def get_shared_cache():
+    """Process-wide quote and history cache shared by every session"""
+    return SharedCache(maxsize=512)
+
+def cached_quote_fetcher():
+    """Returns a quote fetcher backed by the shared cache, for use with fetch_quotes"""
+    # Resolve these on the script thread, fetch_quotes calls this from workers
+    cache = get_shared_cache()
+    provider = get_provider()
+
+    def fetch_quote(symbol: str):
+        return cache.get_or_fetch(
+            (symbol.upper(), "quote", "fast"),
+            lambda: provider.quote(symbol),
+            ttl=QUOTE_TTL
+        )
 
+    return fetch_quote
+
+def fetch_stock_data(symbol: str, start_date=None, end_date=None):
+    """
+    Fetches price history for a given symbol and sidebar date range
+    
+    Company info and statements are only started here and load in the
+    background, see await_fundamentals.
+    """
+    with st.spinner('Loading stock data...'), get_metrics().stage("stock data", symbol):
+        try:
+            # Sessions opening the same symbol and range share one cached or in-flight load
+            data = get_shared_cache().get_or_fetch(
+                (symbol.upper(), "stock", date_range_key(start_date, end_date)),
+                partial(
+                    load_shared_price_data, symbol, start_date, end_date,
+                    get_provider(), get_history_store(), get_buffer_pool(), get_bar_pyramid(), WARMUP_BARS
+                ),
+                ttl=STOCK_DATA_TTL
+            )
+            if data is None:
+                st.error("No price data available")
+                return None
+
+            request_fundamentals(symbol, last_close(data))
             st.success('Data loaded successfully!')
-            return {
-                'symbol': symbol,
-                'price': current_price,
-                'name': info.get('longName', symbol),
-                'history': history,
-                'info': info,
-                'earnings': earnings_df,
-                'has_earnings': has_earnings
-            }
+            return data
 
         except Exception as e:
             st.error(f"Error fetching data: {str(e)}")
             return None
 
-def fetch_market_overview():
-    """Fetch real-time market data for overview section"""
-    market_data = {}
-    
-    for category, symbols in MARKET_INDICES.items():
-        market_data[category] = []
-        for item in symbols:
-            try:
-                ticker = yf.Ticker(item["symbol"])
-                info = ticker.fast_info
-                current_price = info.last_price if hasattr(info, 'last_price') else 0
-                prev_close = info.previous_close if hasattr(info, 'previous_close') else 0
-                change = ((current_price - prev_close) / prev_close) * 100 if prev_close != 0 else 0
-                
-                # Format price based on market type
-                if "Indian Markets" in category:
-                    price_str = f"₹{current_price:,.2f}"
-                else:
-                    price_str = f"${current_price:,.2f}"
-                
-                market_data[category].append({
-                    "name": item["name"],
-                    "price": price_str,
-                    "change": change,
-                    "raw_price": current_price  # Keep raw price for sorting if needed
-                })
-            except Exception:
-                continue
+@st.cache_resource
+def get_background_executor():
+    """Threads loading company info while the script renders the price chart"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="fundamentals")
+
+@st.cache_resource
+def get_fundamentals_store():
+    """Process-wide company info and statements, kept on disk with per-field TTLs"""
+    return FundamentalsStore()
+
+@st.cache_resource
+def get_fundamentals_prefetcher():
+    """Refreshes the popular stocks' and every watchlist's fundamentals while markets are closed"""
+    prefetcher = FundamentalsPrefetcher(
+        get_fundamentals_store(), get_provider(),
+        [s for stocks in COMMON_STOCKS.values() for s in stocks]
+    )
+    prefetcher.start()
+    return prefetcher
+
+def last_close(data: dict) -> Optional[float]:
+    """Latest close of a loaded stock data bundle, None without bars"""
+    history = data.get('history')
+    return None if history is None or history.empty else float(history['Close'].iloc[-1])
+
+def request_fundamentals(symbol: str, price: Optional[float] = None) -> Future:
+    """
+    Starts loading company info and earnings for a symbol in the background
+    
+    Served from the fundamentals store, which only goes upstream for stale
+    fields; the market cap is repriced to `price` once it is intraday-stale.
+    """
+    # Reuse a load still in flight; finished ones are served from the shared cache
+    pending = st.session_state.get('fundamentals')
+    if pending is not None and pending[0] == symbol.upper() and not pending[1].done():
+        return pending[1]
+    # Resolve these on the script thread, the load runs on a worker
+    cache = get_shared_cache()
+    provider = get_provider()
+    store = get_fundamentals_store()
+    metrics = get_metrics()
     
-    return market_data
+    def load():
+        with metrics.stage("fundamentals", symbol):
+            return store.load(symbol, provider, price)
+    
+    future = get_background_executor().submit(
+        cache.get_or_fetch, (symbol.upper(), "fundamentals"), load, INTRADAY_TTL
+    )
+    st.session_state.fundamentals = (symbol.upper(), future)
+    return future
+
+def await_fundamentals(symbol: str, price: Optional[float] = None) -> dict:
+    """Company info and earnings for a symbol, waiting for the background load if needed"""
+    future = request_fundamentals(symbol, price)
+    try:
+        if not future.done():
+            with st.spinner('Fetching company information...'):
+                return future.result()
+        return future.result()
+    except Exception:
+        return {'name': symbol, 'info': {}, 'earnings': None, 'has_earnings': False}
 
-def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
+@st.cache_resource
+def get_buffer_pool():
+    """Server-wide pool of read-only history buffers under a memory budget"""
+    return BufferPool()
+
+@st.cache_resource
+def get_bar_pyramid():
+    """Weekly and monthly bars resampled from the stored daily history"""
+    return BarPyramid(BarStore(os.path.join(DATA_DIR, "levels")), base="1d")
+
+def shared_indicators(data: dict) -> pd.DataFrame:
+    """
+    Technical indicators for the displayed range, computed once per data version
+    
+    The result is pooled, so sessions viewing the same symbol and range share it.
+    """
+    start, end = data.get('range', (None, None))
+    interval = data.get('interval', "1d")
+    history = data.get('indicator_history', data['history'])
+    if history.empty:
+        return history
+    # A refreshed history has a new last bar or close, and gets a new buffer
+    key = (data['symbol'].upper(), "indicators", interval, date_range_key(start, end),
+           len(history), history.index[-1], float(history['Close'].iloc[-1]))
+    metrics = get_metrics()
+    
+    pool = get_buffer_pool()
+    
+    def build():
+        with metrics.stage("indicators", data['symbol']):
+            engine_key = indicator_engine_key(data['symbol'], start, end, interval)
+            indicators = calculate_technical_indicators(history, pool.get_or_create(engine_key, IndicatorEngine))
+            # The engine's columns grow with the history it has seen
+            pool.resize(engine_key)
+            return indicators
+    
+    frame = pool.get_or_build(key, build)
+    return frame.frame(data.get('warmup', 0))
+
+def calculate_technical_indicators(df: pd.DataFrame, engine: Optional[IndicatorEngine] = None) -> pd.DataFrame:
     """
     Calculates various technical indicators for stock analysis
     
     Parameters:
         df (pd.DataFrame): DataFrame containing OHLCV data
+        engine (IndicatorEngine): Optional engine holding state from earlier calls,
+            so only bars added since then are computed
     
     Returns:
         pd.DataFrame: DataFrame with added technical indicators
+        (EMA_9, SMA_20/50/200, RSI, MACD, Bollinger Bands and OBV)
     """
-    # Create a copy to avoid modifications to original data
-    df = df.copy()
-    
-    # Moving Averages
-    df['EMA_9'] = ta.trend.ema_indicator(df['Close'], window=9)
-    df['SMA_20'] = ta.trend.sma_indicator(df['Close'], window=20)
-    df['SMA_50'] = ta.trend.sma_indicator(df['Close'], window=50)
-    df['SMA_200'] = ta.trend.sma_indicator(df['Close'], window=200)
-    
-    # RSI
-    df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
-    
-    # MACD
-    macd = ta.trend.MACD(df['Close'])
-    df['MACD'] = macd.macd()
-    df['MACD_Signal'] = macd.macd_signal()
-    
-    # Bollinger Bands
-    bollinger = ta.volatility.BollingerBands(df['Close'])
-    df['BB_Upper'] = bollinger.bollinger_hband()
-    df['BB_Lower'] = bollinger.bollinger_lband()
-    df['BB_Middle'] = bollinger.bollinger_mavg()
-    
-    # Volume indicators
-    df['OBV'] = ta.volume.on_balance_volume(df['Close'], df['Volume'])
+    if engine is None:
+        engine = IndicatorEngine()
+    return engine.update(df)
+
+def indicator_engine_key(symbol: str, start_date=None, end_date=None, interval: str = "1d") -> tuple:
+    """
+    Buffer pool key of the shared per-symbol indicator engine
     
-    return df
+    The engine is pooled with the history and indicator buffers, so its state
+    counts against the same memory budget and is dropped least recently used.
+    """
+    return (symbol.upper(), "indicator state", interval, date_range_key(start_date, end_date))
+
+def draw_line_chart(df: pd.DataFrame):
+    """Draws the columns of a date-indexed frame as lines, like st.line_chart but without Altair"""
+    st.vega_lite_chart(df.rename_axis("Date").reset_index(), line_chart_spec(df.columns), use_container_width=True)
 
 def display_overview(data: dict):
     """
     Displays the main overview section with key metrics and price chart
     
+    The price metric and chart are drawn from the price history straight
+    away; the company name, market cap and 52 week change fill in once the
+    background company info load finishes.
+    
     Parameters:
         data (dict): Stock data dictionary containing all required information
     """
-    st.markdown(f"""
+    def header(name):
+        return f"""
         <div class="glass-container">
             <h2 class="neon-header">
-                {data['name']} ({data['symbol']})
+                {name} ({data['symbol']})
             </h2>
         </div>
-    """, unsafe_allow_html=True)
+    """
+    title = st.empty()
+    title.markdown(header(data.get('name', data['symbol'])), unsafe_allow_html=True)
     
     # Create modern metrics layout
     st.markdown('<div class="modern-card">', unsafe_allow_html=True)
@@ -254,61 +353,547 @@ def display_overview(data: dict):
             f"{price_change*100:.1f}%"
         )
     
-    with col2:
-        market_cap = data['info'].get('marketCap', 0)
-        if market_cap:
-            market_cap_b = market_cap / 1e9
-            st.metric(
-                "Market Cap", 
-                f"${market_cap_b:.2f}B" if market_cap_b else "N/A"
-            )
-        else:
-            st.metric("Market Cap", "N/A")
-    
-    with col3:
-        week_change = data['info'].get('52WeekChange')
-        st.metric(
-            "52 Week Change",
-            f"{week_change*100:.1f}%" if week_change else "N/A"
-        )
+    # Placeholders until company info arrives
+    market_cap_slot = col2.empty()
+    market_cap_slot.metric("Market Cap", "...")
+    week_change_slot = col3.empty()
+    week_change_slot.metric("52 Week Change", "...")
     
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Price Chart
     st.subheader("Price History")
-    fig = go.Figure(data=[go.Candlestick(
-        x=data['history'].index,
-        open=data['history']['Open'],
-        high=data['history']['High'],
-        low=data['history']['Low'],
-        close=data['history']['Close'],
-        name='OHLC'
-    )])
-    
-    fig.update_layout(
-        height=400,
-        template='plotly_dark',
-        xaxis_title="Date",
-        yaxis_title="Price ($)",
-        showlegend=False
-    )
+    zoom = chart_zoom(data)
+    view = chart_view(data, zoom)
+    shown = len(visible_window(view['history'], zoom))
+    if view['interval'] != "1d":
+        st.caption(f"{shown:,} {BAR_LABELS[view['interval']].lower()} bars in view. Zoom in for daily bars.")
+    elif shown > chart_point_budget():
+        st.caption(f"{shown:,} bars in view, drawn as {chart_point_budget():,} points. Zoom in for full detail.")
+    with get_metrics().stage("price figure", data['symbol']):
+        fig = build_price_figure(view['history'], chart_point_budget(), zoom)
     
     st.plotly_chart(fig, use_container_width=True)
+    
+    fundamentals = await_fundamentals(data['symbol'], last_close(data))
+    info = fundamentals['info']
+    title.markdown(header(fundamentals['name']), unsafe_allow_html=True)
+    
+    market_cap = info.get('marketCap', 0)
+    if market_cap:
+        market_cap_b = market_cap / 1e9
+        market_cap_slot.metric(
+            "Market Cap", 
+            f"${market_cap_b:.2f}B" if market_cap_b else "N/A"
+        )
+    else:
+        market_cap_slot.metric("Market Cap", "N/A")
+    
+    week_change = info.get('52WeekChange')
+    week_change_slot.metric(
+        "52 Week Change",
+        f"{week_change*100:.1f}%" if week_change else "N/A"
+    )
 
+def chart_point_budget() -> int:
+    """Largest number of points a chart sends to the browser, set in the sidebar"""
+    return int(st.session_state.get('chart_point_budget', DEFAULT_POINT_BUDGET))
 
-def is_market_open():
-    """Check if the market is currently open (US Eastern Time)"""
-    now = datetime.now()
-    # Convert to US Eastern Time (UTC-4)
-    et_time = now - timedelta(hours=4)
+def chart_zoom(data: dict):
+    """
+    Zoom slider for histories longer than the point budget
+
+    Charts are downsampled to the point budget, zooming into a shorter range
+    redraws them from the full resolution bars in that range.
+
+    Returns:
+        Optional[tuple]: (start, end) dates in view, None when nothing is hidden
+    """
+    history = data['history']
+    if len(history) <= chart_point_budget():
+        return None
+    first, last = history.index[0].date(), history.index[-1].date()
+    zoom = st.slider(
+        "Zoom",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        key=f"chart_zoom_{data['symbol']}_{first}_{last}"
+    )
+    return zoom
+
+BAR_LABELS = {"1d": "Daily", "1wk": "Weekly", "1mo": "Monthly"}
+
+def chart_view(data: dict, zoom=None) -> dict:
+    """
+    Stock data with its bars swapped for the pyramid level the charts should draw
+
+    The finest level whose bars over the range in view fit the point budget
+    is used, so a ten year chart draws about 520 weekly bars while zooming
+    into a few months goes back to daily bars.
+
+    Returns:
+        dict: data with 'interval' set and, for weekly or monthly bars,
+        'history', 'indicator_history' and 'warmup' read from the pyramid
+    """
+    history = data['history']
+    if history.empty:
+        return {**data, 'interval': "1d"}
+    if zoom is not None:
+        start, end = pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1])
+    else:
+        start, end = history.index[0].tz_localize(None), history.index[-1].tz_localize(None)
+    end += pd.Timedelta(days=1)
+    pyramid = get_bar_pyramid()
+    symbol = data['symbol'].upper()
+    interval = pyramid.choose_level(symbol, start, end, chart_point_budget())
+    if interval == "1d":
+        return {**data, 'interval': interval}
+    bars, warmup = pyramid.read_frame(symbol, interval, history.index[0], end, warmup=WARMUP_BARS)
+    if bars.empty:
+        return {**data, 'interval': "1d"}
+    return {**data, 'interval': interval, 'history': bars.iloc[warmup:],
+            'indicator_history': bars, 'warmup': warmup}
+
+MODEL_LABELS = {
+    "ridge": "Ridge regression (return)",
+    "logistic": "Logistic regression (direction)",
+}
+
+@st.cache_resource
+def get_model_cache():
+    """Fitted models and walk-forward results, kept on disk across restarts"""
+    return ModelCache()
+
+def run_prediction(data: dict, model: str, horizon: int) -> Optional[dict]:
+    """
+    Walk-forward prediction over the displayed range, trained on the years before it
     
-    # Check if it's a weekday
-    if et_time.weekday() < 5:  # Monday = 0, Friday = 4
-        # Market hours are 9:30 AM to 4:00 PM ET
-        market_start = et_time.replace(hour=9, minute=30, second=0)
-        market_end = et_time.replace(hour=16, minute=0, second=0)
-        return market_start <= et_time <= market_end
-    return False
+    Training runs in the job pool; None is returned while it runs. Results are
+    cached in memory by data version and on disk by symbol, range and model,
+    so reopening a symbol reuses the trained models.
+    """
+    history = data['history']
+    symbol = data['symbol'].upper()
+    start, end = data.get('range', (None, None))
+    # The trained models are stored on disk per symbol, range and settings, the
+    # data version makes up the rest of the key
+    model_key = (symbol, "prediction", model, horizon, date_range_key(start, end))
+    key = model_key + (len(history), str(history.index[-1]), float(history['Close'].iloc[-1]))
+    first = history.index[0]
+
+    def submit(executor: JobExecutor, viewer: str) -> Job:
+        training = get_history_store().get_range(
+            symbol, partial(get_provider().history, symbol),
+            start=first.tz_localize(None) - pd.DateOffset(years=PREDICTION_TRAIN_YEARS), end=end
+        )
+        return submit_prediction(executor, key, training, model, start=first, horizon=horizon,
+                                 viewer=viewer, models=get_model_cache(), ttl=PREDICTION_TTL,
+                                 model_key=model_key)
+
+    return run_job("prediction", key, submit, "Training models")
+
+BACKTEST_STRATEGIES = {
+    "sma_cross": "SMA crossover (fast above slow)",
+    "rsi": "RSI (buy oversold, sell overbought)",
+    "macd": "MACD above signal line",
+}
+
+def run_backtest(data: dict, strategy: str, fee_bps: float) -> Optional[dict]:
+    """
+    Parameter sweep of a signal strategy over the displayed range, cached per data version
+
+    Returns:
+        Optional[dict]: 'summary' (metrics per parameter set, best first),
+        'best' (its parameters) and 'equity' (its growth of 1 next to buy and
+        hold), None when there are no bars or the sweep is still running
+    """
+    history = data.get('indicator_history', data['history'])
+    if history.empty:
+        return None
+    warmup = data.get('warmup', 0)
+    start, end = data.get('range', (None, None))
+    key = (data['symbol'].upper(), "backtest", strategy, fee_bps, date_range_key(start, end),
+           len(history), str(history.index[-1]), float(history['Close'].iloc[-1]))
+
+    def combine(results: list) -> dict:
+        summary = summarize(pd.concat(results))
+        best = dict(zip(summary.index.names, np.atleast_1d(summary.index[0])))
+        return {
+            'summary': summary,
+            'best': best,
+            'equity': equity_curve(history, strategy, best, fee_bps, start=warmup),
+        }
+
+    def submit(executor: JobExecutor, viewer: str) -> Job:
+        panel = PricePanel.from_histories({data['symbol'].upper(): history})
+        return submit_backtest(executor, key, panel, strategy, fee_bps=fee_bps, start=warmup,
+                               viewer=viewer, combine=combine, ttl=BACKTEST_TTL)
+
+    return run_job("backtest", key, submit, "Backtesting")
+
+FORECAST_METHODS = {
+    "gbm": "Geometric Brownian motion",
+    "bootstrap": "Bootstrapped returns",
+}
+
+def run_forecast(data: dict, method: str, paths: int, horizon: int) -> Optional[dict]:
+    """
+    Monte Carlo percentile bands from the displayed history, cached per data version
+    
+    The simulation runs in the job pool; None is returned while it runs and
+    when the history has too few returns.
+    """
+    history = data['history']
+    start, end = data.get('range', (None, None))
+    key = (data['symbol'].upper(), "forecast", method, paths, horizon, date_range_key(start, end),
+           len(history), str(history.index[-1]), float(history['Close'].iloc[-1]))
+    metrics = get_metrics()
+    
+    def submit(executor: JobExecutor, viewer: str) -> Job:
+        started = time.perf_counter()
+        
+        def combine(results: list):
+            # Timed from submission, the simulation itself runs in a worker process
+            metrics.record("forecast simulation", time.perf_counter() - started, data['symbol'])
+            return results[0]
+        
+        return submit_forecast(executor, key, history, horizon, paths, method,
+                               viewer=viewer, combine=combine, ttl=FORECAST_TTL)
+    
+    return run_job("forecast", key, submit, f"Simulating {paths:,} paths")
+
+@st.cache_resource
+def get_job_executor():
+    """Worker processes for the screener, backtests, prediction training and forecasts"""
+    return JobExecutor(get_shared_cache())
+
+def run_job(slot: str, key, submit, label: str):
+    """
+    Result of a pool job for this session, None while it runs, once cancelled or failed
+    
+    Each slot holds one job per session: asking for a different key, for
+    example after switching symbol, cancels the job started for the old one.
+    While the job runs a progress bar with a Cancel button is shown, and the
+    page reruns when it finishes.
+    
+    Parameters:
+        slot (str): Name of the workload, one job per slot and session
+        key: Cache key of the result, including the input version
+        submit (Callable): Starts the job given the executor and viewer id
+        label (str): Progress bar text
+    """
+    executor = get_job_executor()
+    viewer = st.session_state.setdefault('viewer_id', uuid.uuid4().hex)
+    jobs = st.session_state.setdefault('jobs', {})
+    cancelled = st.session_state.setdefault('cancelled_jobs', {})
+    
+    job = jobs.get(slot)
+    if job is not None and job.key != key:
+        executor.cancel(job, viewer)
+        job = None
+    if cancelled.get(slot) == key:
+        st.caption(f"{label} cancelled.")
+        if not st.button("Run again", key=f"job_retry_{slot}"):
+            return None
+        del cancelled[slot]
+    cancelled.pop(slot, None)
+    
+    # A failed job is only run again when asked to, like a cancelled one
+    if job is not None and job.error() is not None:
+        st.error(f"{label} failed: {job.error()}")
+        if not st.button("Run again", key=f"job_retry_{slot}"):
+            return None
+        job = None
+    
+    # A finished job keeps its result, None included, so it is not resubmitted
+    # on every rerun; inputs are only gathered (possibly upstream) when
+    # nothing is cached or running
+    if job is None or job.cancelled:
+        job = executor.lookup(key, viewer) or submit(executor, viewer)
+    jobs[slot] = job
+    if job.done():
+        return job.result()
+    
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def progress():
+        if job.done():
+            st.rerun()
+        st.progress(job.progress(), text=f"{label}...")
+        if st.button("Cancel", key=f"job_cancel_{slot}"):
+            executor.cancel(job, viewer)
+            cancelled[slot] = key
+            st.rerun()
+    progress()
+    return None
+
+def current_zoom(data: dict):
+    """Zoom range chosen on the Overview tab, shared by the other charts"""
+    history = data['history']
+    first, last = history.index[0].date(), history.index[-1].date()
+    return st.session_state.get(f"chart_zoom_{data['symbol']}_{first}_{last}")
+
+
+def load_screener_table(symbols: list, period: str) -> Optional[pd.DataFrame]:
+    """Latest indicator snapshot for a universe of symbols, None while the job runs"""
+    key = (",".join(sorted(s.upper() for s in symbols)), "screener", period)
+
+    def submit(executor: JobExecutor, viewer: str) -> Job:
+        # Histories are only loaded when no result is cached or running
+        job = executor.lookup(key, viewer)
+        if job is not None:
+            return job
+        store = get_history_store()
+        provider = get_provider()
+        histories = load_histories(
+            symbols,
+            lambda s: store.get_history(s, partial(provider.history, s), period=period)
+        )
+        return submit_snapshot(executor, key, PricePanel.from_histories(histories), viewer, ttl=SCREENER_TTL)
+
+    return run_job("screener", key, submit, f"Screening {len(symbols)} symbols")
+
+@st.fragment
+def display_screener():
+    """
+    Screens the popular stocks or a custom universe on their latest indicator values
+    
+    Depends only on its own widgets, so running a screen reruns this section alone.
+    """
+    with get_profiler().section("screener"):
+        with st.expander("Stock Screener"):
+            universe = st.radio(
+                "Universe", ["Popular Stocks", "Custom"], horizontal=True, key="screener_universe"
+            )
+            if universe == "Custom":
+                text = st.text_area("Symbols (comma or newline separated)", key="screener_symbols")
+                symbols = [s for s in re.split(r"[,\s]+", text.upper()) if s]
+            else:
+                symbols = [s for stocks in COMMON_STOCKS.values() for s in stocks]
+            
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                period = st.selectbox("History", ["1y", "5y", "10y"], key="screener_period")
+            with col2:
+                query = st.text_input("Screen", DEFAULT_QUERY, key="screener_query")
+            
+            if st.button("Run Screen", key="screener_run") and symbols:
+                st.session_state.screener_request = (symbols, period)
+            
+            request = st.session_state.get('screener_request')
+            if request:
+                table = load_screener_table(*request)
+                if table is not None:
+                    st.session_state.screener_table = table
+            
+            if 'screener_table' in st.session_state:
+                try:
+                    results = screen(st.session_state.screener_table, query, sort_by="RSI")
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    st.caption(f"{len(results)} of {len(st.session_state.screener_table)} symbols match")
+                    # Column headers are clickable for sorting
+                    st.dataframe(results, use_container_width=True)
+
+@st.cache_resource
+def get_quote_table():
+    """Process-wide table of the latest quote per symbol, read by every watchlist"""
+    return QuoteTable()
+
+@st.fragment(run_every=QUOTE_TTL)
+def display_watchlist():
+    """
+    Watchlist prices read from the shared quote table
+    
+    Symbols never quoted before are fetched in one concurrent batch; stale ones
+    are refreshed in the background and shown with their age until the table
+    catches up. Reruns on its own every QUOTE_TTL seconds.
+    """
+    symbols = st.session_state.get('watchlist', [])
+    if not symbols:
+        return
+    table = get_quote_table()
+    fetch_quote = cached_quote_fetcher()
+    pending = table.snapshot(table.due_for_refresh(symbols, QUOTE_TTL), QUOTE_TTL)['status']
+    # Nothing to show yet for new symbols, wait for them; the rest refresh behind the page
+    unseen = list(pending.index[pending == 'unavailable'])
+    stale = list(pending.index[pending != 'unavailable'])
+    if unseen:
+        table.refresh(unseen, fetch_quote)
+    if stale:
+        table.refresh_async(stale, fetch_quote)
+    
+    quotes = table.snapshot(symbols, QUOTE_TTL)
+    st.dataframe(
+        pd.DataFrame({
+            'Price': quotes['price'],
+            'Change %': quotes['change'],
+            'Age (s)': quotes['age'].round(),
+            'Status': quotes['status'],
+        }),
+        use_container_width=True,
+        column_config={
+            'Price': st.column_config.NumberColumn(format="$%.2f"),
+            'Change %': st.column_config.NumberColumn(format="%+.2f%%"),
+        }
+    )
+
+@st.fragment
+def display_watchlist_section():
+    """
+    Watchlist quotes and the box to add symbols
+    
+    Depends only on the watchlist in session state, so adding a symbol reruns
+    this section alone.
+    """
+    with get_profiler().section("watchlist"):
+        st.subheader("Watchlist")
+        # Initialize watchlist in session state if not exists
+        if 'watchlist' not in st.session_state:
+            st.session_state.watchlist = []
+        
+        # Quotes are drawn above the box but after it is read, so an added symbol shows at once
+        quotes = st.container()
+        new_symbol = st.text_input("Add stock to watchlist", key="watchlist_input")
+        if st.button("Add") and new_symbol:
+            if new_symbol.upper() not in st.session_state.watchlist:
+                st.session_state.watchlist.append(new_symbol.upper())
+        # Watched symbols join the off-hours fundamentals prefetch
+        get_fundamentals_prefetcher().add(st.session_state.watchlist)
+        with quotes:
+            display_watchlist()
+
+@st.cache_resource
+def get_refresh_scheduler():
+    """Process-wide scheduler refreshing the symbols open in any session"""
+    # Keys start with the symbol, each waits for its own exchange to open
+    return RefreshScheduler(get_shared_cache(), lambda key: calendar_for(key[0]).seconds_until_open())
+
+def stock_data_key(data: dict) -> tuple:
+    """Shared cache key a loaded stock data bundle is stored under"""
+    return (data['symbol'].upper(), "stock", date_range_key(*data.get('range', (None, None))))
+
+def watch_for_refresh(interval: int):
+    """
+    Asks the refresh scheduler to keep this session's stock and watchlist data fresh
+    
+    Renewed on every rerun; data nobody renews is dropped by the scheduler.
+    Newer stock data already refreshed in the background is swapped in without
+    waiting on the upstream.
+    """
+    scheduler = get_refresh_scheduler()
+    viewer = st.session_state.setdefault('viewer_id', uuid.uuid4().hex)
+    provider = get_provider()
+    
+    data = st.session_state.get('stock_data')
+    if data:
+        start_date, end_date = data.get('range', (None, None))
+        key = stock_data_key(data)
+        scheduler.watch(
+            key,
+            partial(load_shared_price_data, data['symbol'], start_date, end_date,
+                    provider, get_history_store(), get_buffer_pool(), get_bar_pyramid(), WARMUP_BARS),
+            interval,
+            viewer
+        )
+        fresh = get_shared_cache().get(key)
+        if fresh is not None and fresh is not data:
+            st.session_state.stock_data = fresh
+            refreshed = scheduler.last_refresh(key)
+            st.session_state.last_update = datetime.fromtimestamp(refreshed) if refreshed else datetime.now()
+    
+    for symbol in st.session_state.get('watchlist', []):
+        scheduler.watch(
+            (symbol.upper(), "quote", "fast"),
+            partial(provider.quote, symbol),
+            interval,
+            viewer,
+            ttl=max(QUOTE_TTL, 2 * interval)
+        )
+
+def poll_refreshed_data(interval: int):
+    """
+    Reruns the page when the scheduler has stored newer data for this session
+    
+    Also renews the session's watches, which would otherwise expire while a
+    closed market produces no new data to rerun for.
+    """
+    @st.fragment(run_every=interval)
+    def poll():
+        get_refresh_scheduler().renew(st.session_state.setdefault('viewer_id', uuid.uuid4().hex))
+        data = st.session_state.get('stock_data')
+        if data:
+            fresh = get_shared_cache().get(stock_data_key(data))
+            if fresh is not None and fresh is not data:
+                st.rerun()
+    poll()
+
+def is_market_open(symbol: str = "^GSPC"):
+    """Check if the market a symbol trades on is currently in session"""
+    # Exchange calendars handle DST, holidays, NSE/BSE hours and 24h FX
+    return calendar_for(symbol).is_open()
+
+def prometheus_text() -> str:
+    """Stage metrics, upstream calls, cache counters and rerun percentiles in the Prometheus text format"""
+    cache_stats = get_shared_cache().stats()
+    fundamentals_stats = get_fundamentals_store().stats()
+    job_stats = get_job_executor().stats()
+    return get_metrics().prometheus(
+        counters={
+            'upstream_calls_total': dict(get_provider().counts),
+            'cache_hits_total': {
+                'shared': cache_stats['hits'], 'fundamentals': fundamentals_stats['served'],
+                'jobs': job_stats['cached'],
+            },
+            'cache_misses_total': {
+                'shared': cache_stats['misses'], 'fundamentals': fundamentals_stats['fetched'],
+                'jobs': job_stats['jobs'],
+            },
+        },
+        profile=get_profiler().summary(),
+    )
+
+def display_performance_panel():
+    """Stage timings, upstream traffic and cache hit ratios of this server process, with exports"""
+    metrics = get_metrics()
+    provider = get_provider()
+    ratio = lambda hits, misses: f"{hits / (hits + misses):.0%}" if hits + misses else "n/a"
+    cache_stats = get_shared_cache().stats()
+    fundamentals_stats = get_fundamentals_store().stats()
+    job_stats = get_job_executor().stats()
+    st.caption(
+        f"Upstream: {provider.calls} calls, {provider.payload_memory / 2**20:.1f} MB of parsed payloads. Hit ratios: "
+        f"shared cache {ratio(cache_stats['hits'], cache_stats['misses'])}, "
+        f"fundamentals {ratio(fundamentals_stats['served'], fundamentals_stats['fetched'])}, "
+        f"jobs {ratio(job_stats['cached'], job_stats['jobs'])}"
+    )
+    
+    stages = metrics.stages()
+    if stages:
+        table = pd.DataFrame(stages).T
+        st.dataframe(
+            pd.DataFrame({
+                'count': table['count'],
+                'errors': table['errors'],
+                'mean ms': table['mean'] * 1000,
+                'max ms': table['max'] * 1000,
+                'payload MB': table['payload_memory'] / 2**20,
+            }),
+            use_container_width=True
+        )
+    slow = metrics.slow_symbols()
+    if slow:
+        st.caption("Slowest symbols upstream")
+        slow = pd.DataFrame(slow).T
+        st.dataframe(pd.DataFrame({'calls': slow['calls'], 'mean ms': slow['mean'] * 1000}),
+                     use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Prometheus", prometheus_text(), file_name="metrics.prom", mime="text/plain")
+    with col2:
+        st.download_button("JSONL trace", metrics.trace(), file_name="trace.jsonl", mime="application/jsonl")
 
 def enhanced_sidebar():
     """
@@ -326,6 +911,17 @@ def enhanced_sidebar():
         start_date = st.date_input("Start Date", start_date)
         end_date = st.date_input("End Date", end_date)
         
+        # Long ranges are downsampled to this many points per chart
+        st.markdown("### Chart Settings")
+        st.number_input(
+            "Points per chart",
+            min_value=200,
+            max_value=20000,
+            value=DEFAULT_POINT_BUDGET,
+            step=100,
+            key="chart_point_budget"
+        )
+        
         # Add auto-refresh controls
         st.markdown("### Auto-Refresh Settings")
         enable_auto_refresh = st.toggle("Enable Auto-Refresh", value=False)
@@ -340,8 +936,273 @@ def enhanced_sidebar():
         if 'last_update' in st.session_state:
             st.markdown(f"Last updated: {st.session_state.last_update.strftime('%H:%M:%S')}")
         
+        cache_stats = get_shared_cache().stats()
+        st.caption(
+            f"Shared cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['coalesced']} coalesced"
+        )
+        job_stats = get_job_executor().stats()
+        st.caption(
+            f"Analytics jobs: {job_stats['running']} running on {job_stats['workers']} processes, "
+            f"{job_stats['cached']} served from cache, {job_stats['cancelled']} cancelled"
+        )
+        pool_stats = get_buffer_pool().stats()
+        st.caption(
+            f"History buffers: {pool_stats['bytes'] / 2**20:.1f} of "
+            f"{pool_stats['budget'] / 2**20:.0f} MB, {pool_stats['size']} buffers"
+        )
+        fundamentals_stats = get_fundamentals_store().stats()
+        prefetch = get_fundamentals_prefetcher().last_pass
+        st.caption(
+            f"Fundamentals: {fundamentals_stats['fetched']} fetched, {fundamentals_stats['served']} served from disk"
+            + (f", last prefetch refreshed {prefetch['refreshed']} of {prefetch['symbols']} closed-market symbols"
+               if prefetch else "")
+        )
+        with st.expander("Memory by symbol"):
+            report = get_buffer_pool().report()
+            report['MB'] = report['bytes'] / 2**20
+            st.dataframe(report[['MB', 'bars', 'buffers']], use_container_width=True)
+        with st.expander("Startup and rerun profile"):
+            profile = get_profiler().summary()
+            st.caption(
+                f"Cold start {profile['cold_start'].get('total', 0):.2f} s, imports "
+                f"{profile['imports'].get('Home.py imports', 0):.2f} s, {profile['runs']} runs"
+            )
+            if profile['reruns']:
+                st.dataframe(pd.DataFrame(profile['reruns']).T[['p50', 'p95', 'count']], use_container_width=True)
+        # Off by default, building the exports costs a little on every rerun
+        if st.toggle("Performance panel", value=False, key="performance_panel"):
+            display_performance_panel()
+        if enable_auto_refresh:
+            refresh_stats = get_refresh_scheduler().stats()
+            st.caption(
+                f"Background refresh: {refresh_stats['watched']} watched, "
+                f"{refresh_stats['refreshes']} refreshes, {refresh_stats['errors']} errors"
+            )
+        
         return symbol, start_date, end_date, enable_auto_refresh, refresh_interval
 
+@st.fragment
+def display_analysis():
+    """
+    Analysis tabs of the open symbol
+    
+    Depends on the stock data in session state and the tabs' own widgets, so
+    zooming, picking a strategy or a model reruns this section alone. Loading
+    another symbol or changing the sidebar reruns the whole page.
+    """
+    with get_profiler().section("analysis tabs"):
+        data = st.session_state.stock_data
+        
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+            "Overview", 
+            "Technical Analysis", 
+            "Fundamental Analysis",
+            "Financial Metrics",
+            "Ownership Analysis",
+            "Prediction",
+            "Forecast"
+        ])
+        
+        with tab1:
+            display_overview(data)
+        
+        # Ready by now, display_overview waited for it after drawing the chart
+        data = {**data, **await_fundamentals(data['symbol'], last_close(data))}
+        
+        with tab2:
+            def display_technical(data):
+                st.subheader("Technical Analysis")
+                # Add technical indicators chart and analysis here
+                if 'history' in data:
+                    # Warm-up bars before the range feed the indicators but are not shown
+                    # Long ranges use the same weekly or monthly bars as the price chart
+                    budget, zoom = chart_point_budget(), current_zoom(data)
+                    view = chart_view(data, zoom)
+                    if view['interval'] != "1d":
+                        st.caption(f"Indicators on {BAR_LABELS[view['interval']].lower()} bars")
+                    df_tech = shared_indicators(view)
+                    # Long ranges are downsampled, keeping each line's peaks and troughs
+                    draw_line_chart(line_chart_data(df_tech, ['Close', 'SMA_20', 'SMA_50'], budget, zoom))
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.subheader("RSI")
+                        draw_line_chart(line_chart_data(df_tech, ['RSI'], budget, zoom))
+                    with col2:
+                        st.subheader("MACD")
+                        draw_line_chart(line_chart_data(df_tech, ['MACD', 'MACD_Signal'], budget, zoom))
+                    
+                    with st.expander("Backtest these signals"):
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            strategy = st.selectbox(
+                                "Strategy", list(BACKTEST_STRATEGIES), format_func=BACKTEST_STRATEGIES.get,
+                                key="backtest_strategy"
+                            )
+                        with col2:
+                            fee_bps = st.number_input(
+                                "Fee per trade (bps)", min_value=0.0, max_value=100.0,
+                                value=DEFAULT_FEE_BPS, step=1.0, key="backtest_fee"
+                            )
+                        result = run_backtest(data, strategy, fee_bps)
+                        if result is None:
+                            if data.get('indicator_history', data['history']).empty:
+                                st.write("No price data to backtest")
+                        else:
+                            best = ", ".join(f"{k}={v}" for k, v in result['best'].items())
+                            st.caption(f"Best by Sharpe ratio: {best}, long or flat, fees on every position change")
+                            draw_line_chart(line_chart_data(result['equity'], ['Strategy', 'Buy & Hold'], budget))
+                            st.dataframe(result['summary'].head(10), use_container_width=True)
+            
+            display_technical(data)
+            
+        with tab3:
+            def display_fundamental(data):
+                st.subheader("Fundamental Analysis")
+                if 'info' in data:
+                    info = data['info']
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("P/E Ratio", f"{info.get('trailingPE', 'N/A')}")
+                        st.metric("Forward P/E", f"{info.get('forwardPE', 'N/A')}")
+                    with col2:
+                        st.metric("PEG Ratio", f"{info.get('pegRatio', 'N/A')}")
+                        st.metric("Beta", f"{info.get('beta', 'N/A')}")
+            
+            display_fundamental(data)
+            
+        with tab4:
+            def display_fundamental_metrics(data):
+                st.subheader("Financial Metrics")
+                if 'info' in data:
+                    info = data['info']
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("Revenue Growth", f"{info.get('revenueGrowth', 'N/A')}")
+                        st.metric("Gross Margins", f"{info.get('grossMargins', 'N/A')}")
+                    with col2:
+                        st.metric("Profit Margins", f"{info.get('profitMargins', 'N/A')}")
+                        st.metric("Operating Margins", f"{info.get('operatingMargins', 'N/A')}")
+            
+            def display_earnings(data):
+                st.subheader("Earnings Analysis")
+                if data.get('has_earnings', False) and data['earnings'] is not None:
+                    draw_line_chart(data['earnings'])
+                else:
+                    st.write("No earnings data available")
+            
+            display_fundamental_metrics(data)
+            display_earnings(data)
+            
+        with tab5:
+            def display_ownership_analysis(data):
+                st.subheader("Ownership Analysis")
+                if 'info' in data:
+                    info = data['info']
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("Institutional Ownership", f"{info.get('institutionPercentHeld', 'N/A')}")
+                        st.metric("Insider Ownership", f"{info.get('insiderPercentHeld', 'N/A')}")
+                    with col2:
+                        st.metric("Short Ratio", f"{info.get('shortRatio', 'N/A')}")
+                        st.metric("Short % of Float", f"{info.get('shortPercentOfFloat', 'N/A')}")
+            
+            display_ownership_analysis(data)
+            
+        with tab6:
+            def display_prediction(data):
+                st.subheader("Price Prediction")
+                col1, col2 = st.columns(2)
+                with col1:
+                    model = st.selectbox(
+                        "Model", list(MODEL_LABELS), format_func=MODEL_LABELS.get, key="prediction_model"
+                    )
+                with col2:
+                    horizon = st.selectbox(
+                        "Horizon (trading days)", [1, 5, 10, 21], index=1, key="prediction_horizon"
+                    )
+                
+                result = run_prediction(data, model, horizon)
+                if result is None:
+                    job = st.session_state['jobs'].get('prediction')
+                    if job is not None and job.done() and not job.cancelled and job.error() is None:
+                        st.write("Not enough history for a walk-forward test")
+                    return
+                
+                metrics = result['metrics']
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    if model == "logistic":
+                        st.metric(f"Chance of a {horizon}-day rise", f"{result['forecast']*100:.0f}%")
+                    else:
+                        st.metric(f"Expected {horizon}-day return", f"{np.expm1(result['forecast'])*100:+.2f}%")
+                with col2:
+                    st.metric("Walk-forward hit rate", f"{metrics['hit_rate']*100:.1f}%")
+                with col3:
+                    st.metric(
+                        "Strategy return",
+                        f"{np.expm1(metrics['strategy_return'])*100:+.1f}%",
+                        f"{(np.expm1(metrics['strategy_return']) - np.expm1(metrics['buy_hold_return']))*100:+.1f}% vs buy & hold"
+                    )
+                
+                # Long or short each day on the latest prediction, refit every month on earlier bars only
+                draw_line_chart(np.expm1(result['equity']))
+                st.caption(
+                    f"Refit {metrics['refits']} times on all earlier bars, scored on "
+                    f"{metrics['scored']} bars the models were not trained on. "
+                    f"Information coefficient {metrics['ic']:.3f}."
+                )
+                with st.expander("Feature weights"):
+                    st.bar_chart(result['coefficients'])
+            
+            display_prediction(data)
+            
+        with tab7:
+            def display_forecast(data):
+                st.subheader("Monte Carlo Forecast")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    method = st.selectbox(
+                        "Simulation", list(FORECAST_METHODS), format_func=FORECAST_METHODS.get,
+                        key="forecast_method"
+                    )
+                with col2:
+                    paths = st.selectbox(
+                        "Paths", [10_000, 100_000, 250_000], index=1, format_func="{:,}".format,
+                        key="forecast_paths"
+                    )
+                with col3:
+                    horizon = st.selectbox(
+                        "Horizon (trading days)", [21, 63, 126, 252], index=3, key="forecast_horizon"
+                    )
+                
+                forecast = run_forecast(data, method, paths, horizon)
+                if forecast is None:
+                    job = st.session_state['jobs'].get('forecast')
+                    if job is not None and job.done() and not job.cancelled and job.error() is None:
+                        st.write("Not enough history to simulate")
+                    return
+                
+                bands = forecast['bands']
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Median price", f"${bands['p50'].iloc[-1]:.2f}")
+                with col2:
+                    st.metric("5th to 95th percentile", f"${bands['p5'].iloc[-1]:.2f} - ${bands['p95'].iloc[-1]:.2f}")
+                with col3:
+                    st.metric("Chance of ending higher", f"{forecast['prob_up']*100:.0f}%")
+                
+                with get_metrics().stage("forecast figure", data['symbol']):
+                    fig = build_forecast_figure(data['history'], bands, chart_point_budget())
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(
+                    f"{forecast['paths']:,} simulated paths from the returns of the displayed range, "
+                    "bands at the 5th, 25th, 50th, 75th and 95th percentiles."
+                )
+            
+            display_forecast(data)
+
 # Update the main() function to include auto-refresh
 def main():
     """Main application function with auto-refresh capability"""
@@ -358,29 +1219,36 @@ def main():
     """, unsafe_allow_html=True)
     
     # Get inputs including auto-refresh settings
+    profiler = get_profiler()
     symbol, start_date, end_date, enable_auto_refresh, refresh_interval = enhanced_sidebar()
-    
+    profiler.lap("sidebar")
+
+    if start_date > end_date:
+        st.sidebar.error("Start Date must be before End Date")
+        start_date, end_date = end_date, start_date
+
+    # Reload the open symbol when the sidebar range changes, only missing bars are fetched
+    loaded = st.session_state.get('stock_data')
+    if loaded and loaded.get('range') != (start_date, end_date):
+        st.session_state.stock_data = fetch_stock_data(loaded['symbol'], start_date, end_date) or loaded
+
     # Initialize last update time if not exists
     if 'last_update' not in st.session_state:
         st.session_state.last_update = datetime.now()
     
-    # Check if it's time to refresh
-    current_time = datetime.now()
-    time_elapsed = (current_time - st.session_state.last_update).total_seconds()
-    
-    # Auto-refresh logic
-    if enable_auto_refresh and time_elapsed >= refresh_interval:
-        if is_market_open():
-            st.session_state.last_update = current_time
-            # Refresh market data
-            if 'stock_data' in st.session_state:
-                st.session_state.stock_data = fetch_stock_data(
-                    st.session_state.stock_data['symbol']
-                )
-            # Force page refresh
-            st.rerun()
-        else:
-            st.sidebar.warning("Market is closed. Auto-refresh paused.")
+    # Auto-refresh: the process-wide scheduler re-fetches what this session views,
+    # the page only picks up the result from the shared cache
+    if enable_auto_refresh:
+        watch_for_refresh(refresh_interval)
+        poll_refreshed_data(refresh_interval)
+        viewed = st.session_state.get('stock_data')
+        if viewed and not is_market_open(viewed['symbol']):
+            calendar = calendar_for(viewed['symbol'])
+            opens = calendar.next_open()
+            st.sidebar.warning(
+                f"{calendar.name} is closed. Auto-refresh resumes "
+                f"{datetime.fromtimestamp(opens).strftime('%a %H:%M') if opens else 'when it opens'}."
+            )
     
     # Use enhanced sidebar
     # symbol, start_date, end_date = enhanced_sidebar()
@@ -425,33 +1293,14 @@ def main():
                 )
     
     display_market_overview()
+    profiler.lap("market overview")
     
     # Create modern layout for watchlist and common stocks
     col1, col2 = st.columns([1, 2])
     
     with col1:
         st.markdown('<div class="glass-container">', unsafe_allow_html=True)
-        st.subheader("Watchlist")
-        # Initialize watchlist in session state if not exists
-        if 'watchlist' not in st.session_state:
-            st.session_state.watchlist = []
-            
-        # Display watchlist stocks
-        for symbol in st.session_state.watchlist:
-            try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.fast_info
-                current_price = info.last_price if hasattr(info, 'last_price') else 0
-                st.write(f"{symbol}: ${current_price:.2f}")
-            except:
-                st.write(f"Unable to fetch data for {symbol}")
-        
-        # Add to watchlist
-        new_symbol = st.text_input("Add stock to watchlist", key="watchlist_input")
-        if st.button("Add") and new_symbol:
-            if new_symbol not in st.session_state.watchlist:
-                st.session_state.watchlist.append(new_symbol)
-                st.experimental_rerun()
+        display_watchlist_section()
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
@@ -483,316 +1332,23 @@ def main():
                         )
                         if st.button(symbol, key=f"common_stock_{symbol}", 
                                    use_container_width=True):
-                            st.session_state.stock_data = fetch_stock_data(symbol)
+                            st.session_state.stock_data = fetch_stock_data(
+                                symbol, start_date, end_date
+                            )
                         st.markdown("</div>", unsafe_allow_html=True)
         
         st.markdown('</div>', unsafe_allow_html=True)
+    profiler.lap("popular stocks")
+    
+    display_screener()
     
     # Display analysis tabs if stock data is available
     if "stock_data" in st.session_state:
-        data = st.session_state.stock_data
-        
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "Overview", 
-            "Technical Analysis", 
-            "Fundamental Analysis",
-            "Financial Metrics",
-            "Ownership Analysis"
-        ])
-        
-        with tab1:
-            display_overview(data)
-        
-        with tab2:
-            def display_technical(data):
-                st.subheader("Technical Analysis")
-                # Add technical indicators chart and analysis here
-                if 'history' in data:
-                    df_tech = calculate_technical_indicators(data['history'])
-                    st.line_chart(df_tech[['Close', 'SMA_20', 'SMA_50']])
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.subheader("RSI")
-                        st.line_chart(df_tech['RSI'])
-                    with col2:
-                        st.subheader("MACD")
-                        st.line_chart(df_tech[['MACD', 'MACD_Signal']])
-            
-            display_technical(data)
-            
-        with tab3:
-            def display_fundamental(data):
-                st.subheader("Fundamental Analysis")
-                if 'info' in data:
-                    info = data['info']
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("P/E Ratio", f"{info.get('trailingPE', 'N/A')}")
-                        st.metric("Forward P/E", f"{info.get('forwardPE', 'N/A')}")
-                    with col2:
-                        st.metric("PEG Ratio", f"{info.get('pegRatio', 'N/A')}")
-                        st.metric("Beta", f"{info.get('beta', 'N/A')}")
-            
-            display_fundamental(data)
-            
-        with tab4:
-            def display_fundamental_metrics(data):
-                st.subheader("Financial Metrics")
-                if 'info' in data:
-                    info = data['info']
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("Revenue Growth", f"{info.get('revenueGrowth', 'N/A')}")
-                        st.metric("Gross Margins", f"{info.get('grossMargins', 'N/A')}")
-                    with col2:
-                        st.metric("Profit Margins", f"{info.get('profitMargins', 'N/A')}")
-                        st.metric("Operating Margins", f"{info.get('operatingMargins', 'N/A')}")
-            
-            def display_earnings(data):
-                st.subheader("Earnings Analysis")
-                if data.get('has_earnings', False) and data['earnings'] is not None:
-                    st.line_chart(data['earnings'])
-                else:
-                    st.write("No earnings data available")
-            
-            display_fundamental_metrics(data)
-            display_earnings(data)
-            
-        with tab5:
-            def display_ownership_analysis(data):
-                st.subheader("Ownership Analysis")
-                if 'info' in data:
-                    info = data['info']
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("Institutional Ownership", f"{info.get('institutionPercentHeld', 'N/A')}")
-                        st.metric("Insider Ownership", f"{info.get('insiderPercentHeld', 'N/A')}")
-                    with col2:
-                        st.metric("Short Ratio", f"{info.get('shortRatio', 'N/A')}")
-                        st.metric("Short % of Float", f"{info.get('shortPercentOfFloat', 'N/A')}")
-            
-            display_ownership_analysis(data)
-            
-# CSS Styling comments
-st.markdown("""
-    <style>
-    /* Main Theme and Background */
-    html, body, [class*="css"] {
-        /* Dark theme with animated gradient background */
-        font-family: 'Segoe UI', sans-serif;
-        background: linear-gradient(
-            -45deg, 
-            #1a1c2c 0%, 
-            #161827 25%, 
-            #0d1117 50%, 
-            #161827 75%, 
-            #1a1c2c 100%
-        );
-        background-size: 400% 400%;
-        animation: gradientBG 15s ease infinite;
-        color: #e0e0e0;
-    }
-
-    @keyframes gradientBG {
-        0% {
-            background-position: 0% 50%;
-        }
-        50% {
-            background-position: 100% 50%;
-        }
-        100% {
-            background-position: 0% 50%;
-        }
-    }
-
-    /* Enhanced Glass Container with Gradient Border */
-    .glass-container {
-        /* Glass morphism effect with gradient border */
-        background: rgba(255, 255, 255, 0.03);
-        backdrop-filter: blur(10px);
-        -webkit-backdrop-filter: blur(10px);
-        border: 1px solid transparent;
-        border-image: linear-gradient(
-            45deg,
-            rgba(100,255,218,0.3),
-            rgba(0,191,255,0.3)
-        ) 1;
-        border-radius: 16px;
-        padding: 20px;
-        margin: 10px 0;
-        box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.2);
-        transition: all 0.3s ease;
-    }
-
-    .glass-container:hover {
-        background: rgba(255, 255, 255, 0.05);
-        border-image: linear-gradient(
-            45deg,
-            rgba(100,255,218,0.5),
-            rgba(0,191,255,0.5)
-        ) 1;
-        transform: translateY(-2px);
-        box-shadow: 0 12px 40px 0 rgba(31, 38, 135, 0.25);
-    }
-
-    /* Modern Card with Gradient Animation */
-    .modern-card {
-        background: linear-gradient(
-            135deg,
-            rgba(28, 131, 225, 0.05) 0%,
-            rgba(66, 71, 103, 0.05) 50%,
-            rgba(28, 131, 225, 0.05) 100%
-        );
-        background-size: 200% 200%;
-        animation: cardGradient 10s ease infinite;
-        border: 1px solid rgba(28, 131, 225, 0.2);
-        border-radius: 16px;
-        padding: 20px;
-        margin: 10px 0;
-        transition: all 0.3s ease;
-    }
-
-    @keyframes cardGradient {
-        0% {
-            background-position: 0% 50%;
-        }
-        50% {
-            background-position: 100% 50%;
-        }
-        100% {
-            background-position: 0% 50%;
-        }
-    }
-
-    /* Animated Neon Header */
-    .neon-header {
-        background: linear-gradient(
-            120deg,
-            #64ffda 0%,
-            #00bfff 50%,
-            #64ffda 100%
-        );
-        background-size: 200% auto;
-        animation: neonFlow 3s linear infinite;
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-shadow: 0 0 20px rgba(100,255,218,0.5);
-        font-weight: bold;
-        letter-spacing: 2px;
-    }
-
-    @keyframes neonFlow {
-        0% {
-            background-position: 0% 50%;
-        }
-        100% {
-            background-position: 200% 50%;
-        }
-    }
-
-    /* Enhanced Metrics */
-    [data-testid="stMetricValue"] {
-        background: linear-gradient(45deg, #64ffda, #00bfff);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 1.5em !important;
-    }
-    
-    /* Enhanced Tabs */
-    .stTabs [data-baseweb="tab"] {
-        background: linear-gradient(135deg, rgba(100,255,218,0.1) 0%, rgba(0,191,255,0.1) 100%);
-        border-radius: 10px 10px 0 0;
-        padding: 15px 20px;
-        gap: 10px;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        background: linear-gradient(135deg, rgba(100,255,218,0.2) 0%, rgba(0,191,255,0.2) 100%);
-    }
-    
-    /* Enhanced Scrollbar */
-    ::-webkit-scrollbar {
-        width: 8px;
-        height: 8px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 4px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(45deg, #64ffda, #00bfff);
-        border-radius: 4px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(45deg, #00bfff, #64ffda);
-    }
-    
-    /* Data Tables Enhancement */
-    .dataframe {
-        /* Table styling for better readability */
-        background: rgba(255, 255, 255, 0.03);
-        border-radius: 8px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    .dataframe th {
-        background: rgba(100,255,218,0.1);
-        padding: 12px !important;
-    }
-    
-    .dataframe td {
-        padding: 10px !important;
-    }
-    
-    /* Enhanced Market Overview Styling */
-    .ticker-row {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        padding: 10px;
-        background: rgba(255, 255, 255, 0.03);
-        border-radius: 8px;
-        margin: 5px 0;
-        transition: all 0.3s ease;
-    }
-    
-    .ticker-row:hover {
-        background: rgba(255, 255, 255, 0.08);
-        transform: translateX(5px);
-    }
-    
-    .ticker-name {
-        font-weight: 500;
-        flex: 2;
-    }
-    
-    .ticker-price {
-        flex: 1;
-        text-align: right;
-        color: #64ffda;
-    }
-    
-    .ticker-change {
-        flex: 1;
-        text-align: right;
-        font-weight: bold;
-    }
-    
-    /* Update Market Grid */
-    .market-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-        gap: 20px;
-        margin-top: 20px;
-    }
-    </style>
-""", unsafe_allow_html=True)
+        display_analysis()
 
 # Update the entry point (remove K.clear_session())
 if __name__ == "__main__":
-    main()
+    with get_profiler().run():
+        main()
+    # For node_exporter's textfile collector or any scraper reading the file
+    get_metrics().publish(os.path.join(DATA_DIR, "metrics.prom"), prometheus_text)
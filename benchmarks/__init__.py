@@ -0,0 +1 @@
+"""Benchmarks for the terminal's data paths. Run as `python -m benchmarks.<name>`."""
@@ -0,0 +1,72 @@
+"""
+Times a parameter sweep of the vectorized backtester and checks it against a loop.
+
+    python -m benchmarks.bench_backtest --symbols 500 --years 10
+
+Sweeps a 10 x 5 SMA crossover grid (50 parameter sets) over `--symbols`
+synthetic daily histories, once in this process and once split over a
+process per core, and checks one symbol against a plain per-bar loop.
+Exits with status 1 if the results differ.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from terminal.backtest import backtest
+from terminal.providers import synthetic_history
+from terminal.screener import PricePanel
+
+GRID = {"fast": [5, 10, 15, 20, 25, 30, 40, 50, 60, 70], "slow": [80, 100, 150, 200, 250]}
+
+
+def loop_total_return(close: np.ndarray, fast: int, slow: int, fee_bps: float) -> float:
+    """Reference result: one bar at a time"""
+    equity, held = 1.0, 0.0
+    for t in range(1, len(close)):
+        position = 0.0
+        if t - 1 >= slow - 1:
+            position = float(close[t - fast:t].mean() > close[t - slow:t].mean())
+        equity *= 1 + position * (close[t] / close[t - 1] - 1) - abs(position - held) * fee_bps / 1e4
+        held = position
+    return equity - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    histories = {f"S{i:03d}": synthetic_history(252 * args.years, seed=i) for i in range(args.symbols)}
+    panel = PricePanel.from_histories(histories)
+    cells = panel.close.size * 50
+    print(f"{args.symbols} symbols x {len(panel.close)} bars x 50 parameter sets = {cells / 1e6:,.0f}M cells")
+
+    elapsed = time.perf_counter()
+    serial = backtest(panel, "sma_cross", GRID, max_workers=1)
+    elapsed = time.perf_counter() - elapsed
+    print(f"one process:       {elapsed:.2f} s, {cells / elapsed / 1e6:,.0f}M cells/s")
+
+    if (os.cpu_count() or 1) > 1:
+        elapsed = time.perf_counter()
+        parallel = backtest(panel, "sma_cross", GRID)
+        elapsed = time.perf_counter() - elapsed
+        print(f"{os.cpu_count()} processes:       {elapsed:.2f} s")
+        if not np.allclose(parallel['total_return'].to_numpy(), serial['total_return'].to_numpy()):
+            print("FAIL parallel results differ")
+            sys.exit(1)
+
+    close = histories["S000"]['Close'].to_numpy()
+    row = serial[(serial['fast'] == 20) & (serial['slow'] == 100)].loc["S000"]
+    expected = loop_total_return(close, 20, 100, 5.0)
+    print(f"S000 SMA 20/100:   vectorized {row['total_return']:.6f}, loop {expected:.6f}")
+    if not np.isclose(row['total_return'], expected, rtol=1e-9, atol=1e-12):
+        print("FAIL vectorized result differs from the loop")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
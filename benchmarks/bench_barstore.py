@@ -0,0 +1,65 @@
+"""
+Times range reads from the memory-mapped bar store on a long 1-minute history.
+
+    python -m benchmarks.bench_barstore --years 20
+
+Writes `--years` of synthetic 1-minute bars in yearly appends, then opens the
+store afresh and reads a day, a month and a year of bars, comparing against
+loading the whole file into a DataFrame.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from terminal.barstore import BarStore, to_frame
+from terminal.providers import synthetic_history
+
+BARS_PER_YEAR = 390 * 252
+
+
+def timed(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-bars-") as root:
+        history = synthetic_history(BARS_PER_YEAR * args.years, seed=5, freq="min")
+        store = BarStore(root)
+        start = time.perf_counter()
+        for chunk in np.array_split(np.arange(len(history)), args.years):
+            store.append("BENCH", "1m", history.iloc[chunk[0]:chunk[-1] + 1])
+        write_time = time.perf_counter() - start
+        size = os.path.getsize(store.path("BENCH", "1m"))
+        print(f"bars:            {len(history):,} ({size / 2**20:.0f} MB on disk)")
+        print(f"append:          {write_time * 1000:.0f} ms for {args.years} appends")
+
+        # A fresh store has nothing mapped yet, like a new server process
+        fresh = BarStore(root)
+        last = history.index[-1]
+        for label, offset in (("1 day", pd.Timedelta(days=1)), ("1 month", pd.DateOffset(months=1)),
+                              ("1 year", pd.DateOffset(years=1))):
+            elapsed, records = timed(lambda: fresh.read("BENCH", "1m", last - offset, None))
+            frame_time, frame = timed(lambda: fresh.read_frame("BENCH", "1m", last - offset, None))
+            assert frame["Close"].iloc[-1] == history["Close"].iloc[-1]
+            print(f"read {label:<8}    {len(records):>9,} bars  view {elapsed * 1000:7.3f} ms  "
+                  f"frame {frame_time * 1000:7.2f} ms")
+
+        full_time, _ = timed(lambda: to_frame(np.array(fresh.records("BENCH", "1m"))), repeat=1)
+        print(f"load whole file: {full_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
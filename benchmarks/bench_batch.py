@@ -0,0 +1,83 @@
+"""
+Times the headless batch run over a synthetic replayed universe.
+
+    python -m benchmarks.bench_batch --symbols 200 --latency 0.05
+
+Records `--symbols` synthetic histories, then runs terminal.batch on them
+with the replay provider and reports symbols per second for a cold store
+(every history fetched) and a warm one (served from disk). Checks that the
+batch module loads without Streamlit or Plotly and that a written row
+matches the indicator engine. Exits with status 1 if a check fails.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from terminal.batch import TableWriter, run_batch
+from terminal.indicators import IndicatorEngine
+from terminal.providers import ReplayProvider, write_synthetic_recording
+from terminal.store import HistoryStore
+
+UI_MODULES = ("streamlit", "plotly")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to each replayed call")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    failed = False
+
+    # A fresh interpreter, so modules imported by this script do not count
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, terminal.batch; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    leaked = [m for m in loaded if m.split(".")[0] in UI_MODULES]
+    print(f"terminal.batch imports {len(loaded)} modules, UI modules: {leaked or 'none'}")
+    if leaked:
+        print("FAIL terminal.batch imports UI modules")
+        failed = True
+
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-batch-") as root:
+        write_synthetic_recording(os.path.join(root, "replay"), symbols, years=args.years)
+        provider = ReplayProvider(os.path.join(root, "replay"), latency=args.latency)
+        store = HistoryStore(os.path.join(root, "history"))
+        output = os.path.join(root, "indicators.parquet")
+
+        for label in ("cold store", "warm store"):
+            writer = TableWriter(output)
+            try:
+                stats = run_batch(symbols, writer.write, provider, store, "1y", args.fetch_workers, args.workers)
+            finally:
+                writer.close()
+            print(f"{label}: {stats['symbols_per_second']:,.1f} symbols/s, "
+                  f"{stats['rows']:,} rows, {len(stats['failed'])} failed")
+            if stats['failed']:
+                print(f"FAIL {next(iter(stats['failed'].items()))}")
+                failed = True
+
+        table = pq.read_table(output, filters=[("Symbol", "=", symbols[0])]).to_pandas()
+        history = store.load(symbols[0])
+        expected = IndicatorEngine().update(history).loc[:, 'SMA_200'].to_numpy()[-len(table):]
+        if not np.allclose(table['SMA_200'].to_numpy(), expected, equal_nan=True):
+            print("FAIL written indicators differ from the engine")
+            failed = True
+        if table['SMA_200'].isna().any():
+            print("FAIL SMA_200 is not warmed up on the first written bar")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Times chart downsampling on long daily and 1-minute histories.
+
+    python -m benchmarks.bench_downsample --budget 1500
+
+The point budget and the kept extremes are checked by tests/test_downsample.py.
+"""
+import argparse
+import time
+
+from terminal.charts import build_price_figure, line_chart_data
+from terminal.downsample import downsample_lines, ohlc_buckets
+from terminal.indicators import IndicatorEngine
+from terminal.providers import synthetic_history
+
+SIZES = {
+    "10y": (2520, "B"),
+    "30y": (7560, "B"),
+    "1m_1y": (390 * 252, "min"),
+}
+
+LINES = [['Close', 'SMA_20', 'SMA_50'], ['RSI'], ['MACD', 'MACD_Signal']]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=int, default=1500)
+    args = parser.parse_args()
+    budget = args.budget
+
+    for label, (bars, freq) in SIZES.items():
+        history = IndicatorEngine().update(synthetic_history(bars, seed=3, freq=freq))
+        print(f"{label}: {bars} bars")
+
+        candles, elapsed = timed(lambda: ohlc_buckets(history, budget))
+        print(f"  ohlc {len(candles)} candles ({elapsed:.1f} ms)")
+
+        for method in ("lttb", "minmax"):
+            for columns in LINES:
+                lines, elapsed = timed(lambda: downsample_lines(history[columns], budget, method))
+                print(f"  {method} {'/'.join(columns)} {len(lines)} rows ({elapsed:.1f} ms)")
+
+        # Zooming into a tenth of the range redraws it from full resolution bars
+        zoom = (history.index[-len(history) // 10].date(), history.index[-1].date())
+        zoomed, elapsed = timed(lambda: line_chart_data(history, ['Close'], budget, zoom))
+        print(f"  zoomed line {len(zoomed)} rows ({elapsed:.1f} ms)")
+        figure, elapsed = timed(lambda: build_price_figure(history, budget))
+        print(f"  figure {len(figure.data[0].x)} candles, {len(figure.to_json()) / 1024:.0f} KB ({elapsed:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Checks the fundamentals store's upstream calls and times its loads.
+
+    python -m benchmarks.bench_fundamentals --symbols 200 --latency 0.05
+
+Prefetches `--symbols` synthetic symbols into an empty store, then opens a
+new store on the same folder (a restarted server) and loads every symbol as
+the fundamentals tabs do. Checks that those loads make no upstream calls,
+that the market cap is repriced from the share price without a call once it
+is intraday-stale, that info is refetched after a day and statements after
+a quarter, and that the store's counters match the calls made by the
+concurrent prefetch. Exits with status 1 if a check fails.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from terminal.fundamentals import DAILY_TTL, INTRADAY_TTL, QUARTERLY_TTL, FundamentalsPrefetcher, FundamentalsStore
+from terminal.providers import CountingProvider, ReplayProvider, write_synthetic_recording
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to each replayed call")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    failed = False
+
+    def check(ok: bool, message: str):
+        nonlocal failed
+        if not ok:
+            print(f"FAIL {message}")
+            failed = True
+
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-fundamentals-") as root:
+        write_synthetic_recording(os.path.join(root, "replay"), symbols, years=1)
+        provider = CountingProvider(ReplayProvider(os.path.join(root, "replay"), latency=args.latency))
+        folder = os.path.join(root, "fundamentals")
+
+        # A Saturday, when every exchange but FX is closed
+        now = time.time()
+        saturday = now + ((5 - time.gmtime(now).tm_wday) % 7) * 86400
+        prefetcher = FundamentalsPrefetcher(FundamentalsStore(folder), provider, symbols, workers=args.workers)
+        started = time.perf_counter()
+        stats = prefetcher.run_once(t=saturday)
+        elapsed = time.perf_counter() - started
+        print(f"prefetch: {stats['refreshed']} symbols in {elapsed:.2f} s "
+              f"({stats['refreshed'] / elapsed:,.1f} symbols/s), {provider.calls} upstream calls")
+        check(stats['refreshed'] == len(symbols) and not stats['failed'], f"prefetch stats {stats}")
+        counted = prefetcher.store.stats()['fetched']
+        check(counted == provider.calls, f"store counted {counted} fetches for {provider.calls} upstream calls")
+        again = prefetcher.run_once(t=saturday)
+        check(again['refreshed'] == 0, "a second prefetch pass refetched fresh symbols")
+
+        # A restarted server reading what the prefetch stored
+        store = FundamentalsStore(folder)
+        calls = provider.calls
+        for label in ("loads from disk", "loads from memory"):
+            started = time.perf_counter()
+            loaded = [store.load(s, provider, t=saturday) for s in symbols]
+            elapsed = time.perf_counter() - started
+            print(f"{label}: {elapsed / len(symbols) * 1e6:,.0f} us per symbol")
+        check(provider.calls == calls, f"loads after the prefetch made {provider.calls - calls} upstream calls")
+        check(all(d['info'].get('trailingPE') is not None and d['has_earnings'] for d in loaded),
+              "loaded fundamentals are missing info or earnings")
+
+        info = loaded[0]['info']
+        price = info['marketCap'] / info['sharesOutstanding'] * 1.1
+        repriced = store.load(symbols[0], provider, price=price, t=saturday + INTRADAY_TTL + 1)['info']
+        check(np.isclose(repriced['marketCap'], info['sharesOutstanding'] * price), "market cap was not repriced")
+        check(provider.calls == calls, "repricing the market cap made an upstream call")
+
+        store.load(symbols[0], provider, t=saturday + DAILY_TTL + 1)
+        check(provider.counts.get('info') == len(symbols) + 1, "info was not refetched after a day")
+        store.load(symbols[1], provider, t=saturday + QUARTERLY_TTL + 1)
+        check(provider.counts.get('income_stmt') == len(symbols) + 1, "statement was not refetched after a quarter")
+        print(f"upstream calls: {provider.counts}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Times the `ta` library, a full indicator engine pass and appending bars to a
+warm engine.
+
+    python -m benchmarks.bench_indicators --bars 2520 --append 1
+
+Parity with `ta` is checked by tests/test_indicators.py. `ta` is only needed
+for these two, it is installed by Requirements-dev.txt.
+"""
+import argparse
+import time
+
+import pandas as pd
+import ta
+
+from terminal.indicators import IndicatorEngine
+from terminal.providers import synthetic_history
+
+
+def ta_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """The original ta based calculate_technical_indicators"""
+    df = df.copy()
+    df['EMA_9'] = ta.trend.ema_indicator(df['Close'], window=9)
+    df['SMA_20'] = ta.trend.sma_indicator(df['Close'], window=20)
+    df['SMA_50'] = ta.trend.sma_indicator(df['Close'], window=50)
+    df['SMA_200'] = ta.trend.sma_indicator(df['Close'], window=200)
+    df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
+    macd = ta.trend.MACD(df['Close'])
+    df['MACD'] = macd.macd()
+    df['MACD_Signal'] = macd.macd_signal()
+    bollinger = ta.volatility.BollingerBands(df['Close'])
+    df['BB_Upper'] = bollinger.bollinger_hband()
+    df['BB_Lower'] = bollinger.bollinger_lband()
+    df['BB_Middle'] = bollinger.bollinger_mavg()
+    df['OBV'] = ta.volume.on_balance_volume(df['Close'], df['Volume'])
+    return df
+
+
+def best_of(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=2520)
+    parser.add_argument('--append', type=int, default=1, help='bars added per incremental update')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = synthetic_history(args.bars)
+    head = df.iloc[:-args.append]
+
+    def append_bars():
+        warm = IndicatorEngine()
+        warm.update(head)
+        start = time.perf_counter()
+        warm.update(df)
+        return time.perf_counter() - start
+
+    ta_time = best_of(lambda: ta_indicators(df), args.repeat)
+    full_time = best_of(lambda: IndicatorEngine().update(df), args.repeat)
+    append_time = min(append_bars() for _ in range(args.repeat))
+    print(f"bars:                 {len(df)}")
+    print(f"ta full recompute:    {ta_time * 1000:.2f} ms")
+    print(f"engine full compute:  {full_time * 1000:.2f} ms")
+    print(f"engine append {args.append:>5}:   {append_time * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
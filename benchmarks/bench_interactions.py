@@ -0,0 +1,112 @@
+"""
+Measures the upstream calls and CPU time each kind of page interaction costs.
+
+    python -m benchmarks.bench_interactions --reruns 5
+
+Runs Home.py headless with Streamlit's AppTest on a synthetic replay
+recording and performs typical interactions: loading a symbol, plain reruns,
+picking a backtest strategy, switching the screener universe and adding a
+watchlist symbol. Upstream calls are read from the app's counting provider,
+CPU time is that of the app process. AppTest reruns the whole script on every
+interaction, so the figures are an upper bound for sections that rerun on
+their own in a browser. Checks that interactions unrelated to loading data
+make no history, info or income statement calls. Exits with status 1 if a
+check fails.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from terminal.providers import write_synthetic_recording
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded symbols and the market overview's indices and FX pairs
+SYMBOLS = ["AAPL", "MSFT", "^GSPC", "^DJI", "^IXIC", "^NSEI", "^BSESN", "EURUSD=X", "GBPUSD=X", "INR=X"]
+
+# Interactions that must not reach the upstream for anything but quotes
+UNRELATED = ("rerun", "backtest strategy", "screener universe")
+
+SESSION = """
+import gc, json, time
+from streamlit.testing.v1 import AppTest
+from terminal.providers import CountingProvider
+
+def app_provider():
+    return next((o for o in gc.get_objects() if isinstance(o, CountingProvider)), None)
+
+def settle(at, tries=120):
+    # Pool jobs show a progress bar until a rerun finds them done
+    for _ in range(tries):
+        if not at.get("progress"):
+            return
+        time.sleep(0.5)
+        at.run()
+
+if __name__ == "__main__":
+    at = AppTest.from_file({home!r}, default_timeout=300)
+    results = []
+
+    def interact(name, action):
+        provider = app_provider()
+        counts = dict(provider.counts) if provider else {{}}
+        cpu, wall = time.process_time(), time.perf_counter()
+        action()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        after = app_provider().counts
+        results.append({{
+            "name": name, "wall": wall, "cpu": cpu,
+            "calls": {{m: n - counts.get(m, 0) for m, n in after.items() if n > counts.get(m, 0)}},
+        }})
+        settle(at)
+
+    interact("cold start", at.run)
+    interact("load symbol", lambda: at.button(key="common_stock_AAPL").click().run())
+    for _ in range({reruns}):
+        interact("rerun", at.run)
+    interact("backtest strategy", lambda: at.selectbox(key="backtest_strategy").set_value("rsi").run())
+    interact("screener universe", lambda: at.radio(key="screener_universe").set_value("Custom").run())
+    at.text_input(key="watchlist_input").input("MSFT")
+    interact("watchlist add", lambda: next(b for b in at.button if b.label == "Add").click().run())
+    print(json.dumps({{"results": results, "errors": len(at.exception)}}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-interactions-") as root:
+        write_synthetic_recording(os.path.join(root, "replay"), SYMBOLS, years=5)
+        # No off-hours fundamentals prefetch, its calls would be counted against the page
+        env = dict(os.environ, ML_TERMINAL_PROVIDER="replay", ML_TERMINAL_DATA_DIR=root,
+                   ML_TERMINAL_REPLAY_DIR=os.path.join(root, "replay"), ML_TERMINAL_PREFETCH_INTERVAL="0",
+                   PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+        script = SESSION.format(home=os.path.join(ROOT, "Home.py"), reruns=args.reruns)
+        output = subprocess.run([sys.executable, "-c", script], env=env, cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        session = json.loads(output.strip().splitlines()[-1])
+
+    failed = False
+    print(f"{'interaction':<20}{'wall ms':>10}{'cpu ms':>10}  upstream calls")
+    for result in session["results"]:
+        calls = ", ".join(f"{m} {n}" for m, n in sorted(result["calls"].items())) or "none"
+        print(f"{result['name']:<20}{result['wall'] * 1000:10.1f}{result['cpu'] * 1000:10.1f}  {calls}")
+        # Quotes expire on their own clock, anything else is refetched by the click
+        refetched = {m: n for m, n in result["calls"].items() if m != "quote"}
+        if result["name"] in UNRELATED and refetched:
+            print(f"FAIL {result['name']} made upstream calls: {refetched}")
+            failed = True
+    if session["errors"]:
+        print(f"FAIL {session['errors']} exceptions in the app")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
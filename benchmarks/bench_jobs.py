@@ -0,0 +1,105 @@
+"""
+Times analytics jobs in the process pool and checks them against inline runs.
+
+    python -m benchmarks.bench_jobs --symbols 500 --years 10
+
+Measures what it costs to hand a (bars x symbols) panel to a worker, pickled
+versus through shared memory, then runs a screener snapshot and an SMA
+crossover sweep as pool jobs and compares them with the same calls made in
+this process. Also checks that a repeated job is served from the cache and
+that a cancelled job stores nothing. Exits with status 1 if a check fails.
+"""
+import argparse
+import pickle
+import sys
+import time
+from concurrent.futures import CancelledError
+
+import pandas as pd
+
+from terminal.backtest import backtest
+from terminal.cache import SharedCache
+from terminal.jobs import JobExecutor, SharedPanel, attach_panel, panel_version, submit_backtest, submit_snapshot
+from terminal.providers import synthetic_history
+from terminal.screener import PricePanel, panel_indicators, snapshot
+
+GRID = {"fast": [5, 10, 20, 50], "slow": [100, 150, 200]}
+
+
+def timed(label: str, run):
+    elapsed = time.perf_counter()
+    result = run()
+    print(f"{label:<28}{time.perf_counter() - elapsed:.3f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    histories = {f"S{i:03d}": synthetic_history(252 * args.years, seed=i) for i in range(args.symbols)}
+    panel = PricePanel.from_histories(histories)
+    version = panel_version(panel)
+    print(f"{args.symbols} symbols x {len(panel.close)} bars, "
+          f"{(panel.close.nbytes + panel.volume.nbytes + panel.dates.nbytes) / 2**20:.0f} MB panel")
+
+    # What every task pays to receive the panel
+    timed("pickle round trip", lambda: pickle.loads(pickle.dumps(panel)))
+    shared = timed("copy to shared memory", lambda: SharedPanel(panel))
+    spec = shared.spec
+    print(f"{'shared spec':<28}{len(pickle.dumps(spec)):,} bytes pickled")
+
+    def attach_sum():
+        with attach_panel(spec) as view:
+            return float(view.close[-1].sum())
+    timed("attach in place", attach_sum)
+    shared.release()
+
+    executor = JobExecutor(SharedCache(), max_workers=args.workers)
+    failed = False
+    try:
+        # Starts the workers so the timings below exclude process start up
+        timed("pool start", lambda: submit_snapshot(executor, ("warm",), panel).result())
+
+        inline = timed("snapshot inline", lambda: snapshot(panel, panel_indicators(panel.close, panel.volume)))
+        pooled = timed(f"snapshot, {executor.max_workers} workers",
+                       lambda: submit_snapshot(executor, ("snapshot", version), panel).result())
+        if not inline.equals(pooled):
+            print("FAIL pooled snapshot differs from the inline one")
+            failed = True
+
+        inline = timed("sweep inline", lambda: backtest(panel, "sma_cross", GRID, max_workers=1))
+        pooled = timed(f"sweep, {executor.max_workers} workers",
+                       lambda: submit_backtest(executor, ("sweep", version), panel, "sma_cross", GRID).result())
+        try:
+            pd.testing.assert_frame_equal(inline, pooled)
+        except AssertionError:
+            print("FAIL pooled sweep differs from the inline one")
+            failed = True
+
+        again = submit_backtest(executor, ("sweep", version), panel, "sma_cross", GRID)
+        if not again.done():
+            print("FAIL repeated sweep was not served from the cache")
+            failed = True
+
+        job = submit_backtest(executor, ("cancelled", version), panel, "rsi")
+        executor.cancel(job)
+        try:
+            job.result()
+        except CancelledError:
+            pass
+        if executor.cache.get(("cancelled", version)) is not None:
+            print("FAIL cancelled job stored a result")
+            failed = True
+        print(f"cancelled job: {job.progress():.0%} of chunks settled, stats {executor.stats()}")
+    finally:
+        executor.shutdown()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares serial and concurrent market overview quote fetching against a local
+stub provider, so no network access is needed.
+
+    python -m benchmarks.bench_market_overview --latency 0.2 --jitter 0.1
+"""
+import argparse
+import random
+import time
+
+from terminal.quotes import fetch_quotes, make_quote
+
+# Same symbols the Market Overview block requests
+OVERVIEW_SYMBOLS = ["^GSPC", "^DJI", "^IXIC", "^NSEI", "^BSESN", "EURUSD=X", "GBPUSD=X", "INR=X"]
+
+
+def make_stub_provider(latency: float, jitter: float, failure_rate: float, seed: int = 0):
+    """Returns a quote function that sleeps like a remote call and sometimes fails"""
+    rng = random.Random(seed)
+    delays = {s: latency + rng.uniform(0, jitter) for s in OVERVIEW_SYMBOLS}
+    failures = {s for s in OVERVIEW_SYMBOLS if rng.random() < failure_rate}
+
+    def stub_quote(symbol: str):
+        time.sleep(delays[symbol])
+        if symbol in failures:
+            raise RuntimeError(f"stub failure for {symbol}")
+        return make_quote(symbol, 100.0, 99.0)
+
+    return stub_quote, delays
+
+
+def serial_fetch(symbols, fetch_quote):
+    """The previous implementation: one round trip after another"""
+    quotes = {}
+    for symbol in symbols:
+        try:
+            quotes[symbol] = fetch_quote(symbol)
+        except Exception:
+            continue
+    return quotes
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="base seconds per quote")
+    parser.add_argument("--jitter", type=float, default=0.1, help="extra random seconds per quote")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stub_quote, delays = make_stub_provider(args.latency, args.jitter, args.failure_rate)
+    serial_time, serial_quotes = timed(
+        lambda: serial_fetch(OVERVIEW_SYMBOLS, stub_quote), args.repeat
+    )
+    concurrent_time, concurrent_quotes = timed(
+        lambda: fetch_quotes(OVERVIEW_SYMBOLS, stub_quote, timeout=args.timeout), args.repeat
+    )
+
+    print(f"symbols:           {len(OVERVIEW_SYMBOLS)}")
+    print(f"sum of latencies:  {sum(delays.values()):.3f}s")
+    print(f"slowest quote:     {max(delays.values()):.3f}s")
+    print(f"serial:            {serial_time:.3f}s ({len(serial_quotes)} quotes)")
+    print(f"concurrent:        {concurrent_time:.3f}s ({len(concurrent_quotes)} quotes)")
+    print(f"speedup:           {serial_time / concurrent_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
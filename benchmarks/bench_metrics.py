@@ -0,0 +1,116 @@
+"""
+Checks the stage metrics, their Prometheus export and the JSONL trace.
+
+    python -m benchmarks.bench_metrics --symbols 50 --slow-latency 0.05
+
+Loads history, info and income statements for `--symbols` synthetic symbols
+through a counting provider that reports every call to a Metrics object, one
+of them behind a slower replay. Checks that each upstream call is one event
+with its payload memory, that the histograms are cumulative, that every
+exported line is well-formed, that every trace line is JSON and that the slow
+symbol ranks first. Also times the overhead of recording an event. Exits with
+status 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from terminal.metrics import Metrics
+from terminal.providers import CountingProvider, ReplayProvider, write_synthetic_recording
+
+# A sample line of the exposition format: name, optional labels, value
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? -?[0-9.e+-]+$')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--slow-latency", type=float, default=0.05, help="Seconds added to the slow symbol's calls")
+    parser.add_argument("--events", type=int, default=100_000, help="Events recorded for the overhead timing")
+    args = parser.parse_args()
+    failed = False
+
+    def check(ok: bool, message: str):
+        nonlocal failed
+        if not ok:
+            print(f"FAIL {message}")
+            failed = True
+
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    slow = symbols[-1]
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-metrics-") as root:
+        replay = os.path.join(root, "replay")
+        write_synthetic_recording(replay, symbols, years=2)
+        trace_path = os.path.join(root, "trace.jsonl")
+        metrics = Metrics(trace_path)
+        fast = CountingProvider(ReplayProvider(replay), observe=metrics.observe_call)
+        delayed = CountingProvider(ReplayProvider(replay, latency=args.slow_latency), observe=metrics.observe_call)
+
+        for symbol in symbols:
+            provider = delayed if symbol == slow else fast
+            provider.history(symbol, period="2y")
+            provider.info(symbol)
+            provider.income_stmt(symbol)
+            with metrics.stage("indicators", symbol):
+                pass
+        try:
+            with metrics.stage("price figure", slow):
+                raise ValueError("figure failed")
+        except ValueError:
+            pass
+
+        stages = metrics.stages()
+        for method in ("history", "info", "income_stmt"):
+            s = stages.get(f"upstream {method}", {})
+            calls = fast.counts.get(method, 0) + delayed.counts.get(method, 0)
+            check(s.get('count') == calls, f"upstream {method}: {s.get('count')} events for {calls} calls")
+            check(s.get('payload_memory', 0) > 0, f"upstream {method} recorded no payload memory")
+        check(stages["price figure"]['errors'] == 1, "a raising stage was not counted as an error")
+        payload = sum(s['payload_memory'] for s in stages.values())
+        print(f"stages: {len(stages)}, events: {sum(s['count'] for s in stages.values())}, "
+              f"{payload / 1e6:.2f} MB of parsed payloads")
+
+        ranked = list(metrics.slow_symbols(n=3))
+        print(f"slowest symbols: {ranked}")
+        check(ranked[:1] == [slow], f"the slow symbol {slow} does not rank first")
+
+        text = metrics.prometheus(counters={"cache_hits_total": {"shared": 3}},
+                                  profile={"reruns": {"total": {"p50": 0.1, "p95": 0.2, "count": 4}}})
+        samples = [line for line in text.splitlines() if line and not line.startswith("#")]
+        bad = [line for line in samples if not SAMPLE.match(line)]
+        check(not bad, f"malformed exposition lines: {bad[:3]}")
+        for name, s in stages.items():
+            label = json.dumps(name)
+            buckets = [int(line.rsplit(" ", 1)[1]) for line in samples
+                       if line.startswith(f"ml_terminal_stage_seconds_bucket{{stage={label},")]
+            check(buckets == sorted(buckets), f"{name}: histogram buckets are not cumulative")
+            check(buckets[-1:] == [s['count']], f"{name}: +Inf bucket differs from the count")
+        print(f"prometheus: {len(samples)} samples, {len(text):,} bytes")
+
+        with open(trace_path) as f:
+            lines = f.read().splitlines()
+        try:
+            events = [json.loads(line) for line in lines]
+        except ValueError as e:
+            events = []
+            check(False, f"trace line is not JSON: {e}")
+        check(len(events) == sum(s['count'] for s in stages.values()), "trace events differ from the stage counts")
+        check(metrics.trace().splitlines() == lines, "in-memory trace differs from the trace file")
+
+        # Overhead of recording, without the trace file
+        bare = Metrics()
+        started = time.perf_counter()
+        for i in range(args.events):
+            bare.record("upstream quote", 0.001, symbols[i % len(symbols)], 100)
+        elapsed = time.perf_counter() - started
+        print(f"record: {elapsed / args.events * 1e6:.2f} us per event")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
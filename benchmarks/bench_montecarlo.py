@@ -0,0 +1,77 @@
+"""
+Times the chunked Monte Carlo forecast and checks its streamed percentiles.
+
+    python -m benchmarks.bench_montecarlo --paths 100000 --horizon 252
+
+Reports paths per second and peak traced memory for both simulation methods,
+checks that a seeded run is reproducible and that the histogram percentiles
+match exact np.percentile on the same paths within 0.5%. Exits with status 1
+if a check fails.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from terminal.montecarlo import METHODS, log_returns, simulate_fan
+from terminal.providers import synthetic_history
+
+
+def exact_bands(history, horizon: int, paths: int, method: str, chunk: int, seed: int) -> np.ndarray:
+    """The same paths as simulate_fan, kept in memory and passed to np.percentile"""
+    returns = log_returns(history)
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for done in range(0, paths, chunk):
+        n = min(chunk, paths - done)
+        if method == "gbm":
+            steps = rng.normal(returns.mean(), returns.std(), size=(n, horizon))
+        else:
+            steps = returns[rng.integers(0, len(returns), size=(n, horizon))]
+        chunks.append(np.cumsum(steps, axis=1))
+    cumulative = np.vstack(chunks)
+    return history['Close'].iloc[-1] * np.exp(np.percentile(cumulative, [5, 25, 50, 75, 95], axis=0).T)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--horizon", type=int, default=252)
+    parser.add_argument("--chunk", type=int, default=10_000)
+    args = parser.parse_args()
+    failures = []
+
+    history = synthetic_history(252 * 3, seed=4)
+    for method in METHODS:
+        tracemalloc.start()
+        elapsed = time.perf_counter()
+        forecast = simulate_fan(history, args.horizon, args.paths, method, chunk=args.chunk)
+        elapsed = time.perf_counter() - elapsed
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        full_size = args.paths * args.horizon * 8
+        print(f"{method:<9} {args.paths:,} paths x {args.horizon} bars: {elapsed:.2f} s, "
+              f"{args.paths / elapsed:,.0f} paths/s, peak {peak / 2**20:.0f} MB "
+              f"(all paths at once: {full_size / 2**20:,.0f} MB)")
+
+        again = simulate_fan(history, args.horizon, args.paths, method, chunk=args.chunk)
+        if not forecast['bands'].equals(again['bands']):
+            failures.append(f"{method} not reproducible")
+
+        sample = 20_000
+        streamed = simulate_fan(history, args.horizon, sample, method, chunk=5_000, seed=1)
+        exact = exact_bands(history, args.horizon, sample, method, 5_000, 1)
+        error = np.abs(streamed['bands'].to_numpy() / exact - 1).max()
+        print(f"          percentile error vs np.percentile: {error * 100:.3f}%")
+        if error > 0.005:
+            failures.append(f"{method} percentile error {error:.4f}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
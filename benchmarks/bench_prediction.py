@@ -0,0 +1,47 @@
+"""
+Times walk-forward prediction for one symbol and for many in parallel.
+
+    python -m benchmarks.bench_prediction --symbols 32 --years 4
+
+Each symbol has `--years` of synthetic daily bars; the models are scored on
+the last year. Many symbols are run once serially and once with
+predict_many, which spreads them over one process per core.
+"""
+import argparse
+import os
+import time
+
+from terminal.prediction import MODELS, predict_history, predict_many
+from terminal.providers import synthetic_history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=32)
+    parser.add_argument("--years", type=int, default=4)
+    args = parser.parse_args()
+
+    histories = {f"S{i:03d}": synthetic_history(252 * args.years, seed=i) for i in range(args.symbols)}
+    history = histories["S000"]
+    start = history.index[-252]
+    for model in MODELS:
+        elapsed = time.perf_counter()
+        result = predict_history(history, model, start=start)
+        elapsed = time.perf_counter() - elapsed
+        metrics = result['metrics']
+        print(f"{model:<9} 1 symbol:  {elapsed * 1000:7.1f} ms, {metrics['refits']} refits, "
+              f"hit rate {metrics['hit_rate']:.3f}")
+
+    elapsed = time.perf_counter()
+    for h in histories.values():
+        predict_history(h, start=start)
+    serial = time.perf_counter() - elapsed
+    elapsed = time.perf_counter()
+    predict_many(histories, start=start)
+    parallel = time.perf_counter() - elapsed
+    print(f"{args.symbols} symbols: serial {serial:.2f} s, "
+          f"parallel {parallel:.2f} s on {os.cpu_count()} cores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Checks the resampling pyramid and times building it and picking chart levels.
+
+    python -m benchmarks.bench_pyramid --years 2
+
+Builds the 5m/1h/1d/1wk/1mo levels from `--years` of synthetic 1-minute bars
+appended a day at a time, checks they match a pyramid built in one go, then
+times level selection and reads for 10 years of daily bars at the default
+point budget. Exits with status 1 if any check fails.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from terminal.barstore import BarStore
+from terminal.downsample import DEFAULT_POINT_BUDGET
+from terminal.providers import synthetic_history
+from terminal.pyramid import BarPyramid
+
+
+def check(label: str, ok: bool, failures: list):
+    if not ok:
+        print(f"FAIL {label}")
+        failures.append(label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=2)
+    args = parser.parse_args()
+    failures = []
+
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-pyramid-") as root:
+        minutes = synthetic_history(1440 * 365 * args.years, seed=9, freq="min")
+        incremental = BarPyramid(BarStore(f"{root}/incremental"))
+        start = time.perf_counter()
+        for day in np.array_split(np.arange(len(minutes)), 365 * args.years):
+            incremental.append("BENCH", minutes.iloc[day[0]:day[-1] + 1])
+        append_time = time.perf_counter() - start
+
+        full = BarPyramid(BarStore(f"{root}/full"))
+        start = time.perf_counter()
+        full.append("BENCH", minutes)
+        build_time = time.perf_counter() - start
+        print(f"1m bars:        {len(minutes):,}")
+        print(f"build at once:  {build_time * 1000:.0f} ms")
+        print(f"daily appends:  {append_time * 1000:.0f} ms total, "
+              f"{append_time / (365 * args.years) * 1000:.2f} ms per day")
+        for interval in full.levels:
+            built = full.store.records("BENCH", interval)
+            check(f"{interval} incremental matches full build",
+                  np.array_equal(built, incremental.store.records("BENCH", interval)), failures)
+            print(f"  {interval:<4} {len(built):>10,} bars")
+        check("1h high is the max of its minutes",
+              full.store.records("BENCH", "1h")["high"].max() == minutes["High"].max(), failures)
+
+        daily = synthetic_history(2520, seed=9)
+        pyramid = BarPyramid(BarStore(f"{root}/daily"), base="1d")
+        pyramid.sync("BENCH", daily)
+        begin, end = daily.index[0], daily.index[-1]
+        start = time.perf_counter()
+        interval = pyramid.choose_level("BENCH", begin, end, DEFAULT_POINT_BUDGET)
+        bars, _ = pyramid.read_frame("BENCH", interval, begin, end)
+        elapsed = time.perf_counter() - start
+        print(f"10y chart:      {interval}, {len(bars)} bars in {elapsed * 1000:.2f} ms")
+        check(f"10y chart picks 1wk (got {interval})", interval == "1wk", failures)
+        check(f"10y weekly bars fit {DEFAULT_POINT_BUDGET}", 0 < len(bars) <= DEFAULT_POINT_BUDGET, failures)
+        recent = pyramid.choose_level("BENCH", end - np.timedelta64(365, "D"), end, DEFAULT_POINT_BUDGET)
+        check(f"1y chart picks 1d (got {recent})", recent == "1d", failures)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
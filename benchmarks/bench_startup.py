@@ -0,0 +1,85 @@
+"""
+Measures the app's cold start and rerun latency in a fresh process.
+
+    python -m benchmarks.bench_startup --reruns 5
+
+Runs Home.py headless with Streamlit's AppTest on a synthetic replay
+recording: the first script run of the process (cold start), then a stock
+click and `--reruns` plain reruns. Prints the startup profile the app
+publishes and checks that yfinance is never imported by a replay session.
+Exits with status 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from terminal.providers import write_synthetic_recording
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SESSION = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    at = AppTest.from_file({home!r}, default_timeout=300).run()
+    cold = time.perf_counter() - started
+    at.button(key="common_stock_AAPL").click().run()
+    reruns = []
+    for _ in range({reruns}):
+        started = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - started)
+    print(json.dumps({{
+        "cold": cold, "reruns": reruns, "errors": len(at.exception),
+        "yfinance": "yfinance" in sys.modules,
+    }}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-startup-") as root:
+        write_synthetic_recording(os.path.join(root, "replay"), ["AAPL", "MSFT", "^GSPC"], years=5)
+        # No off-hours fundamentals prefetch competing with the timed runs
+        env = dict(os.environ, ML_TERMINAL_PROVIDER="replay", ML_TERMINAL_DATA_DIR=root,
+                   ML_TERMINAL_REPLAY_DIR=os.path.join(root, "replay"), ML_TERMINAL_PREFETCH_INTERVAL="0",
+                   PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+        script = SESSION.format(home=os.path.join(ROOT, "Home.py"), reruns=args.reruns)
+        output = subprocess.run([sys.executable, "-c", script], env=env, cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        with open(os.path.join(root, "profile.json")) as f:
+            profile = json.load(f)
+
+    reruns = sorted(result["reruns"])
+    print(f"cold start (first run incl. imports): {result['cold']:.2f} s")
+    print(f"Home.py imports:                      {profile['imports'].get('Home.py imports', 0):.2f} s")
+    if reruns:
+        print(f"rerun p50 / max:                      {reruns[len(reruns) // 2]:.3f} / {reruns[-1]:.3f} s")
+    for name, stats in profile['reruns'].items():
+        if name.endswith("upstream calls"):
+            print(f"  {name:<30} p50 {stats['p50']:7.1f}     p95 {stats['p95']:7.1f}")
+        else:
+            print(f"  {name:<30} p50 {stats['p50'] * 1000:7.1f} ms  p95 {stats['p95'] * 1000:7.1f} ms")
+
+    failed = False
+    if result["errors"]:
+        print(f"FAIL {result['errors']} exceptions in the app")
+        failed = True
+    if result["yfinance"]:
+        print("FAIL yfinance was imported by a replay session")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Benchmark suite for the terminal's hot paths, run against synthetic replayed data.
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --compare bench.json --fail-on-regression
+    python -m benchmarks.suite --filter indicators
+
+Covers load_stock_data with company info (cold and warm store), the price-only
+load that gates the Overview chart, fetch_stock_data's cached path (a shared
+cache miss that tops up the store and pools the history, and a hit), fetch_market_overview, a 100 symbol watchlist read, a one
+year walk-forward prediction, a 10k path Monte Carlo forecast, an SMA
+backtest sweep, calculate_technical_indicators (full and one appended bar),
+the downsampled Technical Analysis lines and the Overview candlestick figure
+at daily 1y/10y/30y and 1-minute bar sizes. Every case reports p50/p95 latency,
+throughput and peak traced memory. Results are written as JSON so runs can be
+compared against a stored baseline.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.bench_market_overview import OVERVIEW_SYMBOLS
+from terminal.backtest import backtest
+from terminal.barstore import BarStore
+from terminal.cache import SharedCache
+from terminal.charts import build_price_figure, line_chart_data
+from terminal.columnar import BufferPool
+from terminal.data import date_range_key, load_market_overview, load_price_data, load_shared_price_data, load_stock_data
+from terminal.indicators import MAX_WINDOW, IndicatorEngine
+from terminal.montecarlo import simulate_fan
+from terminal.prediction import predict_history
+from terminal.providers import ReplayProvider, synthetic_history, write_synthetic_recording
+from terminal.pyramid import BarPyramid
+from terminal.quotes import QuoteTable, make_quote
+from terminal.screener import PricePanel
+from terminal.store import HistoryStore
+
+# Bars per history size; daily sizes use business days, intraday 1-minute bars
+SIZES = {
+    "1y": (252, "B"),
+    "10y": (2520, "B"),
+    "30y": (7560, "B"),
+    "1m_1d": (390, "min"),
+    "1m_1mo": (390 * 21, "min"),
+    "1m_1y": (390 * 252, "min"),
+}
+
+STOCK_SYMBOL = "BENCH"
+
+
+class Case:
+    """A named benchmark; `run` is timed, `rows` is used for rows/s throughput"""
+
+    def __init__(self, name: str, run: Callable[[], object], rows: int = 0,
+                 extra: Optional[Callable[[], Dict]] = None):
+        self.name = name
+        self.run = run
+        self.rows = rows
+        self.extra = extra
+
+
+def measure(case: Case, iterations: int, warmup: int = 1) -> Dict:
+    """Times `case.run` and records peak memory on one extra traced run"""
+    for _ in range(warmup):
+        case.run()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        case.run()
+        samples.append(time.perf_counter() - start)
+
+    # Traced separately, tracemalloc slows allocation heavy code down
+    tracemalloc.start()
+    case.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = np.array(samples)
+    mean = float(samples.mean())
+    result = {
+        "iterations": iterations,
+        "p50_ms": float(np.percentile(samples, 50) * 1000),
+        "p95_ms": float(np.percentile(samples, 95) * 1000),
+        "mean_ms": mean * 1000,
+        "ops_per_sec": 1 / mean if mean else float("inf"),
+        "peak_mem_mb": peak / 2**20,
+    }
+    if case.rows:
+        result["rows"] = case.rows
+        result["rows_per_sec"] = case.rows / mean if mean else float("inf")
+    if case.extra:
+        result.update(case.extra())
+    return result
+
+
+def build_cases(workdir: str, latency: float) -> List[Case]:
+    replay_root = os.path.join(workdir, "replay")
+    write_synthetic_recording(replay_root, [STOCK_SYMBOL] + OVERVIEW_SYMBOLS, years=30)
+    provider = ReplayProvider(replay_root, latency=latency)
+    cases = []
+
+    # load_stock_data: an empty store every run, then a store that only tops up
+    cold_runs = iter(range(10**9))
+    cases.append(Case(
+        "load_stock_data/cold",
+        lambda: load_stock_data(
+            STOCK_SYMBOL, provider, HistoryStore(os.path.join(workdir, f"cold{next(cold_runs)}"))
+        ),
+    ))
+    warm_store = HistoryStore(os.path.join(workdir, "warm"))
+    load_stock_data(STOCK_SYMBOL, provider, warm_store)
+    cases.append(Case(
+        "load_stock_data/warm",
+        lambda: load_stock_data(STOCK_SYMBOL, provider, warm_store),
+    ))
+
+    # fetch_stock_data as the app runs it: the shared cache in front of the
+    # pooled load, empty every run (an expired entry) and then hit by a rerun
+    pool = BufferPool()
+    pyramid = BarPyramid(BarStore(os.path.join(workdir, "levels")), base="1d")
+    key = (STOCK_SYMBOL, "stock", date_range_key(None, None))
+    load = partial(load_shared_price_data, STOCK_SYMBOL, None, None, provider, warm_store, pool, pyramid,
+                   MAX_WINDOW)
+    cases.append(Case(
+        "fetch_stock_data/cache_miss",
+        lambda: SharedCache().get_or_fetch(key, load, ttl=60),
+    ))
+    shared_cache = SharedCache()
+    shared_cache.get_or_fetch(key, load, ttl=3600)
+    cases.append(Case(
+        "fetch_stock_data/cache_hit",
+        lambda: shared_cache.get_or_fetch(key, load, ttl=3600),
+    ))
+    # What the app waits for before the Overview chart, company info loads behind it
+    cases.append(Case(
+        "fetch_price_data/warm",
+        lambda: load_price_data(STOCK_SYMBOL, provider, warm_store),
+    ))
+
+    indices = {"Overview": [{"symbol": s, "name": s} for s in OVERVIEW_SYMBOLS]}
+    cases.append(Case(
+        "fetch_market_overview",
+        lambda: load_market_overview(indices, provider.quote),
+        rows=len(OVERVIEW_SYMBOLS),
+    ))
+
+    # Rendering a 100 symbol watchlist from the quote table
+    watchlist = [f"W{i:03d}" for i in range(100)]
+    quote_table = QuoteTable()
+    quote_table.update({s: make_quote(s, 100.0 + i, 99.0) for i, s in enumerate(watchlist)})
+    cases.append(Case(
+        "watchlist/snapshot_100",
+        lambda: quote_table.snapshot(watchlist, max_age=15),
+        rows=len(watchlist),
+    ))
+
+    # Walk-forward prediction scored on the last year of four years of daily bars
+    prediction_history = synthetic_history(252 * 4, seed=2)
+    cases.append(Case(
+        "prediction/walk_forward_1y",
+        lambda: predict_history(prediction_history, start=prediction_history.index[-252]),
+        rows=252,
+    ))
+
+    # Monte Carlo fan over a one year horizon, rows are simulated paths
+    cases.append(Case(
+        "forecast/gbm_10k_1y",
+        lambda: simulate_fan(prediction_history, horizon=252, paths=10_000),
+        rows=10_000,
+    ))
+
+    # SMA crossover sweep, 20 parameter sets over 50 symbols x 10 years
+    sweep_panel = PricePanel.from_histories({f"B{i:02d}": synthetic_history(2520, seed=i) for i in range(50)})
+    cases.append(Case(
+        "backtest/sma_sweep_50",
+        lambda: backtest(sweep_panel, "sma_cross", max_workers=1),
+        rows=50 * 2520,
+    ))
+
+    for label, (bars, freq) in SIZES.items():
+        history = synthetic_history(bars, seed=1, freq=freq)
+        cases.append(Case(
+            f"indicators/full/{label}",
+            lambda h=history: IndicatorEngine().update(h),
+            rows=bars,
+        ))
+
+        # A revised last bar costs the same as one appended bar; alternating two
+        # versions of it keeps every timed call on the incremental path
+        warm = IndicatorEngine()
+        warm.update(history)
+        revised = history.copy()
+        revised.iloc[-1, revised.columns.get_loc('Close')] *= 1.001
+        frames = itertools.cycle((history, revised))
+        cases.append(Case(
+            f"indicators/append/{label}",
+            lambda engine=warm, frames=frames: engine.update(next(frames)),
+            rows=1,
+        ))
+
+        cases.append(Case(
+            f"figure/{label}",
+            lambda h=history: build_price_figure(h),
+            rows=bars,
+            extra=lambda h=history: {"payload_kb": len(build_price_figure(h).to_json()) / 1024},
+        ))
+
+        indicators = IndicatorEngine().update(history)
+        cases.append(Case(
+            f"lines/{label}",
+            lambda df=indicators: line_chart_data(df, ['Close', 'SMA_20', 'SMA_50'], method="lttb"),
+            rows=bars,
+        ))
+    return cases
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Prints p50 ratios against a baseline and returns the regressed case names"""
+    regressions = []
+    print(f"\n{'case':<28} {'p50 ms':>10} {'base ms':>10} {'ratio':>7}")
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<28} {current['p50_ms']:>10.2f} {'-':>10} {'new':>7}")
+            continue
+        ratio = current["p50_ms"] / base["p50_ms"] if base["p50_ms"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<28} {current['p50_ms']:>10.2f} {base['p50_ms']:>10.2f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--filter", default="", help="only run cases containing this text")
+    parser.add_argument("--latency", type=float, default=0.0, help="replayed upstream latency (s)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50 ratio counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="ml-terminal-bench-") as workdir:
+        for case in build_cases(workdir, args.latency):
+            if args.filter not in case.name:
+                continue
+            results[case.name] = measure(case, args.iterations)
+            r = results[case.name]
+            rate = f"{r['rows_per_sec']:>12,.0f} rows/s" if "rows_per_sec" in r else f"{r['ops_per_sec']:>12,.1f} ops/s"
+            print(f"{case.name:<28} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+                  f"{rate}  peak {r['peak_mem_mb']:>7.1f} MB")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "latency": args.latency,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Data and analytics helpers for the M&L Stock Analysis Terminal.
+
+Modules in this package must not import streamlit so they can be reused
+outside of the Home.py app.
+"""
@@ -0,0 +1,246 @@
+"""
+Vectorized backtests of indicator signals over many symbols and parameters.
+
+Strategies turn a (bars x symbols) close panel from the screener into long or
+flat positions with array operations only: moving averages come from one
+cumulative sum, exponential averages share one time loop across all symbols,
+and entry/exit rules are forward filled rather than stepped bar by bar. Each
+parameter set of a grid is evaluated for every symbol at once; large grids
+are split over one process per core.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from terminal.indicators import MACD_FAST, MACD_SIGN, MACD_SLOW, RSI_WINDOW
+from terminal.rolling import ewm, window_total
+from terminal.screener import PricePanel
+
+# Parameter grids swept when none is given
+DEFAULT_GRIDS: Dict[str, Dict[str, list]] = {
+    "sma_cross": {"fast": [5, 10, 20, 30, 50], "slow": [50, 100, 150, 200]},
+    "rsi": {"window": [RSI_WINDOW], "lower": [20, 25, 30, 35], "upper": [55, 60, 65, 70, 75]},
+    "macd": {"fast": [8, MACD_FAST, 16], "slow": [MACD_SLOW, 35], "signal": [5, MACD_SIGN]},
+}
+STRATEGIES = tuple(DEFAULT_GRIDS)
+
+# Cost of a position change, in basis points of the traded value
+DEFAULT_FEE_BPS = 5.0
+
+# Panel cells x parameter sets above which the grid is split over processes
+PARALLEL_CELLS = 20_000_000
+
+TRADING_DAYS = 252
+
+METRIC_COLUMNS = ['total_return', 'buy_hold_return', 'sharpe', 'max_drawdown', 'trades', 'exposure']
+
+
+def parameter_grid(strategy: str, grid: Optional[Dict[str, list]] = None) -> List[Dict]:
+    """Every combination of a grid, skipping ones where a fast window is not below the slow one"""
+    if strategy not in DEFAULT_GRIDS:
+        raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+    grid = grid or DEFAULT_GRIDS[strategy]
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    if strategy in ("sma_cross", "macd"):
+        combos = [c for c in combos if c["fast"] < c["slow"]]
+    if strategy == "rsi":
+        combos = [c for c in combos if c["lower"] < c["upper"]]
+    return combos
+
+
+class _Signals:
+    """Indicator arrays for one close panel, each window computed once"""
+
+    def __init__(self, close: np.ndarray):
+        self.close = close
+        self.valid = ~np.isnan(close)
+        self.count = np.cumsum(self.valid, axis=0)
+        # Prices are centred per symbol so cumulative sums stay precise
+        offset = np.nanmean(close, axis=0) if close.size else 0.0
+        self.offset = np.where(np.isnan(offset), 0.0, offset)
+        self.csum = np.cumsum(np.where(self.valid, close - self.offset, 0.0), axis=0)
+        diff = np.full(close.shape, np.nan)
+        diff[1:] = close[1:] - close[:-1]
+        self.diff = np.where(self.valid & (self.count == 1), 0.0, diff)
+        self.returns = bar_returns(close)
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def _cached(self, key: tuple, build) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def sma(self, window: int) -> np.ndarray:
+        def build():
+            full = window_total(self.count, window) == window
+            return np.where(full, window_total(self.csum, window) / window + self.offset, np.nan)
+        return self._cached(("sma", window), build)
+
+    def ema(self, span: int) -> np.ndarray:
+        return self._cached(("ema", span), lambda: ewm(self.close, 2 / (span + 1)))
+
+    def rsi(self, window: int) -> np.ndarray:
+        def build():
+            up = ewm(np.maximum(self.diff, 0.0), 1 / window)
+            down = ewm(np.maximum(-self.diff, 0.0), 1 / window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+            return np.where(self.count >= window, rsi, np.nan)
+        return self._cached(("rsi", window), build)
+
+    def macd(self, fast: int, slow: int, signal: int) -> tuple:
+        def build():
+            macd = np.where(self.count >= slow, self.ema(fast) - self.ema(slow), np.nan)
+            line = ewm(macd, 2 / (signal + 1))
+            ready = np.cumsum(~np.isnan(macd), axis=0) >= signal
+            return macd, np.where(ready, line, np.nan)
+        return self._cached(("macd", fast, slow, signal), build)
+
+
+def _hold_between(entry: np.ndarray, exit: np.ndarray) -> np.ndarray:
+    """1 from each entry bar until the next exit bar, 0 otherwise, via forward fill"""
+    rows = np.arange(entry.shape[0])[:, None]
+    last_entry = np.maximum.accumulate(np.where(entry, rows, -1), axis=0)
+    last_exit = np.maximum.accumulate(np.where(exit & ~entry, rows, -1), axis=0)
+    return (last_entry > last_exit).astype(float)
+
+
+def positions(signals: _Signals, strategy: str, params: Dict) -> np.ndarray:
+    """Position at each bar's close (1 long, 0 flat), shape (bars, symbols)"""
+    with np.errstate(invalid='ignore'):
+        if strategy == "sma_cross":
+            return (signals.sma(params["fast"]) > signals.sma(params["slow"])).astype(float)
+        if strategy == "rsi":
+            rsi = signals.rsi(params["window"])
+            return _hold_between(rsi < params["lower"], rsi > params["upper"])
+        if strategy == "macd":
+            macd, line = signals.macd(params["fast"], params["slow"], params["signal"])
+            return (macd > line).astype(float)
+    raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+
+
+def bar_returns(close: np.ndarray) -> np.ndarray:
+    """Simple return of each bar over the previous close, 0 where either is missing"""
+    returns = np.zeros(close.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns[1:] = np.nan_to_num(close[1:] / close[:-1] - 1)
+    return returns
+
+
+def strategy_returns(returns: np.ndarray, position: np.ndarray, fee_bps: float = DEFAULT_FEE_BPS) -> np.ndarray:
+    """
+    Per-bar returns of trading `position`, net of fees
+
+    The position taken at one close is held until the next, so a signal never
+    trades on the bar it was computed from.
+
+    Parameters:
+        returns (np.ndarray): Output of bar_returns
+        position (np.ndarray): Position at each close, same shape
+        fee_bps (float): Cost per position change in basis points
+    """
+    held = np.zeros(returns.shape)
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(held, axis=0, prepend=0.0))
+    return held * returns - turnover * fee_bps / 1e4
+
+
+def _metrics(signals: _Signals, position: np.ndarray, fee_bps: float, start: int) -> Dict[str, np.ndarray]:
+    """Per-symbol performance of one position array from bar `start` on"""
+    net = strategy_returns(signals.returns, position, fee_bps)[start:]
+    close = signals.close[start:]
+    position = position[start:]
+    valid = ~np.isnan(close)
+    bars = np.maximum(valid.sum(axis=0), 1)
+
+    equity = np.exp(np.cumsum(np.log1p(net), axis=0))
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+    mean = net.sum(axis=0) / bars
+    std = np.sqrt(np.maximum((net * net).sum(axis=0) / bars - mean * mean, 0.0))
+    first = np.argmax(valid, axis=0)
+    first_close = close[first, np.arange(close.shape[1])]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'total_return': equity[-1] - 1 if len(equity) else np.zeros(close.shape[1]),
+            'buy_hold_return': close[-1] / first_close - 1,
+            'sharpe': np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), 0.0),
+            'max_drawdown': drawdown.min(axis=0) if len(drawdown) else np.zeros(close.shape[1]),
+            'trades': np.abs(np.diff(position, axis=0)).sum(axis=0),
+            'exposure': np.where(valid, position, 0.0).sum(axis=0) / bars,
+        }
+
+
+def _run_grid(close: np.ndarray, symbols: List[str], strategy: str, params: List[Dict],
+              fee_bps: float, start: int) -> pd.DataFrame:
+    signals = _Signals(close)
+    frames = []
+    for p in params:
+        metrics = _metrics(signals, positions(signals, strategy, p), fee_bps, start)
+        frame = pd.DataFrame(metrics, index=pd.Index(symbols, name='Symbol'))
+        for name, value in reversed(p.items()):
+            frame.insert(0, name, value)
+        frames.append(frame)
+    return pd.concat(frames) if frames else pd.DataFrame(columns=METRIC_COLUMNS)
+
+
+def backtest(
+    panel: PricePanel,
+    strategy: str = "sma_cross",
+    grid: Optional[Dict[str, list]] = None,
+    fee_bps: float = DEFAULT_FEE_BPS,
+    start: int = 0,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Backtests every parameter set of a grid on every symbol of a panel
+
+    Parameters:
+        panel (PricePanel): Close prices of the universe
+        strategy (str): "sma_cross" (long while SMA fast > SMA slow), "rsi"
+            (long from RSI < lower until RSI > upper) or "macd" (long while
+            MACD > its signal line)
+        grid (Dict[str, list]): Values per parameter, DEFAULT_GRIDS[strategy] by default
+        fee_bps (float): Cost per position change in basis points
+        start (int): First bar scored; earlier bars only warm up the indicators
+        max_workers (int): Processes for large grids, one per core by default
+
+    Returns:
+        pd.DataFrame: One row per parameter set and symbol with the parameter
+        values and METRIC_COLUMNS, indexed by symbol
+    """
+    params = parameter_grid(strategy, grid)
+    workers = max_workers or os.cpu_count() or 1
+    if workers > 1 and len(params) > 1 and panel.close.size * len(params) > PARALLEL_CELLS:
+        chunks = [c for c in np.array_split(np.arange(len(params)), workers) if len(c)]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = [
+                pool.submit(_run_grid, panel.close, panel.symbols, strategy,
+                            [params[i] for i in chunk], fee_bps, start)
+                for chunk in chunks
+            ]
+            return pd.concat([f.result() for f in futures])
+    return _run_grid(panel.close, panel.symbols, strategy, params, fee_bps, start)
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Mean metrics per parameter set across symbols, best Sharpe ratio first"""
+    params = [c for c in results.columns if c not in METRIC_COLUMNS]
+    summary = results.groupby(params)[METRIC_COLUMNS].mean()
+    return summary.sort_values('sharpe', ascending=False)
+
+
+def equity_curve(history: pd.DataFrame, strategy: str, params: Dict,
+                 fee_bps: float = DEFAULT_FEE_BPS, start: int = 0) -> pd.DataFrame:
+    """Growth of 1 for one symbol under a strategy and under buy and hold, from bar `start`"""
+    close = history['Close'].to_numpy(dtype=float)[:, None]
+    signals = _Signals(close)
+    net = strategy_returns(signals.returns, positions(signals, strategy, params), fee_bps)[start:, 0]
+    return pd.DataFrame({
+        'Strategy': np.exp(np.cumsum(np.log1p(net))),
+        'Buy & Hold': close[start:, 0] / close[start, 0],
+    }, index=history.index[start:])
@@ -0,0 +1,207 @@
+"""
+Append-only, memory-mapped OHLCV bar files for long daily and intraday histories.
+
+Each symbol and interval has one binary file: a fixed 64 byte header followed
+by fixed size records (timestamp, open, high, low, close, volume). Reads map
+the file and return a view of the records in a time range, located by binary
+search on the timestamps, so only the pages of the requested range are ever
+touched.
+"""
+import bisect
+import os
+import struct
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from terminal.store import DATA_DIR, symbol_filename
+
+# Timestamps are UTC nanoseconds, prices and volume float64
+RECORD = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+MAGIC = b"MLBARS01"
+HEADER_SIZE = 64
+# magic, record size, then the time zone name bars are shown in
+_HEADER = struct.Struct("<8sI52s")
+
+_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+def to_records(df: pd.DataFrame) -> np.ndarray:
+    """OHLCV DataFrame with a DatetimeIndex to an array of RECORD"""
+    index = df.index
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    records = np.empty(len(df), dtype=RECORD)
+    records["ts"] = index.to_numpy(dtype="datetime64[ns]").view("i8")
+    for field, column in _COLUMNS.items():
+        records[field] = df[column].to_numpy(dtype=float) if column in df else np.nan
+    return records
+
+
+def to_frame(records: np.ndarray, tz: Optional[str] = None) -> pd.DataFrame:
+    """RECORD array to an OHLCV DataFrame in the given time zone"""
+    index = pd.DatetimeIndex(records["ts"].astype("datetime64[ns]"), name="Date")
+    if tz:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return pd.DataFrame({column: records[field] for field, column in _COLUMNS.items()}, index=index)
+
+
+class BarStore:
+    """
+    Per-symbol, per-interval bar files under `root`
+
+    Appends only add bars newer than the last stored one; a bar with the same
+    timestamp as the last one replaces it, since that bar may have been
+    partial. Files are mapped read-only and the mapping is reopened when the
+    file has grown.
+
+    Parameters:
+        root (str): Folder holding one subfolder of bar files per symbol
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(DATA_DIR, "bars")
+        os.makedirs(self.root, exist_ok=True)
+        self._maps: Dict[str, Tuple[int, np.ndarray]] = {}
+        self._zones: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol_filename(symbol, ""), f"{interval}.bars")
+
+    def _lock(self, path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _header(self, path: str) -> Tuple[int, str]:
+        with open(path, "rb") as f:
+            magic, record_size, tz = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC or record_size != RECORD.itemsize:
+            raise ValueError(f"{path} is not a bar file of this layout")
+        return record_size, tz.rstrip(b"\0").decode()
+
+    def timezone(self, symbol: str, interval: str) -> Optional[str]:
+        path = self.path(symbol, interval)
+        if path not in self._zones:
+            if not os.path.exists(path):
+                return None
+            self._zones[path] = self._header(path)[1]
+        return self._zones[path] or None
+
+    def records(self, symbol: str, interval: str) -> np.ndarray:
+        """All stored bars as a read-only memory-mapped RECORD array"""
+        path = self.path(symbol, interval)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return np.empty(0, dtype=RECORD)
+        cached = self._maps.get(path)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        count = (size - HEADER_SIZE) // RECORD.itemsize
+        if count <= 0:
+            return np.empty(0, dtype=RECORD)
+        self._header(path)
+        mapped = np.memmap(path, dtype=RECORD, mode="r", offset=HEADER_SIZE, shape=(count,))
+        self._maps[path] = (size, mapped)
+        return mapped
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[pd.Timestamp]:
+        records = self.records(symbol, interval)
+        if not len(records):
+            return None
+        return pd.Timestamp(int(records[-1]["ts"]), tz="UTC")
+
+    def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Adds bars newer than the last stored one
+
+        Parameters:
+            symbol (str): Ticker symbol
+            interval (str): Bar size such as "1m" or "1d"
+            df (pd.DataFrame): OHLCV bars with a DatetimeIndex, oldest first
+
+        Returns:
+            int: Number of bars written, including a replaced last bar
+        """
+        if df is None or df.empty:
+            return 0
+        path = self.path(symbol, interval)
+        new = to_records(df.sort_index())
+        with self._lock(path):
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tz = str(df.index.tz) if df.index.tz is not None else ""
+                with open(path, "wb") as f:
+                    f.write(_HEADER.pack(MAGIC, RECORD.itemsize, tz.encode()).ljust(HEADER_SIZE, b"\0"))
+            stored = self.records(symbol, interval)
+            with open(path, "r+b") as f:
+                if len(stored):
+                    last = int(stored[-1]["ts"])
+                    new = new[new["ts"] >= last]
+                    if len(new) and new[0]["ts"] == last:
+                        # Overwrite the last stored bar in place
+                        f.seek(HEADER_SIZE + (len(stored) - 1) * RECORD.itemsize)
+                    else:
+                        f.seek(0, os.SEEK_END)
+                else:
+                    f.seek(0, os.SEEK_END)
+                f.write(new.tobytes())
+        return len(new)
+
+    def delete(self, symbol: str, interval: str):
+        """Removes the bar file of a symbol and interval, if there is one"""
+        path = self.path(symbol, interval)
+        with self._lock(path):
+            self._maps.pop(path, None)
+            self._zones.pop(path, None)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read(self, symbol: str, interval: str, start=None, end=None) -> np.ndarray:
+        """
+        Bars with start <= timestamp < end as a zero-copy view of the file
+
+        Parameters:
+            symbol (str): Ticker symbol
+            interval (str): Bar size
+            start: First timestamp to include, None for the first bar; naive
+                values are in the stored time zone
+            end: Timestamp to stop before, None for the last bar
+
+        Returns:
+            np.ndarray: Read-only RECORD array backed by the mapped file
+        """
+        records = self.records(symbol, interval)
+        timestamps = records["ts"]
+        tz = self.timezone(symbol, interval)
+        # bisect indexes the mapped column directly; np.searchsorted would
+        # first copy the strided column out of the file
+        i = bisect.bisect_left(timestamps, _ns(start, tz)) if start is not None else 0
+        j = bisect.bisect_left(timestamps, _ns(end, tz)) if end is not None else len(records)
+        return records[i:j]
+
+    def read_frame(self, symbol: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        """Like `read`, converted to an OHLCV DataFrame in the stored time zone"""
+        return to_frame(self.read(symbol, interval, start, end), self.timezone(symbol, interval))
+
+
+def _ns(value, tz: Optional[str] = None) -> int:
+    """Timestamp as UTC nanoseconds; naive values are taken to be in `tz`"""
+    ts = pd.Timestamp(value)
+    if ts.tz is None and tz:
+        ts = ts.tz_localize(tz)
+    if ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value)
@@ -0,0 +1,229 @@
+"""
+Headless batch analysis: price history and technical indicators for many symbols.
+
+Runs the same loading and indicator code as the app without importing
+Streamlit or Plotly, for nightly jobs over thousands of symbols:
+
+    python -m terminal.batch symbols.txt --output indicators.parquet
+    python -m terminal.batch symbols.txt --output indicators.arrow --format arrow --period 5y
+
+Histories are fetched on a bounded thread pool through the local history
+store, indicators are computed in worker processes as each history arrives,
+and rows are streamed into one Parquet or Arrow IPC file in long format
+(Symbol, Date in UTC, OHLCV and INDICATOR_COLUMNS). Progress and the final
+throughput in symbols per second are printed to stderr.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from terminal.data import load_price_data
+from terminal.indicators import INDICATOR_COLUMNS, MAX_WINDOW, IndicatorEngine
+from terminal.jobs import process_context
+from terminal.providers import MarketDataProvider, provider_from_env
+from terminal.store import PERIOD_OFFSETS, HistoryStore
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+FORMATS = ("parquet", "arrow")
+
+# Concurrent upstream requests, kept low so a provider does not throttle us
+DEFAULT_FETCH_WORKERS = 8
+
+SCHEMA = pa.schema(
+    [('Symbol', pa.string()), ('Date', pa.timestamp('us', tz='UTC'))]
+    + [(col, pa.float64()) for col in PRICE_COLUMNS + INDICATOR_COLUMNS]
+)
+
+
+def read_symbols(path: str) -> List[str]:
+    """Symbols from a file, comma or whitespace separated, '#' starting a comment"""
+    with open(path) as f:
+        text = "\n".join(line.split("#", 1)[0] for line in f)
+    return list(dict.fromkeys(s.upper() for s in re.split(r"[,\s]+", text) if s))
+
+
+def indicator_table(symbol: str, history: pd.DataFrame, warmup: int = 0) -> pa.Table:
+    """
+    Indicators for one history as rows of SCHEMA
+
+    Parameters:
+        symbol (str): Ticker symbol written in the Symbol column
+        history (pd.DataFrame): OHLCV history including warmup bars
+        warmup (int): Leading bars used only to warm up the indicators
+
+    Returns:
+        pa.Table: One row per bar after the warmup
+    """
+    df = IndicatorEngine().update(history).iloc[warmup:]
+    columns = {
+        'Symbol': pa.array(np.full(len(df), symbol, dtype=object), pa.string()),
+        'Date': pa.array(df.index.tz_convert('UTC') if df.index.tz is not None else df.index.tz_localize('UTC'),
+                         pa.timestamp('us', tz='UTC')),
+    }
+    for col in PRICE_COLUMNS + INDICATOR_COLUMNS:
+        columns[col] = pa.array(df[col].to_numpy(dtype=float), pa.float64())
+    return pa.Table.from_pydict(columns, schema=SCHEMA)
+
+
+class TableWriter:
+    """Appends tables of SCHEMA to a Parquet or Arrow IPC file"""
+
+    def __init__(self, path: str, fmt: str = "parquet"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, SCHEMA)
+        else:
+            import pyarrow.ipc as ipc
+            self._writer = ipc.new_file(path, SCHEMA)
+        self.rows = 0
+
+    def write(self, table: pa.Table):
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        self._writer.close()
+
+
+def run_batch(
+    symbols: Iterable[str],
+    write: Callable[[pa.Table], None],
+    provider: MarketDataProvider,
+    store: HistoryStore,
+    period: str = "1y",
+    fetch_workers: int = DEFAULT_FETCH_WORKERS,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Fetches every symbol's history and writes its indicator table
+
+    Fetches run on `fetch_workers` threads. Each history that arrives is sent
+    to one of `workers` processes for its indicators (computed inline with a
+    single worker), and tables are written in the order they finish. A symbol
+    that fails or has no bars is counted and skipped.
+
+    Parameters:
+        symbols (Iterable[str]): Ticker symbols
+        write (Callable): Receives each symbol's pa.Table, e.g. TableWriter.write
+        provider (MarketDataProvider): Upstream data source
+        store (HistoryStore): Local history store, only missing bars are fetched
+        period (str): History window written per symbol, a key of PERIOD_OFFSETS
+        fetch_workers (int): Concurrent history fetches
+        workers (int): Indicator processes, one per core by default
+        progress (Callable): Called with the running stats after each symbol
+
+    Returns:
+        Dict: symbols, written, failed (symbol -> error), rows, seconds and
+        symbols_per_second
+    """
+    symbols = list(symbols)
+    offset = PERIOD_OFFSETS.get(period)
+    start = None if offset is None else pd.Timestamp.now().normalize() - offset
+    workers = workers or os.cpu_count() or 1
+    stats = {'symbols': len(symbols), 'written': 0, 'failed': {}, 'rows': 0}
+    began = time.perf_counter()
+
+    def load(symbol: str) -> Optional[Dict]:
+        # Extra bars before the start so SMA_200 is defined from the first written bar
+        return load_price_data(symbol, provider, store, period, start=start, warmup=MAX_WINDOW)
+
+    def finish(symbol: str, result: Callable[[], pa.Table]):
+        try:
+            table = result()
+            write(table)
+            stats['written'] += 1
+            stats['rows'] += table.num_rows
+        except Exception as e:
+            stats['failed'][symbol] = str(e) or type(e).__name__
+        if progress is not None:
+            progress(stats)
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=process_context()) if workers > 1 else None
+    try:
+        with ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="batch-fetch") as fetcher:
+            fetches = {symbol: fetcher.submit(load, symbol) for symbol in symbols}
+            computing: Dict[str, Future] = {}
+            for symbol, fetch in fetches.items():
+                data = fetch.result() if fetch.exception() is None else None
+                if data is None:
+                    # Records the fetch error, or the missing data
+                    finish(symbol, partial(_no_table, fetch))
+                    continue
+                args = (symbol, data['indicator_history'], data['warmup'])
+                if pool is None:
+                    finish(symbol, partial(indicator_table, *args))
+                else:
+                    computing[symbol] = pool.submit(indicator_table, *args)
+                # Write whatever finished meanwhile so results do not pile up in memory
+                for done in [s for s, f in computing.items() if f.done()]:
+                    finish(done, computing.pop(done).result)
+            for symbol, future in computing.items():
+                finish(symbol, future.result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    stats['seconds'] = time.perf_counter() - began
+    stats['symbols_per_second'] = len(symbols) / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    return stats
+
+
+def _no_table(fetch: Future) -> pa.Table:
+    fetch.result()
+    raise ValueError("no price data")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Write price history and technical indicators for many symbols")
+    parser.add_argument("symbols", help="File of symbols, comma or whitespace separated")
+    parser.add_argument("--output", required=True, help="Parquet or Arrow file to write")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="Output format, from the file extension by default")
+    parser.add_argument("--period", default="1y", choices=list(PERIOD_OFFSETS))
+    parser.add_argument("--fetch-workers", type=int, default=DEFAULT_FETCH_WORKERS)
+    parser.add_argument("--workers", type=int, default=None, help="Indicator processes, one per core by default")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("arrow" if args.output.endswith((".arrow", ".feather", ".ipc")) else "parquet")
+    symbols = read_symbols(args.symbols)
+    writer = TableWriter(args.output, fmt)
+
+    def report(stats: Dict):
+        done = stats['written'] + len(stats['failed'])
+        if done % 100 == 0 or done == stats['symbols']:
+            print(f"{done}/{stats['symbols']} symbols", file=sys.stderr)
+
+    try:
+        # Each symbol is read once, so only the ones being fetched are kept in memory
+        store = HistoryStore(max_frames=args.fetch_workers)
+        stats = run_batch(symbols, writer.write, provider_from_env(), store, args.period,
+                          args.fetch_workers, args.workers, report)
+    finally:
+        writer.close()
+
+    for symbol, error in stats['failed'].items():
+        print(f"{symbol}: {error}", file=sys.stderr)
+    print(
+        f"Wrote {stats['rows']:,} rows for {stats['written']} of {stats['symbols']} symbols to "
+        f"{args.output} in {stats['seconds']:.1f} s ({stats['symbols_per_second']:.1f} symbols/s)",
+        file=sys.stderr,
+    )
+    return 0 if stats['written'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Process-wide TTL/LRU cache with single-flight request coalescing."""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SharedCache:
+    """
+    Thread-safe cache shared by every session of the app
+
+    Keys are usually (symbol, data kind, range) tuples. Entries expire after
+    their TTL and the least recently used entry is evicted once `maxsize` is
+    reached. Concurrent misses for the same key are coalesced: the first
+    caller runs the fetch and everyone else waits for its result.
+
+    Parameters:
+        maxsize (int): Maximum number of entries kept
+        ttl (float): Default time to live in seconds
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns a fresh cached value or None, without fetching"""
+        with self._lock:
+            return self._lookup(key)
+
+    def _lookup(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]):
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Returns the cached value for `key`, calling `fetch` at most once across threads
+
+        A None result is handed to the waiting callers but not cached, so a
+        failed lookup is retried on the next call. Exceptions raised by
+        `fetch` propagate to every coalesced caller.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                return value
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                self._stats["misses"] += 1
+                future = Future()
+                self._inflight[key] = future
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if value is not None:
+                self._store(key, value, ttl)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss, coalesced and eviction counters plus the current size"""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
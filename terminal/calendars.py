@@ -0,0 +1,293 @@
+"""
+Trading session calendars for the exchanges the terminal shows.
+
+Each calendar precomputes its sessions as sorted UTC open/close arrays plus a
+per-day index into them, so `is_open` and `next_open` are constant time.
+Calendars are picked from the ticker: `.NS`/`.BO` and the NIFTY/SENSEX
+indices trade on NSE/BSE hours, `=X` pairs trade 24 hours on weekdays, `-USD`
+crypto pairs never close, and everything else follows NYSE/NASDAQ.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional, Set
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+DAY = 86400
+
+# File of further NSE holidays, one ISO date per line, for years not listed
+# in NSE_ANNOUNCED_HOLIDAYS yet
+NSE_HOLIDAYS_FILE = os.environ.get("ML_TERMINAL_NSE_HOLIDAYS") or None
+
+logger = logging.getLogger(__name__)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday of a month, n=-1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> Optional[date]:
+    """NYSE observance: Saturday holidays move to Friday, Sunday ones to Monday"""
+    if day.weekday() == 5:
+        # New Year's Day on a Saturday is not observed on the Friday before
+        return None if (day.month, day.day) == (1, 1) else day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> Set[date]:
+    """Full day NYSE/NASDAQ closures for a year"""
+    days = [
+        _observed(date(year, 1, 1)),
+        _nth_weekday(year, 1, 0, 3),        # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),        # Presidents' Day
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),       # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),        # Labor Day
+        _nth_weekday(year, 11, 3, 4),       # Thanksgiving
+        _observed(date(year, 12, 25)),
+    ]
+    if year >= 2022:
+        days.append(_observed(date(year, 6, 19)))  # Juneteenth
+    return {d for d in days if d is not None}
+
+
+def nyse_early_closes(year: int) -> Set[date]:
+    """Days NYSE/NASDAQ close at 13:00"""
+    days = {
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),  # Day after Thanksgiving
+        date(year, 12, 24),
+    }
+    return {d for d in days if d.weekday() < 5} - nyse_holidays(year)
+
+
+# Trading holidays announced by NSE for the year, on top of the fixed-date ones.
+# Festival dates follow the lunar calendar and are published every December.
+NSE_ANNOUNCED_HOLIDAYS = {
+    2025: [
+        "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14",
+        "2025-04-18", "2025-08-27", "2025-10-21", "2025-10-22", "2025-11-05",
+    ],
+    2026: [
+        "2026-01-15", "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03",
+        "2026-04-14", "2026-05-28", "2026-06-26", "2026-09-14", "2026-10-20",
+        "2026-11-10", "2026-11-24",
+    ],
+}
+
+_unlisted_years: Set[int] = set()
+
+
+def _nse_holidays_file() -> Dict[int, Set[date]]:
+    """Holidays from NSE_HOLIDAYS_FILE by year, empty without the file"""
+    by_year: Dict[int, Set[date]] = {}
+    if NSE_HOLIDAYS_FILE and os.path.exists(NSE_HOLIDAYS_FILE):
+        with open(NSE_HOLIDAYS_FILE) as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    day = date.fromisoformat(line)
+                    by_year.setdefault(day.year, set()).add(day)
+    return by_year
+
+
+def nse_holidays(year: int) -> Set[date]:
+    """
+    NSE/BSE closures: fixed-date national holidays plus the announced list
+
+    A year found neither in NSE_ANNOUNCED_HOLIDAYS nor in NSE_HOLIDAYS_FILE
+    is logged once, its festival closures are then counted as trading days.
+    """
+    days = {date(year, 1, 26), date(year, 5, 1), date(year, 8, 15), date(year, 10, 2), date(year, 12, 25)}
+    days.update(date.fromisoformat(d) for d in NSE_ANNOUNCED_HOLIDAYS.get(year, []))
+    listed = _nse_holidays_file().get(year, set())
+    days.update(listed)
+    if year not in NSE_ANNOUNCED_HOLIDAYS and not listed and year not in _unlisted_years:
+        _unlisted_years.add(year)
+        logger.warning(
+            "NSE holidays for %d are not known, festival closures will be treated as trading days; "
+            "list them in the file named by ML_TERMINAL_NSE_HOLIDAYS", year
+        )
+    return days
+
+
+class ExchangeCalendar:
+    """
+    Precomputed trading sessions of one exchange
+
+    Sessions are generated for whole years around the current one and
+    extended when a lookup falls outside them.
+
+    Parameters:
+        name (str): Calendar name shown in the UI
+        sessions (Callable): Returns the (open, close) UTC epoch seconds of
+            every session in a year, in order
+    """
+
+    def __init__(self, name: str, sessions: Callable[[int], Iterable[tuple]]):
+        self.name = name
+        self._sessions = sessions
+        self._lock = threading.Lock()
+        year = datetime.now(timezone.utc).year
+        self._table = self._build(year - 1, year + 2)
+
+    def _build(self, first_year: int, last_year: int) -> tuple:
+        pairs = [p for year in range(first_year, last_year + 1) for p in self._sessions(year)]
+        opens = np.array([p[0] for p in pairs], dtype=np.int64)
+        closes = np.array([p[1] for p in pairs], dtype=np.int64)
+        base, end = _utc_year_start(first_year), _utc_year_start(last_year + 1)
+        # For every UTC day, the first session closing after the day starts
+        day_index = np.searchsorted(closes, np.arange(base, end + DAY, DAY), side="right")
+        return first_year, last_year, base, end, opens, closes, day_index
+
+    def _lookup(self, t: float) -> tuple:
+        """(opens, closes, i) where i is the first session closing after t"""
+        first_year, last_year, base, end, opens, closes, day_index = self._table
+        if not base <= t < end:
+            year = datetime.fromtimestamp(t, timezone.utc).year
+            with self._lock:
+                self._table = self._build(min(year, first_year), max(year, last_year))
+            first_year, last_year, base, end, opens, closes, day_index = self._table
+        i = int(day_index[int(t - base) // DAY])
+        # At most a couple of sessions close within one day, so this is O(1)
+        while i < len(closes) and closes[i] <= t:
+            i += 1
+        return opens, closes, i
+
+    def is_open(self, t: Optional[float] = None) -> bool:
+        """True when t (epoch seconds, default now) falls inside a session"""
+        t = time.time() if t is None else t
+        opens, _, i = self._lookup(t)
+        return i < len(opens) and opens[i] <= t
+
+    def next_open(self, t: Optional[float] = None) -> Optional[float]:
+        """t itself while a session is in progress, otherwise the next session start"""
+        t = time.time() if t is None else t
+        opens, _, i = self._lookup(t)
+        if i >= len(opens):
+            return None
+        return float(max(opens[i], t))
+
+    def seconds_until_open(self, t: Optional[float] = None) -> float:
+        """0 while a session is in progress, otherwise seconds until the next one"""
+        t = time.time() if t is None else t
+        opens = self.next_open(t)
+        return 0.0 if opens is None else opens - t
+
+
+def _daily_sessions(tz: str, open_at: str, close_at: str, holidays: Callable[[int], Set[date]],
+                    early_closes: Callable[[int], Set[date]] = lambda year: set(),
+                    early_close_at: str = "13:00") -> Callable[[int], list]:
+    """Weekday sessions between local open and close times, skipping holidays"""
+    zone = ZoneInfo(tz)
+
+    def at(day: date, hhmm: str) -> int:
+        hour, minute = map(int, hhmm.split(":"))
+        return int(datetime(day.year, day.month, day.day, hour, minute, tzinfo=zone).timestamp())
+
+    def sessions(year: int) -> list:
+        closed, early = holidays(year), early_closes(year)
+        day, out = date(year, 1, 1), []
+        while day.year == year:
+            if day.weekday() < 5 and day not in closed:
+                out.append((at(day, open_at), at(day, early_close_at if day in early else close_at)))
+            day += timedelta(days=1)
+        return out
+
+    return sessions
+
+
+def _fx_sessions(year: int) -> list:
+    """FX trades from Sunday 17:00 to Friday 17:00 New York time"""
+    zone = ZoneInfo("America/New_York")
+    out = []
+    # Start from the Sunday on or before Jan 1, weeks belong to the year they open in
+    day = date(year, 1, 1) - timedelta(days=(date(year, 1, 1).weekday() + 1) % 7)
+    while day.year <= year:
+        opens = datetime(day.year, day.month, day.day, 17, tzinfo=zone)
+        if opens.astimezone(timezone.utc).year == year:
+            out.append((int(opens.timestamp()), int((opens + timedelta(days=5)).timestamp())))
+        day += timedelta(days=7)
+    return out
+
+
+def _always_sessions(year: int) -> list:
+    """One session covering the whole year"""
+    return [(_utc_year_start(year), _utc_year_start(year + 1))]
+
+
+def _utc_year_start(year: int) -> int:
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+CALENDARS: Dict[str, ExchangeCalendar] = {}
+_CALENDAR_FACTORIES = {
+    "NYSE": lambda: _daily_sessions("America/New_York", "09:30", "16:00", nyse_holidays, nyse_early_closes),
+    "NSE": lambda: _daily_sessions("Asia/Kolkata", "09:15", "15:30", nse_holidays),
+    "FX": lambda: _fx_sessions,
+    "24/7": lambda: _always_sessions,
+}
+_CALENDARS_LOCK = threading.Lock()
+
+# Index tickers that trade on NSE/BSE hours despite having no suffix
+INDIAN_INDICES = {"^NSEI", "^BSESN", "^NSEBANK", "^CNXIT"}
+
+
+def calendar_name(symbol: str) -> str:
+    """Calendar a ticker trades on, from its Yahoo suffix"""
+    symbol = symbol.upper()
+    if symbol.endswith((".NS", ".BO")) or symbol in INDIAN_INDICES:
+        return "NSE"
+    if symbol.endswith("=X"):
+        return "FX"
+    if symbol.endswith("-USD"):
+        return "24/7"
+    return "NYSE"
+
+
+def get_calendar(name: str) -> ExchangeCalendar:
+    """Shared calendar by name, built on first use"""
+    with _CALENDARS_LOCK:
+        if name not in CALENDARS:
+            CALENDARS[name] = ExchangeCalendar(name, _CALENDAR_FACTORIES[name]())
+        return CALENDARS[name]
+
+
+def calendar_for(symbol: str) -> ExchangeCalendar:
+    return get_calendar(calendar_name(symbol))
+
+
+def is_open(symbol: str, t: Optional[float] = None) -> bool:
+    """True when the symbol's market is in session at t, default now"""
+    return calendar_for(symbol).is_open(t)
+
+
+def seconds_until_open(symbol: str, t: Optional[float] = None) -> float:
+    """0 while the symbol's market is open, otherwise seconds until it opens"""
+    return calendar_for(symbol).seconds_until_open(t)
@@ -0,0 +1,159 @@
+"""
+Plotly figure builders and Vega-Lite line specs used by the display functions in Home.py.
+
+Plotly is imported by the figure builders themselves, so code that only
+needs the downsampling helpers or line specs never loads it.
+"""
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import pandas as pd
+
+from terminal.downsample import DEFAULT_POINT_BUDGET, downsample_lines, ohlc_buckets
+from terminal.store import slice_range
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+def visible_window(history: pd.DataFrame, x_range: Optional[Tuple] = None) -> pd.DataFrame:
+    """Bars inside a zoomed (start, end) date range, all bars when there is none"""
+    if x_range is None:
+        return history
+    return slice_range(history, *x_range)
+
+
+def build_price_figure(
+    history: pd.DataFrame,
+    max_points: int = DEFAULT_POINT_BUDGET,
+    x_range: Optional[Tuple] = None,
+) -> "go.Figure":
+    """
+    Candlestick chart of an OHLC history
+
+    Bars in view are merged into at most `max_points` OHLC buckets, so the
+    payload stays bounded however long the history is. Zooming in passes a
+    narrower `x_range`, which is bucketed again at a finer resolution.
+
+    Parameters:
+        history (pd.DataFrame): DataFrame with Open, High, Low and Close columns
+        max_points (int): Largest number of candles to draw
+        x_range (Tuple): Optional (start, end) dates to show
+
+    Returns:
+        go.Figure: Figure ready for st.plotly_chart
+    """
+    import plotly.graph_objects as go
+
+    candles = ohlc_buckets(visible_window(history, x_range), max_points)
+    fig = go.Figure(data=[go.Candlestick(
+        x=candles.index,
+        open=candles['Open'],
+        high=candles['High'],
+        low=candles['Low'],
+        close=candles['Close'],
+        name='OHLC'
+    )])
+
+    fig.update_layout(
+        height=400,
+        template='plotly_dark',
+        xaxis_title="Date",
+        yaxis_title="Price ($)",
+        showlegend=False
+    )
+    return fig
+
+
+def line_chart_data(
+    df: pd.DataFrame,
+    columns: List[str],
+    max_points: int = DEFAULT_POINT_BUDGET,
+    x_range: Optional[Tuple] = None,
+    method: str = "lttb",
+) -> pd.DataFrame:
+    """
+    Columns of df for st.line_chart, limited to `max_points` rows in view
+
+    Parameters:
+        df (pd.DataFrame): Series to plot, indexed by date
+        columns (List[str]): Columns to plot
+        max_points (int): Largest number of rows to return
+        x_range (Tuple): Optional (start, end) dates to show
+        method (str): "lttb" or "minmax"
+
+    Returns:
+        pd.DataFrame: Row subset of the selected columns
+    """
+    return downsample_lines(visible_window(df, x_range)[columns], max_points, method)
+
+
+def line_chart_spec(columns: List[str], x: str = "Date") -> dict:
+    """
+    Vega-Lite spec of st.line_chart's look for a wide frame of date-indexed series
+
+    Built as a plain dict, so drawing it with st.vega_lite_chart skips the
+    Altair chart st.line_chart builds and validates on every rerun.
+
+    Parameters:
+        columns (List[str]): Series to draw, one line each
+        x (str): Date column of the data passed with the spec
+
+    Returns:
+        dict: Spec folding the columns into series and value
+    """
+    columns = [str(c) for c in columns]
+    return {
+        "transform": [{"fold": columns, "as": ["series", "value"]}],
+        "mark": {"type": "line"},
+        "encoding": {
+            "x": {"field": x, "type": "temporal", "title": None},
+            "y": {"field": "value", "type": "quantitative", "title": None, "scale": {"zero": False}},
+            "color": {"field": "series", "type": "nominal", "title": None, "sort": columns},
+            "tooltip": [
+                {"field": x, "type": "temporal"},
+                {"field": "series", "type": "nominal"},
+                {"field": "value", "type": "quantitative"},
+            ],
+        },
+    }
+
+
+def build_forecast_figure(
+    history: pd.DataFrame,
+    bands: pd.DataFrame,
+    max_points: int = DEFAULT_POINT_BUDGET,
+) -> "go.Figure":
+    """
+    Candlestick chart of the history with Monte Carlo percentile bands after it
+
+    Parameters:
+        history (pd.DataFrame): DataFrame with Open, High, Low and Close columns
+        bands (pd.DataFrame): Percentile price columns such as 'p5' ... 'p95',
+            lowest percentile first, indexed by future dates
+        max_points (int): Largest number of candles to draw
+
+    Returns:
+        go.Figure: Figure ready for st.plotly_chart
+    """
+    import plotly.graph_objects as go
+
+    fig = build_price_figure(history, max_points)
+    columns = list(bands.columns)
+    # Nested fills from the outermost percentile pair inwards, then the median
+    for i, alpha in zip(range(len(columns) // 2), (0.15, 0.3, 0.45)):
+        low, high = columns[i], columns[-1 - i]
+        fig.add_trace(go.Scatter(
+            x=bands.index, y=bands[low], mode='lines', line=dict(width=0),
+            hoverinfo='skip', name=low
+        ))
+        fig.add_trace(go.Scatter(
+            x=bands.index, y=bands[high], mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor=f'rgba(100, 255, 218, {alpha})', name=f'{low}-{high}'
+        ))
+    if len(columns) % 2:
+        median = columns[len(columns) // 2]
+        fig.add_trace(go.Scatter(
+            x=bands.index, y=bands[median], mode='lines',
+            line=dict(color='#64ffda', dash='dash'), name=median
+        ))
+    return fig
@@ -0,0 +1,189 @@
+"""
+Read-only columnar history buffers shared by every session.
+
+A ColumnarFrame keeps the numeric columns of a history in one contiguous
+block, optionally as float32, and hands out DataFrames that are views of
+that block rather than copies. A BufferPool holds the frames for all symbols
+and ranges, plus the per-symbol indicator engine state, under one server-wide
+memory budget, evicting the least recently used entries first.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Server-wide budget for pooled history buffers
+DEFAULT_BUDGET_MB = float(os.environ.get("ML_TERMINAL_MEMORY_BUDGET_MB", "512"))
+
+# Store prices and indicators as float32, halving memory at ~7 significant digits
+USE_FLOAT32 = os.environ.get("ML_TERMINAL_FLOAT32", "0") == "1"
+
+
+class ColumnarFrame:
+    """
+    One read-only (columns x bars) block plus its index
+
+    Parameters:
+        index (pd.Index): Bar timestamps
+        columns (List[str]): Column names, one row of `block` each
+        block (np.ndarray): Values, shape (len(columns), len(index))
+    """
+
+    def __init__(self, index: pd.Index, columns: List[str], block: np.ndarray):
+        block.setflags(write=False)
+        self.index = index
+        self.columns = list(columns)
+        self.block = block
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, float32: bool = USE_FLOAT32) -> "ColumnarFrame":
+        """Copies the numeric columns of df into a new block, once"""
+        numeric = df.select_dtypes("number")
+        dtype = np.float32 if float32 else np.float64
+        block = np.ascontiguousarray(numeric.to_numpy(dtype=dtype).T)
+        return cls(df.index, list(numeric.columns), block)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.block.nbytes + self.index.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column"""
+        return self.block[self.columns.index(name)]
+
+    def frame(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        DataFrame over rows [start, stop) that shares memory with the block
+
+        The block is stored columns-first, which is the layout pandas uses for
+        a single-dtype block, so no values are copied. Writing to the result
+        raises, since the block is read-only.
+        """
+        stop = len(self) if stop is None else stop
+        return pd.DataFrame(
+            self.block[:, start:stop].T,
+            index=self.index[start:stop],
+            columns=self.columns,
+            copy=False,
+        )
+
+
+class BufferPool:
+    """
+    LRU pool of ColumnarFrames under a memory budget
+
+    Sessions that ask for the same key get the same frame. Once the resident
+    bytes exceed the budget the least recently used frames are dropped from
+    the pool; sessions still holding one keep it alive until they let go.
+    Other long-lived per-symbol buffers, such as IndicatorEngine state, are
+    pooled through `get_or_create` and count against the same budget.
+
+    Parameters:
+        budget_mb (float): Largest total size of pooled entries, in megabytes
+        float32 (bool): Build new frames with float32 values
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB, float32: bool = USE_FLOAT32):
+        self.budget = int(budget_mb * 2**20)
+        self.float32 = float32
+        self._frames: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # Bytes each entry was last accounted at, entries other than frames can grow
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "builds": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self._stats["hits"] += 1
+            return frame
+
+    def _insert(self, key: Hashable, entry: Any):
+        self._frames.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
+        self._frames[key] = entry
+        self._sizes[key] = entry.nbytes
+        self._bytes += self._sizes[key]
+        self._stats["builds"] += 1
+        self._evict()
+
+    def _evict(self):
+        # Keep the newest entry even if it alone exceeds the budget
+        while self._bytes > self.budget and len(self._frames) > 1:
+            key, _ = self._frames.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self._stats["evictions"] += 1
+
+    def put(self, key: Hashable, df: pd.DataFrame) -> ColumnarFrame:
+        """Stores df as a shared frame, replacing any frame under the same key"""
+        frame = ColumnarFrame.from_frame(df, self.float32)
+        with self._lock:
+            self._insert(key, frame)
+        return frame
+
+    def get_or_build(self, key: Hashable, build: Callable[[], pd.DataFrame]) -> ColumnarFrame:
+        """Returns the pooled frame for key, building it from `build()` on a miss"""
+        frame = self.get(key)
+        if frame is None:
+            frame = self.put(key, build())
+        return frame
+
+    def get_or_create(self, key: Hashable, create: Callable[[], Any]) -> Any:
+        """
+        Returns the pooled object for key, creating it with `create()` on a miss
+
+        The object must have an `nbytes` property and a length in bars. Call
+        `resize` after it grows so the budget sees its new size.
+        """
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None:
+                self._frames.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry
+            entry = create()
+            self._insert(key, entry)
+            return entry
+
+    def resize(self, key: Hashable):
+        """Re-reads the size of a pooled object and evicts others if it outgrew the budget"""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return
+            self._frames.move_to_end(key)
+            size = entry.nbytes
+            self._bytes += size - self._sizes[key]
+            self._sizes[key] = size
+            self._evict()
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def report(self) -> pd.DataFrame:
+        """Resident bytes and bars per symbol, largest first"""
+        with self._lock:
+            rows = [
+                {"symbol": key[0] if isinstance(key, tuple) else key, "bytes": self._sizes[key], "bars": len(f)}
+                for key, f in self._frames.items()
+            ]
+        if not rows:
+            return pd.DataFrame(columns=["bytes", "bars", "buffers"])
+        report = pd.DataFrame(rows).groupby("symbol").agg(
+            bytes=("bytes", "sum"), bars=("bars", "sum"), buffers=("bytes", "size")
+        )
+        return report.sort_values("bytes", ascending=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, size=len(self._frames), bytes=self._bytes, budget=self.budget)
@@ -0,0 +1,274 @@
+"""
+Data loading behind fetch_stock_data and fetch_market_overview.
+
+Kept free of Streamlit so the same code runs in the app, the benchmarks and
+headless jobs. UI feedback is passed in as a `progress` callable that returns
+a context manager, e.g. `st.spinner`.
+"""
+from contextlib import nullcontext
+from functools import partial
+from typing import Callable, ContextManager, Dict, List, Optional
+
+import pandas as pd
+
+from terminal.barstore import BarStore
+from terminal.columnar import BufferPool
+from terminal.providers import MarketDataProvider
+from terminal.pyramid import BarPyramid
+from terminal.quotes import fetch_quotes
+from terminal.store import PERIOD_OFFSETS, HistoryStore, bars_before
+
+
+def _no_progress(message: str) -> ContextManager:
+    return nullcontext()
+
+
+def extract_earnings(income_stmt: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """Revenue and net income for the last four reported periods, or None"""
+    try:
+        if income_stmt is not None and not income_stmt.empty:
+            # Extract quarterly data
+            quarterly_data = {
+                'Revenue': income_stmt.loc['Total Revenue'].iloc[:4],
+                'Earnings': income_stmt.loc['Net Income'].iloc[:4]
+            }
+            return pd.DataFrame(quarterly_data)
+    except Exception:
+        pass
+    return None
+
+
+def load_price_data(
+    symbol: str,
+    provider: MarketDataProvider,
+    store: HistoryStore,
+    period: str = "1y",
+    start=None,
+    end=None,
+    warmup: int = 0,
+) -> Optional[Dict]:
+    """
+    Price history for a symbol, without the slower company info and statements
+
+    Parameters:
+        symbol (str): Ticker symbol
+        provider (MarketDataProvider): Upstream data source
+        store (HistoryStore): Local history store, only missing bars are fetched
+        period (str): History window to return when no start date is given
+        start: First date of the range to show, overrides period
+        end: Last date of the range to show, None for today
+        warmup (int): Bars before start kept in 'indicator_history' so long
+            windows such as SMA_200 are defined from the first shown bar
+
+    Returns:
+        Optional[Dict]: symbol, price, history, indicator_history, warmup and
+        range, None when there is no price data
+    """
+    fetch = partial(provider.history, symbol)
+    # Served from the local store, only ranges not stored yet are downloaded
+    if start is None and end is None and not warmup:
+        indicator_history = store.get_history(symbol, fetch, period=period)
+    else:
+        if start is None:
+            offset = PERIOD_OFFSETS.get(period)
+            start = None if offset is None else pd.Timestamp.now().normalize() - offset
+        indicator_history = store.get_range(symbol, fetch, start=start, end=end, warmup=warmup)
+    shown = bars_before(indicator_history, start) if start is not None else 0
+    history = indicator_history.iloc[shown:]
+
+    if history.empty:
+        return None
+
+    return {
+        'symbol': symbol,
+        'price': float(history['Close'].iloc[-1]),
+        'name': symbol,
+        'history': history,
+        'indicator_history': indicator_history,
+        'warmup': shown,
+        'range': (start, end),
+    }
+
+
+def date_range_key(start_date, end_date) -> str:
+    """Cache key part for a date range, the default one year window when unset"""
+    if start_date is None and end_date is None:
+        return "1y"
+    return f"{start_date}:{end_date}"
+
+
+def load_shared_price_data(
+    symbol: str,
+    start_date,
+    end_date,
+    provider: MarketDataProvider,
+    store: HistoryStore,
+    pool: BufferPool,
+    pyramid: BarPyramid,
+    warmup: int = 0,
+) -> Optional[Dict]:
+    """
+    load_price_data with the history moved into the shared buffer pool
+
+    Every session viewing the symbol and range reads views of the same
+    read-only block instead of holding its own DataFrame. The symbol's
+    weekly and monthly levels are brought up to date from the stored
+    daily history at the same time. This is what fetch_stock_data caches.
+    """
+    data = load_price_data(symbol, provider, store, start=start_date, end=end_date, warmup=warmup)
+    if data is None:
+        return None
+    pyramid.sync(symbol.upper(), store.load(symbol))
+    shared = pool.put(
+        (symbol.upper(), "history", date_range_key(start_date, end_date)), data['indicator_history']
+    )
+    return {**data, 'indicator_history': shared.frame(), 'history': shared.frame(data['warmup'])}
+
+
+def load_fundamentals(
+    symbol: str,
+    provider: MarketDataProvider,
+    progress: Callable[[str], ContextManager] = _no_progress,
+) -> Dict:
+    """
+    Company info and earnings for a symbol, used by the fundamentals tabs
+
+    Parameters:
+        symbol (str): Ticker symbol
+        provider (MarketDataProvider): Upstream data source
+        progress (Callable): Returns a context manager shown while each step runs
+
+    Returns:
+        Dict: name, info, earnings and has_earnings
+    """
+    with progress('Fetching company information...'):
+        info = provider.info(symbol)
+
+    # Get earnings data
+    with progress('Loading financial data...'):
+        try:
+            earnings_df = extract_earnings(provider.income_stmt(symbol))
+        except Exception:
+            earnings_df = None
+
+    return {
+        'name': info.get('longName', symbol),
+        'info': info,
+        'earnings': earnings_df,
+        'has_earnings': earnings_df is not None
+    }
+
+
+def load_stock_data(
+    symbol: str,
+    provider: MarketDataProvider,
+    store: HistoryStore,
+    period: str = "1y",
+    progress: Callable[[str], ContextManager] = _no_progress,
+    start=None,
+    end=None,
+    warmup: int = 0,
+) -> Optional[Dict]:
+    """
+    Downloads price history, company info and earnings for a symbol
+
+    The app loads the two halves separately so the price chart is not held
+    up by company info; see load_price_data and load_fundamentals.
+
+    Parameters:
+        symbol (str): Ticker symbol
+        provider (MarketDataProvider): Upstream data source
+        store (HistoryStore): Local history store, only missing bars are fetched
+        period (str): History window to return when no start date is given
+        progress (Callable): Returns a context manager shown while each step runs
+        start: First date of the range to show, overrides period
+        end: Last date of the range to show, None for today
+        warmup (int): Bars before start kept in 'indicator_history'
+
+    Returns:
+        Optional[Dict]: Stock data dictionary, None when there is no price data
+    """
+    data = load_price_data(symbol, provider, store, period, start=start, end=end, warmup=warmup)
+    if data is None:
+        return None
+    data.update(load_fundamentals(symbol, provider, progress))
+    return data
+
+
+def load_bars(
+    symbol: str,
+    provider: MarketDataProvider,
+    bar_store: BarStore,
+    interval: str = "1m",
+    start=None,
+    end=None,
+    period: str = "7d",
+) -> pd.DataFrame:
+    """
+    Bars for a time range from the memory-mapped bar store, topped up first
+
+    Only bars from the last stored one onwards are requested upstream; the
+    range itself is read from the mapped file without loading the rest.
+
+    Parameters:
+        symbol (str): Ticker symbol
+        provider (MarketDataProvider): Upstream data source
+        bar_store (BarStore): Memory-mapped bar files
+        interval (str): Bar size, e.g. "1m" or "1d"
+        start: First timestamp to return, None for the first stored bar
+        end: Timestamp to stop before, None for the last stored bar
+        period (str): How far back to download when nothing is stored yet
+
+    Returns:
+        pd.DataFrame: OHLCV bars indexed by timestamp
+    """
+    last = bar_store.last_timestamp(symbol, interval)
+    if last is None:
+        fetched = provider.history(symbol, interval=interval, period=period)
+    else:
+        fetched = provider.history(symbol, interval=interval, start=last.strftime("%Y-%m-%d"))
+    bar_store.append(symbol, interval, fetched)
+    return bar_store.read_frame(symbol, interval, start, end)
+
+
+def load_market_overview(
+    market_indices: Dict[str, List[Dict]],
+    fetch_quote: Callable[[str], Dict],
+) -> Dict[str, List[Dict]]:
+    """
+    Quotes for every index and FX pair, grouped and formatted per category
+
+    Parameters:
+        market_indices (Dict): Category name to list of {"symbol", "name"} items
+        fetch_quote (Callable): Quote function for one symbol
+
+    Returns:
+        Dict: Category name to rows with name, formatted price, change and raw price
+    """
+    symbols = [item["symbol"] for items in market_indices.values() for item in items]
+    # All indices and FX pairs are requested together, failed ones are skipped
+    quotes = fetch_quotes(symbols, fetch_quote)
+    market_data = {}
+
+    for category, items in market_indices.items():
+        market_data[category] = []
+        for item in items:
+            quote = quotes.get(item["symbol"])
+            if quote is None:
+                continue
+            current_price = quote["price"]
+
+            # Format price based on market type
+            if "Indian Markets" in category:
+                price_str = f"₹{current_price:,.2f}"
+            else:
+                price_str = f"${current_price:,.2f}"
+
+            market_data[category].append({
+                "name": item["name"],
+                "price": price_str,
+                "change": quote["change"],
+                "raw_price": current_price  # Keep raw price for sorting if needed
+            })
+
+    return market_data
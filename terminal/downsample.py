@@ -0,0 +1,173 @@
+"""
+Downsampling for charts, so the browser receives a bounded number of points.
+
+Candles are merged into OHLC buckets. Line series keep a subset of their rows
+picked by min-max or LTTB (largest triangle three buckets), which keep the
+peaks and troughs that taking every n-th row would drop. Row subsets keep the
+original index, so several series still share one x axis in st.line_chart.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Points per chart sent to the browser unless configured otherwise
+DEFAULT_POINT_BUDGET = 1500
+
+LINE_METHODS = ("lttb", "minmax")
+
+
+def _bucket_starts(n: int, buckets: int) -> np.ndarray:
+    """Start positions of `buckets` near equally sized buckets covering n rows"""
+    return np.unique(np.linspace(0, n, max(buckets, 1) + 1).astype(int)[:-1])
+
+
+def ohlc_buckets(df: pd.DataFrame, max_points: int = DEFAULT_POINT_BUDGET) -> pd.DataFrame:
+    """
+    Merges consecutive bars so at most `max_points` candles remain
+
+    Each bucket keeps the first Open, highest High, lowest Low, last Close and
+    summed Volume, and is stamped with the time of its first bar. Other
+    columns take their last value. Frames within budget are returned as is.
+
+    Parameters:
+        df (pd.DataFrame): OHLC history in time order
+        max_points (int): Largest number of candles to return
+
+    Returns:
+        pd.DataFrame: Bucketed history with the same columns
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    starts = _bucket_starts(n, max_points)
+    lasts = np.append(starts[1:], n) - 1
+
+    out = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col == 'High':
+            out[col] = np.fmax.reduceat(values.astype(float), starts)
+        elif col == 'Low':
+            out[col] = np.fmin.reduceat(values.astype(float), starts)
+        elif col == 'Open':
+            out[col] = values[starts]
+        elif col == 'Volume':
+            out[col] = np.add.reduceat(np.nan_to_num(values.astype(float)), starts)
+        else:
+            out[col] = values[lasts]
+    return pd.DataFrame(out, index=df.index[starts], columns=df.columns)
+
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Positions of the lowest and highest value in each bucket, plus both ends
+
+    Parameters:
+        values (np.ndarray): One series, NaNs are ignored
+        max_points (int): Largest number of positions to return
+
+    Returns:
+        np.ndarray: Sorted unique row positions
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 4:
+        # No room for a bucket's low and high next to the ends, keep the ends
+        return np.array([0, n - 1][:max(max_points, 0)], dtype=int)
+    buckets = max((max_points - 2) // 2, 1)
+    size = -(-n // buckets)
+    # Pad to a whole number of buckets so all of them reduce in one call
+    padded = np.full(size * buckets, np.nan)
+    padded[:n] = values
+    grid = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = np.argmin(np.where(np.isnan(grid), np.inf, grid), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(grid), -np.inf, grid), axis=1) + offsets
+    picked = np.concatenate(([0, n - 1], lows, highs))
+    return np.unique(picked[picked < n])
+
+
+def lttb_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest triangle three buckets: one row per bucket, chosen to keep the shape
+
+    The first and last rows are always kept. In each bucket in between, the
+    row forming the largest triangle with the previously kept row and the mean
+    of the next bucket is kept. x is the row position, NaN rows are skipped.
+
+    Parameters:
+        values (np.ndarray): One series
+        max_points (int): Largest number of positions to return, budgets
+            below 3 keep only the ends
+
+    Returns:
+        np.ndarray: Sorted row positions
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    n = len(valid)
+    if n <= max_points:
+        return valid
+    if max_points < 3:
+        return valid[[0, n - 1][:max(max_points, 0)]]
+    x = valid.astype(float)
+    y = values[valid].astype(float)
+
+    # Interior rows split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    # Mean point of every bucket, used as the third corner for the one before it
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / np.diff(edges)
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / np.diff(edges)
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    picked = np.empty(max_points, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        area = np.abs(
+            (x[a] - next_x[b]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[b] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        picked[b + 1] = a
+    return valid[picked]
+
+
+def downsample_lines(
+    df: pd.DataFrame,
+    max_points: int = DEFAULT_POINT_BUDGET,
+    method: str = "lttb",
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Keeps at most `max_points` rows of one or more line series
+
+    The budget is split between the columns; the rows picked for each column
+    are combined, so every series keeps its own extremes.
+
+    Parameters:
+        df (pd.DataFrame or pd.Series): Series to plot, in time order
+        max_points (int): Largest number of rows to return
+        method (str): "lttb" or "minmax"
+        columns (List[str]): Columns to pick rows for, all numeric ones by default
+
+    Returns:
+        pd.DataFrame: Row subset of df with its original index
+    """
+    if method not in LINE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {LINE_METHODS}")
+    if len(df) <= max_points:
+        return df
+    frame = df.to_frame() if isinstance(df, pd.Series) else df
+    if columns is None:
+        columns = list(frame.select_dtypes('number').columns)
+    pick = lttb_indices if method == "lttb" else minmax_indices
+    per_column = max(max_points // max(len(columns), 1), 1)
+    rows = [pick(frame[col].to_numpy(dtype=float), per_column) for col in columns]
+    rows = np.unique(np.concatenate(rows)) if rows else np.arange(0)
+    if len(rows) > max_points:
+        # Only with fewer points than columns, where each column still kept one row
+        rows = rows[np.linspace(0, len(rows) - 1, max(max_points, 0)).astype(int)]
+    return df.iloc[rows]
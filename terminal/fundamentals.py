@@ -0,0 +1,333 @@
+"""
+Persistent company fundamentals with per-field refresh intervals.
+
+Company info and income statements change daily at most, so they are kept on
+disk per symbol and only requested upstream once their fields go stale:
+statements after a quarter, ratios and ownership figures after a day.
+Intraday fields such as the market cap are repriced from the latest share
+price instead of refetching the whole info document. A prefetcher refreshes a
+universe of symbols while their exchanges are closed, so opening a symbol
+during the session needs no upstream call for its fundamentals.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+from terminal.calendars import calendar_for
+from terminal.data import extract_earnings
+from terminal.providers import MarketDataProvider
+from terminal.store import DATA_DIR, symbol_filename
+
+# Seconds each kind of field is served before it is refreshed
+QUARTERLY_TTL = 91 * 24 * 3600
+DAILY_TTL = 24 * 3600
+INTRADAY_TTL = 15 * 60
+
+# Info fields that move with the share price, repriced after INTRADAY_TTL;
+# every other info field is refetched after DAILY_TTL
+INTRADAY_FIELDS = ("marketCap", "enterpriseValue")
+
+# Seconds between prefetch passes over the universe, 0 turns prefetching off
+PREFETCH_INTERVAL = float(os.environ.get("ML_TERMINAL_PREFETCH_INTERVAL", "1800"))
+
+
+def field_ttl(field: str) -> float:
+    """Seconds an info field, or 'income_stmt', is served before it goes stale"""
+    if field == "income_stmt":
+        return QUARTERLY_TTL
+    if field in INTRADAY_FIELDS:
+        return INTRADAY_TTL
+    return DAILY_TTL
+
+
+def reprice(info: Dict, price: float) -> Dict:
+    """
+    Info with its intraday fields moved to a new share price
+
+    The market cap is shares outstanding times the price, and the enterprise
+    value moves by the same amount as the market cap.
+    """
+    shares = info.get("sharesOutstanding")
+    if not shares or not price or price != price:
+        return info
+    info = dict(info)
+    market_cap = float(shares) * float(price)
+    if info.get("enterpriseValue") and info.get("marketCap"):
+        info["enterpriseValue"] = info["enterpriseValue"] + market_cap - info["marketCap"]
+    info["marketCap"] = market_cap
+    return info
+
+
+class FundamentalsStore:
+    """
+    Company info and income statements per symbol, persisted as JSON and Parquet
+
+    Parameters:
+        root (str): Folder holding the files, data/fundamentals by default
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(DATA_DIR, "fundamentals")
+        os.makedirs(self.root, exist_ok=True)
+        # Symbol -> {'info': dict, 'fetched': {'info': t, 'income_stmt': t}}
+        self._records: Dict[str, Dict] = {}
+        self._statements: Dict[str, Optional[pd.DataFrame]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats = {"fetched": 0, "served": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _info_path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol_filename(symbol, ".json"))
+
+    def _statement_path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol_filename(symbol, ".income_stmt.parquet"))
+
+    def _count(self, stat: str):
+        # Request threads and prefetch workers count concurrently
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def _record(self, symbol: str) -> Dict:
+        record = self._records.get(symbol)
+        if record is None:
+            try:
+                with open(self._info_path(symbol)) as f:
+                    record = json.load(f)
+            except Exception:
+                # Missing or half-written, fetched again
+                record = {"info": {}, "fetched": {}}
+            self._records[symbol] = record
+        return record
+
+    def _statement(self, symbol: str) -> Optional[pd.DataFrame]:
+        if symbol not in self._statements:
+            stmt = None
+            if os.path.exists(self._statement_path(symbol)):
+                try:
+                    stmt = pd.read_parquet(self._statement_path(symbol))
+                    stmt.columns = pd.to_datetime(stmt.columns)
+                except Exception:
+                    stmt = None
+            self._statements[symbol] = stmt
+        return self._statements[symbol]
+
+    def _save_record(self, symbol: str, record: Dict):
+        tmp_path = self._info_path(symbol) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp_path, self._info_path(symbol))
+        self._records[symbol] = record
+
+    def _save_statement(self, symbol: str, stmt: Optional[pd.DataFrame]):
+        path = self._statement_path(symbol)
+        if stmt is None or stmt.empty:
+            if os.path.exists(path):
+                os.remove(path)
+            stmt = None
+        else:
+            # Parquet needs string column names, periods are restored on load
+            stored = stmt.copy()
+            stored.columns = [str(c) for c in stored.columns]
+            stored.to_parquet(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        self._statements[symbol] = stmt
+
+    def stale(self, symbol: str, fields: Optional[Iterable[str]] = None, t: Optional[float] = None) -> List[str]:
+        """
+        Parts of a symbol's fundamentals that must be fetched again
+
+        Parameters:
+            symbol (str): Ticker symbol
+            fields (Iterable[str]): Info fields the caller needs, all but the
+                intraday ones by default, plus 'income_stmt' for the statement
+            t (float): Unix time to check against, now by default
+
+        Returns:
+            List[str]: 'info' and/or 'income_stmt'
+        """
+        t = time.time() if t is None else t
+        record = self._record(symbol.upper())
+        fetched = record["fetched"]
+        wanted = ["info", "income_stmt"] if fields is None else list(fields)
+        # Intraday fields are repriced rather than fetched, so they never make info stale
+        info_ttl = min((field_ttl(f) for f in wanted if f != "income_stmt" and f not in INTRADAY_FIELDS),
+                       default=None)
+        parts = []
+        if info_ttl is not None and t - fetched.get("info", 0) > info_ttl:
+            parts.append("info")
+        if "income_stmt" in wanted and t - fetched.get("income_stmt", 0) > QUARTERLY_TTL:
+            parts.append("income_stmt")
+        return parts
+
+    def refresh(self, symbol: str, provider: MarketDataProvider, parts: Iterable[str] = ("info", "income_stmt"),
+                t: Optional[float] = None):
+        """
+        Fetches the given parts of a symbol's fundamentals and stores them
+
+        A failed fetch keeps serving the stored copy and is retried on the next
+        refresh; a failed info fetch raises when nothing is stored yet.
+        """
+        key = symbol.upper()
+        parts = list(parts)
+        record = self._record(key)
+        record = {"info": record["info"], "fetched": dict(record["fetched"])}
+        if "info" in parts:
+            try:
+                record["info"] = provider.info(symbol)
+            except Exception:
+                self._count("errors")
+                if not record["fetched"].get("info"):
+                    raise
+            else:
+                self._count("fetched")
+                record["fetched"]["info"] = time.time() if t is None else t
+        if "income_stmt" in parts:
+            try:
+                stmt = provider.income_stmt(symbol)
+            except Exception:
+                self._count("errors")
+            else:
+                self._count("fetched")
+                self._save_statement(key, stmt)
+                record["fetched"]["income_stmt"] = time.time() if t is None else t
+        self._save_record(key, record)
+
+    def load(self, symbol: str, provider: MarketDataProvider, price: Optional[float] = None,
+             t: Optional[float] = None) -> Dict:
+        """
+        Company info and earnings for a symbol, fetching only stale parts
+
+        Parameters:
+            symbol (str): Ticker symbol
+            provider (MarketDataProvider): Upstream data source for stale parts
+            price (float): Latest share price the intraday fields are repriced to
+                once they are older than INTRADAY_TTL
+            t (float): Unix time to check freshness against, now by default
+
+        Returns:
+            Dict: name, info, earnings and has_earnings, as load_fundamentals
+        """
+        key = symbol.upper()
+        t = time.time() if t is None else t
+        with self._lock(key):
+            parts = self.stale(key, t=t)
+            if parts:
+                self.refresh(symbol, provider, parts, t)
+            else:
+                self._count("served")
+            record = self._record(key)
+            earnings = extract_earnings(self._statement(key))
+        info = record["info"]
+        if price is not None and t - record["fetched"].get("info", 0) > INTRADAY_TTL:
+            info = reprice(info, price)
+        return {
+            'name': info.get('longName', symbol),
+            'info': info,
+            'earnings': earnings,
+            'has_earnings': earnings is not None
+        }
+
+    def prefetch(self, symbols: Iterable[str], provider: MarketDataProvider, workers: int = 4,
+                 t: Optional[float] = None) -> Dict:
+        """
+        Refreshes the stale fundamentals of many symbols concurrently
+
+        Returns:
+            Dict: symbols, refreshed, fresh and failed (symbol -> error)
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        stats = {"symbols": len(symbols), "refreshed": 0, "fresh": 0, "failed": {}}
+
+        def one(symbol: str):
+            with self._lock(symbol):
+                parts = self.stale(symbol, t=t)
+                if parts:
+                    self.refresh(symbol, provider, parts, t)
+            return bool(parts)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fundamentals-prefetch") as pool:
+            futures = {symbol: pool.submit(one, symbol) for symbol in symbols}
+        for symbol, future in futures.items():
+            try:
+                stats["refreshed" if future.result() else "fresh"] += 1
+            except Exception as e:
+                stats["failed"][symbol] = str(e) or type(e).__name__
+        return stats
+
+    def stats(self) -> Dict[str, int]:
+        """Upstream fetches, loads served from the store and fetch errors so far"""
+        with self._stats_lock:
+            return {**self._stats, "symbols": len(self._records)}
+
+
+class FundamentalsPrefetcher:
+    """
+    Keeps a universe of symbols' fundamentals fresh while their markets are closed
+
+    A daemon thread passes over the universe every `interval` seconds and
+    refreshes the stale symbols whose exchange is not in session, so the
+    upstream is not queried while prices are moving.
+
+    Parameters:
+        store (FundamentalsStore): Store to refresh
+        provider (MarketDataProvider): Upstream data source
+        symbols (Iterable[str]): Initial universe, more can be added later
+        interval (float): Seconds between passes
+        workers (int): Concurrent fetches during a pass
+    """
+
+    def __init__(self, store: FundamentalsStore, provider: MarketDataProvider, symbols: Iterable[str] = (),
+                 interval: float = PREFETCH_INTERVAL, workers: int = 4):
+        self.store = store
+        self.provider = provider
+        self.interval = interval
+        self.workers = workers
+        self._universe: Set[str] = {s.upper() for s in symbols}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.last_pass: Optional[Dict] = None
+
+    def add(self, symbols: Iterable[str]):
+        """Adds symbols to the universe, e.g. a session's watchlist"""
+        with self._lock:
+            self._universe.update(s.upper() for s in symbols)
+
+    def universe(self) -> List[str]:
+        with self._lock:
+            return sorted(self._universe)
+
+    def run_once(self, t: Optional[float] = None) -> Dict:
+        """One pass: refreshes stale symbols whose exchange is closed at `t`"""
+        t = time.time() if t is None else t
+        universe = self.universe()
+        closed = [s for s in universe if not calendar_for(s).is_open(t)]
+        stats = self.store.prefetch(closed, self.provider, self.workers, t)
+        stats["skipped_open"] = len(universe) - len(closed)
+        self.last_pass = {**stats, "time": t}
+        return stats
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                # A failing pass is retried on the next one
+                pass
+            time.sleep(self.interval)
+
+    def start(self):
+        """Starts the background passes, the first one right away; a zero interval never starts"""
+        with self._lock:
+            if self._thread is None and self.interval > 0:
+                self._thread = threading.Thread(target=self._loop, name="fundamentals-prefetcher", daemon=True)
+                self._thread.start()
@@ -0,0 +1,271 @@
+"""
+Incremental technical indicator engine.
+
+Produces the same columns as the `ta` based calculate_technical_indicators
+(EMA_9, SMA_20/50/200, RSI, MACD, Bollinger Bands and OBV) but keeps the
+running state of every indicator, so appending N bars costs O(N) instead of
+recomputing the whole history.
+"""
+import math
+import threading
+from collections import deque
+from copy import deepcopy
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS = [
+    'EMA_9', 'SMA_20', 'SMA_50', 'SMA_200', 'RSI', 'MACD', 'MACD_Signal',
+    'BB_Upper', 'BB_Lower', 'BB_Middle', 'OBV',
+]
+
+# Window lengths, matching the `ta` defaults used by the app
+EMA_WINDOWS = (9, 12, 26)
+SMA_WINDOWS = (20, 50, 200)
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGN = 12, 26, 9
+BB_WINDOW, BB_DEV = 20, 2
+MAX_WINDOW = max(SMA_WINDOWS)
+
+
+def _ewm(values: pd.Series, **kwargs) -> pd.Series:
+    return values.ewm(adjust=False, **kwargs).mean()
+
+
+def compute_full(close: pd.Series, volume: pd.Series):
+    """
+    Computes every indicator over the whole series with vectorized pandas
+
+    Returns:
+        tuple: (outputs, state) where outputs maps column name to an array and
+        state is the running state after the second to last bar, ready for
+        IndicatorEngine to continue from
+    """
+    close = close.astype(float)
+    n = len(close)
+    out = {}
+
+    emas = {w: _ewm(close, span=w) for w in EMA_WINDOWS}
+    out['EMA_9'] = emas[9].where(np.arange(n) >= 8).to_numpy()
+
+    rolling = {w: close.rolling(w, min_periods=w) for w in SMA_WINDOWS}
+    for w in SMA_WINDOWS:
+        out[f'SMA_{w}'] = rolling[w].mean().to_numpy()
+
+    diff = close.diff(1)
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    avg_up = _ewm(up, alpha=1 / RSI_WINDOW)
+    avg_down = _ewm(down, alpha=1 / RSI_WINDOW)
+    rsi = np.where(avg_down == 0, 100, 100 - 100 / (1 + avg_up / avg_down))
+    out['RSI'] = np.where(np.arange(n) >= RSI_WINDOW - 1, rsi, np.nan)
+
+    macd = (emas[MACD_FAST] - emas[MACD_SLOW]).where(np.arange(n) >= MACD_SLOW - 1)
+    out['MACD'] = macd.to_numpy()
+    out['MACD_Signal'] = _ewm(macd, span=MACD_SIGN, min_periods=MACD_SIGN).to_numpy()
+    signal = _ewm(macd, span=MACD_SIGN)
+
+    mavg = rolling[BB_WINDOW].mean()
+    mstd = close.rolling(BB_WINDOW, min_periods=BB_WINDOW).std(ddof=0)
+    out['BB_Upper'] = (mavg + BB_DEV * mstd).to_numpy()
+    out['BB_Lower'] = (mavg - BB_DEV * mstd).to_numpy()
+    out['BB_Middle'] = mavg.to_numpy()
+
+    signed = np.where(close < close.shift(1), -volume.astype(float), volume.astype(float))
+    obv = np.cumsum(signed)
+    out['OBV'] = obv
+
+    state = None
+    if n >= 2:
+        i = n - 2
+        values = close.to_numpy()
+        window = deque(values[max(0, i + 1 - MAX_WINDOW):i + 1], maxlen=MAX_WINDOW)
+        state = {
+            'count': i + 1,
+            'prev_close': values[i],
+            'ema': {w: emas[w].iloc[i] for w in EMA_WINDOWS},
+            'avg_up': avg_up.iloc[i],
+            'avg_down': avg_down.iloc[i],
+            'signal': signal.iloc[i],
+            'signal_count': int(macd.iloc[:i + 1].notna().sum()),
+            'obv': obv[i],
+            'window': window,
+        }
+    return out, state
+
+
+def _step(state: dict, close: float, volume: float) -> Dict[str, float]:
+    """Advances the running state by one bar and returns that bar's indicator values"""
+    count = state['count']
+    nan = float('nan')
+    row = {}
+
+    # EMAs (pandas ewm with adjust=False seeds on the first value)
+    for w in EMA_WINDOWS:
+        alpha = 2 / (w + 1)
+        state['ema'][w] = close if count == 0 else (1 - alpha) * state['ema'][w] + alpha * close
+    row['EMA_9'] = state['ema'][9] if count >= 8 else nan
+
+    # Rolling windows for the SMAs and Bollinger Bands, the buffer holds the
+    # previous MAX_WINDOW closes so window[-w] is the value dropping out
+    window = state['window']
+    leaving = {w: window[-w] for w in SMA_WINDOWS if len(window) >= w}
+    window.append(close)
+    seen = count + 1
+    for w in SMA_WINDOWS:
+        state['sums'][w] += close - leaving.get(w, 0.0)
+        row[f'SMA_{w}'] = state['sums'][w] / w if seen >= w else nan
+
+    state['sumsq'] += close * close - leaving.get(BB_WINDOW, 0.0) ** 2
+    if seen >= BB_WINDOW:
+        mean = row[f'SMA_{BB_WINDOW}']
+        std = math.sqrt(max(state['sumsq'] / BB_WINDOW - mean * mean, 0.0))
+        row['BB_Upper'] = mean + BB_DEV * std
+        row['BB_Lower'] = mean - BB_DEV * std
+        row['BB_Middle'] = mean
+    else:
+        row['BB_Upper'] = row['BB_Lower'] = row['BB_Middle'] = nan
+
+    # RSI with Wilder smoothing
+    diff = close - state['prev_close'] if count > 0 else 0.0
+    alpha = 1 / RSI_WINDOW
+    up, down = max(diff, 0.0), max(-diff, 0.0)
+    if count == 0:
+        state['avg_up'], state['avg_down'] = up, down
+    else:
+        state['avg_up'] = (1 - alpha) * state['avg_up'] + alpha * up
+        state['avg_down'] = (1 - alpha) * state['avg_down'] + alpha * down
+    if count < RSI_WINDOW - 1:
+        row['RSI'] = nan
+    elif state['avg_down'] == 0:
+        row['RSI'] = 100.0
+    else:
+        row['RSI'] = 100 - 100 / (1 + state['avg_up'] / state['avg_down'])
+
+    # MACD, the signal line starts on the first valid MACD value
+    if count >= MACD_SLOW - 1:
+        macd = state['ema'][MACD_FAST] - state['ema'][MACD_SLOW]
+        alpha = 2 / (MACD_SIGN + 1)
+        if state['signal_count'] == 0:
+            state['signal'] = macd
+        else:
+            state['signal'] = (1 - alpha) * state['signal'] + alpha * macd
+        state['signal_count'] += 1
+        row['MACD'] = macd
+        row['MACD_Signal'] = state['signal'] if state['signal_count'] >= MACD_SIGN else nan
+    else:
+        row['MACD'] = row['MACD_Signal'] = nan
+
+    # On-balance volume
+    if count > 0 and close < state['prev_close']:
+        state['obv'] -= volume
+    else:
+        state['obv'] += volume
+    row['OBV'] = state['obv']
+
+    state['prev_close'] = close
+    state['count'] = seen
+    return row
+
+
+def _prepare_window_sums(state: dict):
+    """Recomputes the rolling sums from the window buffer, which also clears float drift"""
+    values = list(state['window'])
+    state['sums'] = {w: float(sum(values[-w:])) for w in SMA_WINDOWS}
+    state['sumsq'] = float(sum(v * v for v in values[-BB_WINDOW:]))
+
+
+class IndicatorEngine:
+    """
+    Keeps indicator state for one price series between reruns
+
+    update() is called with the latest history. When the history only gained
+    bars at the end (or its last bar was revised) the engine continues from
+    its saved state; otherwise it recomputes everything vectorized.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Optional[dict] = None  # state after the second to last bar
+        self._columns: Dict[str, np.ndarray] = {}
+        self._length = 0
+        self._first = None
+        self._anchor = None  # (timestamp, close) of the second to last bar
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the output columns and the window of recent closes"""
+        with self._lock:
+            columns = sum(values.nbytes for values in self._columns.values())
+            # A deque entry is a float object plus its pointer
+            window = len(self._state['window']) * 32 if self._state else 0
+            return columns + window
+
+    def _can_resume(self, df: pd.DataFrame, close: np.ndarray) -> bool:
+        m = self._length
+        if self._state is None or m < 2 or len(df) < m or len(df) == 0:
+            return False
+        if df.index[0] != self._first or (df.index[m - 2], close[m - 2]) != self._anchor:
+            return False
+        # Running sums cannot absorb gaps, fall back to the vectorized path
+        return not np.isnan(close[m - 1:]).any()
+
+    def _reserve(self, n: int):
+        capacity = len(next(iter(self._columns.values()))) if self._columns else 0
+        if n <= capacity:
+            return
+        capacity = max(n, capacity * 2, 256)
+        for col in INDICATOR_COLUMNS:
+            grown = np.full(capacity, np.nan)
+            if col in self._columns:
+                grown[:self._length] = self._columns[col][:self._length]
+            self._columns[col] = grown
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns `df` with the indicator columns added
+
+        Parameters:
+            df (pd.DataFrame): OHLCV history, oldest bar first
+
+        Returns:
+            pd.DataFrame: Copy of df with INDICATOR_COLUMNS
+        """
+        close = df['Close'].to_numpy(dtype=float)
+        volume = df['Volume'].to_numpy(dtype=float)
+        n = len(df)
+
+        with self._lock:
+            if self._can_resume(df, close):
+                # Replay from the last bar, which may have been a partial one
+                state = deepcopy(self._state)
+                _prepare_window_sums(state)
+                self._reserve(n)
+                for i in range(self._length - 1, n):
+                    row = _step(state, close[i], volume[i])
+                    for col, value in row.items():
+                        self._columns[col][i] = value
+                    if i == n - 2:
+                        self._state = deepcopy(state)
+            else:
+                outputs, self._state = compute_full(df['Close'], df['Volume'])
+                self._columns = {}
+                self._length = 0
+                self._reserve(n)
+                for col in INDICATOR_COLUMNS:
+                    self._columns[col][:n] = outputs[col]
+
+            self._length = n
+            self._first = df.index[0] if n else None
+            self._anchor = (df.index[n - 2], close[n - 2]) if n >= 2 else None
+            # One concat builds a single float block instead of inserting column by column
+            indicators = pd.DataFrame(
+                np.column_stack([self._columns[col][:n] for col in INDICATOR_COLUMNS]),
+                index=df.index,
+                columns=INDICATOR_COLUMNS,
+            )
+            return pd.concat([df, indicators], axis=1)
@@ -0,0 +1,402 @@
+"""
+Process pool for CPU-bound analytics, with price panels in shared memory.
+
+A workload is split into chunks (parameter sets, symbol columns, symbols) that
+run in worker processes, so the Streamlit script thread only submits the job
+and polls its progress. Panels are copied once into named shared memory
+blocks that workers map instead of unpickling their own copy. Finished
+results go into the SharedCache under a key that includes the input version,
+and sessions asking for the same key share one running job.
+"""
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from terminal.backtest import DEFAULT_FEE_BPS, _run_grid, parameter_grid
+from terminal.cache import SharedCache
+from terminal.montecarlo import simulate_fan
+from terminal.prediction import DEFAULT_HORIZON, ModelCache, predict_history
+from terminal.screener import PricePanel, panel_indicators, snapshot
+
+# Cache TTL for job results
+DEFAULT_RESULT_TTL = 600.0
+
+
+def process_context():
+    """
+    "forkserver" multiprocessing context where available, else "spawn"
+
+    Workers started this way never inherit the parent's threads or open
+    sockets, which a plain fork from a threaded server would copy.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class SharedArray:
+    """
+    A NumPy array copied into a named shared memory block
+
+    `spec` is a small picklable description that workers pass to `attach`.
+    The creating process must call `release` once no worker needs the block.
+    """
+
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.spec = (self._shm.name, array.shape, array.dtype.str)
+        np.ndarray(array.shape, array.dtype, buffer=self._shm.buf)[...] = array
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def release(self):
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def attach(spec: tuple):
+    """Read-only view of a SharedArray in a worker, valid inside the with block"""
+    name, shape, dtype = spec
+    # Workers share the server's resource tracker, so attaching registers
+    # nothing new and the block lives until the creator releases it
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        yield array
+        del array
+    finally:
+        shm.close()
+
+
+class SharedPanel:
+    """A PricePanel with its arrays in shared memory, see `attach_panel`"""
+
+    def __init__(self, panel: PricePanel):
+        self.symbols = list(panel.symbols)
+        self.arrays = {name: SharedArray(getattr(panel, name)) for name in ("dates", "close", "volume")}
+
+    @property
+    def spec(self) -> dict:
+        return {"symbols": self.symbols, **{name: a.spec for name, a in self.arrays.items()}}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def release(self):
+        for array in self.arrays.values():
+            array.release()
+
+
+@contextmanager
+def attach_panel(spec: dict, columns: Optional[slice] = None):
+    """PricePanel over a SharedPanel's memory, optionally a slice of its symbols"""
+    columns = columns or slice(None)
+    with attach(spec["dates"]) as dates, attach(spec["close"]) as close, attach(spec["volume"]) as volume:
+        yield PricePanel(spec["symbols"][columns], dates[:, columns], close[:, columns], volume[:, columns])
+
+
+def panel_version(panel: PricePanel) -> str:
+    """Short digest of a panel's symbols and last bars, for result cache keys"""
+    digest = hashlib.sha1(",".join(panel.symbols).encode())
+    if len(panel.close):
+        digest.update(repr(panel.close.shape).encode())
+        digest.update(np.ascontiguousarray(panel.close[-1]).tobytes())
+        digest.update(np.ascontiguousarray(panel.dates[-1]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+class Job:
+    """
+    One workload running as chunks in the pool
+
+    Parameters:
+        key (Hashable): Cache key of the combined result
+        futures (List[Future]): One future per chunk
+        combine (Callable): Turns the list of chunk results into the result
+    """
+
+    def __init__(self, key: Hashable, futures: List[Future], combine: Callable[[list], Any]):
+        self.key = key
+        self.futures = futures
+        self.combine = combine
+        self.viewers: set = set()
+        self.cancelled = False
+        self._result = None
+        self._error: Optional[BaseException] = None
+        self._finished = threading.Event()
+
+    @classmethod
+    def completed(cls, key: Hashable, result: Any) -> "Job":
+        job = cls(key, [], list)
+        job._result = result
+        job._finished.set()
+        return job
+
+    def progress(self) -> float:
+        """Share of chunks finished, 0 to 1"""
+        if not self.futures:
+            return 1.0 if self._finished.is_set() else 0.0
+        return sum(f.done() for f in self.futures) / len(self.futures)
+
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def error(self) -> Optional[BaseException]:
+        """Exception the job raised, None while it runs or when it succeeded"""
+        return self._error if self._finished.is_set() else None
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Combined result, waiting up to `timeout` seconds for the job to finish"""
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"Job {self.key!r} still running")
+        if self.cancelled:
+            raise CancelledError()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        """Drops chunks that have not started; running chunks finish and are discarded"""
+        self.cancelled = True
+        for future in self.futures:
+            future.cancel()
+
+
+class JobExecutor:
+    """
+    Runs chunked analytics in worker processes and caches their results
+
+    Workers are started from `process_context`.
+
+    Parameters:
+        cache (SharedCache): Where finished results are stored
+        max_workers (int): Worker processes, one per core by default
+        ttl (float): Cache TTL of results
+    """
+
+    def __init__(self, cache: SharedCache, max_workers: Optional[int] = None, ttl: float = DEFAULT_RESULT_TTL):
+        self.cache = cache
+        self.ttl = ttl
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=process_context())
+        self._jobs: Dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self._stats = {"jobs": 0, "cached": 0, "joined": 0, "cancelled": 0, "errors": 0}
+
+    def submit(
+        self,
+        key: Hashable,
+        task: Callable,
+        chunks: Iterable[tuple],
+        combine: Callable[[list], Any] = list,
+        shared: Sequence = (),
+        viewer: Optional[str] = None,
+        ttl: Optional[float] = None,
+    ) -> Job:
+        """
+        Starts `task(*args)` for every args tuple in `chunks`, unless the result is known
+
+        A cached result returns a finished job and a job already running under
+        the same key is joined. Shared arrays and panels in `shared` are
+        released once every chunk has finished or been cancelled.
+
+        Parameters:
+            key (Hashable): Cache key, including a version of the inputs
+            task (Callable): Module-level function run in a worker
+            chunks (Iterable[tuple]): Arguments of each chunk
+            combine (Callable): Builds the result from the chunk results, in order
+            shared (Sequence): SharedArray or SharedPanel objects the chunks read
+            viewer (str): Session that wants the result, see `cancel`
+            ttl (float): Cache TTL of the result
+        """
+        job = self.lookup(key, viewer)
+        if job is not None:
+            for block in shared:
+                block.release()
+            return job
+
+        with self._lock:
+            futures = [self._pool.submit(task, *args) for args in chunks]
+            job = Job(key, futures, combine)
+            job.viewers.add(viewer)
+            self._jobs[key] = job
+            self._stats["jobs"] += 1
+
+        remaining = [len(futures)]
+        counter = threading.Lock()
+
+        def chunk_done(_):
+            with counter:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._finish(job, shared, ttl)
+
+        if not futures:
+            self._finish(job, shared, ttl)
+        for future in futures:
+            future.add_done_callback(chunk_done)
+        return job
+
+    def lookup(self, key: Hashable, viewer: Optional[str] = None) -> Optional[Job]:
+        """Finished job for a cached result, or the running job for key joined by viewer"""
+        cached = self.cache.get(key)
+        with self._lock:
+            if cached is not None:
+                self._stats["cached"] += 1
+                return Job.completed(key, cached)
+            running = self._jobs.get(key)
+            if running is not None and not running.cancelled:
+                running.viewers.add(viewer)
+                self._stats["joined"] += 1
+                return running
+        return None
+
+    def _finish(self, job: Job, shared: Sequence, ttl: Optional[float]):
+        for block in shared:
+            block.release()
+        if not job.cancelled:
+            try:
+                job._result = job.combine([f.result() for f in job.futures])
+                if job._result is not None:
+                    self.cache.set(job.key, job._result, ttl or self.ttl)
+            except CancelledError:
+                job.cancelled = True
+            except Exception as e:
+                job._error = e
+                with self._lock:
+                    self._stats["errors"] += 1
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+        job._finished.set()
+
+    def cancel(self, job: Job, viewer: Optional[str] = None):
+        """Drops a session's interest in a job, cancelling it once nobody is waiting"""
+        with self._lock:
+            job.viewers.discard(viewer)
+            if job.viewers or job.done():
+                return
+            self._stats["cancelled"] += 1
+        job.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, running=len(self._jobs), workers=self.max_workers)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Cancels queued chunks and stops the workers
+
+        By default waits for the running chunks and the worker processes to
+        exit; returning early lets the interpreter close the pool's pipes while
+        its management thread still reads them. Pass wait=False only where the
+        caller must not block, such as a cancel handler.
+        """
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _column_chunks(count: int, chunks: int) -> List[slice]:
+    bounds = np.linspace(0, count, max(1, min(chunks, count)) + 1).astype(int)
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def snapshot_task(panel_spec: dict, columns: slice) -> pd.DataFrame:
+    """Indicator snapshot for a slice of a shared panel's symbols"""
+    with attach_panel(panel_spec, columns) as panel:
+        return snapshot(panel, panel_indicators(panel.close, panel.volume))
+
+
+def submit_snapshot(executor: JobExecutor, key: Hashable, panel: PricePanel,
+                    viewer: Optional[str] = None, ttl: Optional[float] = None) -> Job:
+    """screener.snapshot of a panel, its symbols split across the workers"""
+    job = executor.lookup(key, viewer)
+    if job is not None:
+        return job
+    shared = SharedPanel(panel)
+    chunks = [(shared.spec, cols) for cols in _column_chunks(len(panel.symbols), executor.max_workers)]
+    return executor.submit(key, snapshot_task, chunks, _concat, [shared], viewer, ttl)
+
+
+def backtest_task(panel_spec: dict, strategy: str, params: List[Dict], fee_bps: float, start: int) -> pd.DataFrame:
+    """Backtests a share of a parameter grid on a shared panel"""
+    with attach_panel(panel_spec) as panel:
+        return _run_grid(panel.close, panel.symbols, strategy, params, fee_bps, start)
+
+
+def submit_backtest(executor: JobExecutor, key: Hashable, panel: PricePanel, strategy: str,
+                    grid: Optional[Dict[str, list]] = None, fee_bps: float = DEFAULT_FEE_BPS, start: int = 0,
+                    viewer: Optional[str] = None, combine: Callable[[list], Any] = None,
+                    ttl: Optional[float] = None) -> Job:
+    """backtest.backtest as a job, the parameter sets split into chunks"""
+    job = executor.lookup(key, viewer)
+    if job is not None:
+        return job
+    params = parameter_grid(strategy, grid)
+    shared = SharedPanel(panel)
+    # A few chunks per worker so progress moves and cancelling stops early
+    count = max(1, min(len(params), executor.max_workers * 4))
+    chunks = [
+        (shared.spec, strategy, [params[i] for i in chunk], fee_bps, start)
+        for chunk in np.array_split(np.arange(len(params)), count) if len(chunk)
+    ]
+    return executor.submit(key, backtest_task, chunks, combine or _concat, [shared], viewer, ttl)
+
+
+def submit_prediction(executor: JobExecutor, key: Hashable, history: pd.DataFrame, model: str,
+                      start=None, horizon: int = DEFAULT_HORIZON, viewer: Optional[str] = None,
+                      models: Optional[ModelCache] = None, ttl: Optional[float] = None,
+                      model_key: Optional[Hashable] = None) -> Job:
+    """
+    prediction.predict_history of one history as a single-chunk job
+
+    With a ModelCache, results trained earlier are read from disk and new
+    ones are written there when the job finishes. They are stored under
+    `model_key`, the job key without its data version, and the job key is
+    kept inside the file, so a newer version replaces the older one.
+    """
+    model_key = key if model_key is None else model_key
+    stored = models.get(model_key, version=key) if models is not None else None
+    if stored is not None:
+        return Job.completed(key, stored)
+
+    def combine(results: list):
+        result = results[0]
+        if models is not None and result is not None:
+            models.put(model_key, result, version=key)
+        return result
+
+    return executor.submit(key, predict_history, [(history, model, start, horizon)], combine,
+                           viewer=viewer, ttl=ttl)
+
+
+def submit_forecast(executor: JobExecutor, key: Hashable, history: pd.DataFrame, horizon: int, paths: int,
+                    method: str, viewer: Optional[str] = None, combine: Callable[[list], Any] = None,
+                    ttl: Optional[float] = None) -> Job:
+    """montecarlo.simulate_fan of one history as a single-chunk job"""
+    return executor.submit(key, simulate_fan, [(history, horizon, paths, method)], combine or _first,
+                           viewer=viewer, ttl=ttl)
+
+
+def _first(results: list):
+    return results[0]
+
+
+def _concat(results: list) -> pd.DataFrame:
+    return pd.concat(results) if results else pd.DataFrame()
@@ -0,0 +1,236 @@
+"""
+Hot-path stage timings, upstream payloads and cache counters for monitoring.
+
+A Metrics object lives for the whole server process. Each stage (upstream
+history, info and statement calls, indicator computation, figure builds ...)
+is timed per symbol into latency histograms with call and error counters
+and, for upstream calls, the in-memory size of the parsed responses. Every event can also be appended to a JSONL trace, and the totals
+are rendered in the Prometheus text format, e.g. for node_exporter's textfile
+collector, so slow symbols and regressions can be found in production.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional
+
+import numpy as np
+
+# Upper bounds in seconds of the stage latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Latest trace events kept in memory for download
+DEFAULT_TRACE_EVENTS = 5000
+
+# Seconds between writes of the published Prometheus file
+PUBLISH_INTERVAL = 15.0
+
+# JSONL file the app appends every event to, none when unset
+TRACE_PATH = os.environ.get("ML_TERMINAL_TRACE") or None
+
+PREFIX = "ml_terminal"
+
+
+def _labels(**labels) -> str:
+    """Prometheus label set with quotes, backslashes and newlines escaped"""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Stage:
+    """Totals and latency histogram of one stage"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.payload_memory = 0
+        self.buckets = np.zeros(len(BUCKETS), dtype=np.int64)
+        # Symbol -> [calls, seconds]
+        self.symbols: Dict[str, list] = defaultdict(lambda: [0, 0.0])
+
+
+class Metrics:
+    """
+    Thread-safe stage timings with a JSONL trace and Prometheus export
+
+    Parameters:
+        trace_path (str): JSONL file every event is appended to, none by default
+        keep (int): Latest events kept in memory for trace()
+    """
+
+    def __init__(self, trace_path: Optional[str] = None, keep: int = DEFAULT_TRACE_EVENTS):
+        self.trace_path = trace_path
+        self._stages: Dict[str, _Stage] = defaultdict(_Stage)
+        self._events: Deque[Dict] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._published = 0.0
+        self._trace_file = None
+        if trace_path:
+            os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+            self._trace_file = open(trace_path, "a", buffering=1)
+
+    def _emit(self, event: Dict):
+        self._events.append(event)
+        if self._trace_file is not None:
+            try:
+                self._trace_file.write(json.dumps(event, default=str) + "\n")
+            except (OSError, ValueError):
+                # A full disk must not break the page
+                pass
+
+    def record(self, stage: str, seconds: float, symbol: Optional[str] = None, payload_memory: int = 0,
+               error: bool = False):
+        """Adds one timed event of a stage, e.g. an upstream call"""
+        with self._lock:
+            totals = self._stages[stage]
+            totals.count += 1
+            totals.errors += int(error)
+            totals.seconds += seconds
+            totals.max = max(totals.max, seconds)
+            totals.payload_memory += payload_memory
+            totals.buckets[np.searchsorted(BUCKETS, seconds):] += 1
+            if symbol is not None:
+                calls = totals.symbols[symbol.upper()]
+                calls[0] += 1
+                calls[1] += seconds
+            event = {"t": time.time(), "stage": stage, "seconds": round(seconds, 6)}
+            if symbol is not None:
+                event["symbol"] = symbol.upper()
+            if payload_memory:
+                event["payload_memory"] = payload_memory
+            if error:
+                event["error"] = True
+            self._emit(event)
+
+    @contextmanager
+    def stage(self, name: str, symbol: Optional[str] = None):
+        """Times the block as one event of stage `name`, counted as an error if it raises"""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, symbol, error=error)
+
+    def observe_call(self, method: str, symbol: str, seconds: float, payload_memory: int, error: bool):
+        """CountingProvider hook, recording each upstream call as stage 'upstream <method>'"""
+        self.record(f"upstream {method}", seconds, symbol, payload_memory, error)
+
+    def record_run(self, section: Optional[str], phases: Dict[str, float]):
+        """Profiler hook, tracing each page run or section rerun with its phases"""
+        with self._lock:
+            self._emit({"t": time.time(), "stage": "page run" if section is None else f"{section} rerun",
+                        "phases": {k: round(v, 6) for k, v in phases.items()}})
+
+    def stages(self) -> Dict[str, Dict]:
+        """Per stage: count, errors, seconds, mean, max and payload_memory"""
+        with self._lock:
+            return {
+                name: {
+                    'count': s.count,
+                    'errors': s.errors,
+                    'seconds': s.seconds,
+                    'mean': s.seconds / s.count if s.count else 0.0,
+                    'max': s.max,
+                    'payload_memory': s.payload_memory,
+                }
+                for name, s in sorted(self._stages.items())
+            }
+
+    def slow_symbols(self, n: int = 10, prefix: str = "upstream") -> Dict[str, Dict]:
+        """The `n` symbols with the highest mean seconds over stages starting with `prefix`"""
+        totals: Dict[str, list] = defaultdict(lambda: [0, 0.0])
+        with self._lock:
+            for name, s in self._stages.items():
+                if name.startswith(prefix):
+                    for symbol, (calls, seconds) in s.symbols.items():
+                        totals[symbol][0] += calls
+                        totals[symbol][1] += seconds
+        ranked = sorted(totals.items(), key=lambda item: item[1][1] / item[1][0], reverse=True)[:n]
+        return {symbol: {'calls': calls, 'mean': seconds / calls} for symbol, (calls, seconds) in ranked}
+
+    def trace(self) -> str:
+        """The latest events as JSONL"""
+        with self._lock:
+            events = list(self._events)
+        return "".join(json.dumps(event, default=str) + "\n" for event in events)
+
+    def prometheus(self, counters: Optional[Dict[str, Dict[str, float]]] = None,
+                   profile: Optional[Dict] = None) -> str:
+        """
+        Stage histograms and counters in the Prometheus text exposition format
+
+        Parameters:
+            counters (Dict): Extra counters, metric name (without prefix) to
+                {label value of 'name': value}, e.g. cache hits per cache
+            profile (Dict): Profiler.summary(), exported as rerun phase percentiles
+
+        Returns:
+            str: Exposition text
+        """
+        lines = [
+            f"# HELP {PREFIX}_stage_seconds Time spent in each hot-path stage",
+            f"# TYPE {PREFIX}_stage_seconds histogram",
+        ]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            for name, s in stages:
+                for bound, count in zip(BUCKETS, s.buckets):
+                    lines.append(f"{PREFIX}_stage_seconds_bucket{_labels(stage=name, le=bound)} {count}")
+                lines.append(f"{PREFIX}_stage_seconds_bucket{_labels(stage=name, le='+Inf')} {s.count}")
+                lines.append(f"{PREFIX}_stage_seconds_sum{_labels(stage=name)} {s.seconds:.6f}")
+                lines.append(f"{PREFIX}_stage_seconds_count{_labels(stage=name)} {s.count}")
+            totals = (
+                ("stage_errors_total", "Stage events that raised", "errors"),
+                ("stage_payload_memory_bytes_total",
+                 "In-memory size of parsed upstream responses per stage, not bytes on the wire", "payload_memory"),
+            )
+            for metric, help_text, attr in totals:
+                lines += [f"# HELP {PREFIX}_{metric} {help_text}", f"# TYPE {PREFIX}_{metric} counter"]
+                lines += [f"{PREFIX}_{metric}{_labels(stage=name)} {getattr(s, attr)}" for name, s in stages]
+
+        for metric, values in (counters or {}).items():
+            lines.append(f"# TYPE {PREFIX}_{metric} counter")
+            lines += [f"{PREFIX}_{metric}{_labels(name=name)} {value}" for name, value in values.items()]
+
+        if profile:
+            reruns = profile.get('reruns', {})
+            lines += [
+                f"# HELP {PREFIX}_rerun_phase Rerun phase percentiles, in seconds or calls for 'upstream calls'",
+                f"# TYPE {PREFIX}_rerun_phase gauge",
+            ]
+            for phase, stats in reruns.items():
+                for quantile in ("p50", "p95"):
+                    labels = _labels(phase=phase, quantile=int(quantile[1:]) / 100)
+                    lines.append(f"{PREFIX}_rerun_phase{labels} {stats[quantile]:.6f}")
+            lines += [
+                f"# HELP {PREFIX}_rerun_phase_runs Runs in the percentile window per phase",
+                f"# TYPE {PREFIX}_rerun_phase_runs gauge",
+            ]
+            lines += [f"{PREFIX}_rerun_phase_runs{_labels(phase=phase)} {stats['count']}"
+                      for phase, stats in reruns.items()]
+        return "\n".join(lines) + "\n"
+
+    def publish(self, path: str, render: Callable[[], str], force: bool = False):
+        """Writes render() to `path`, at most every PUBLISH_INTERVAL seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._published < PUBLISH_INTERVAL:
+                return
+            self._published = now
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w") as f:
+                f.write(render())
+            os.replace(tmp, path)
+        except OSError:
+            # A read-only data folder must not break the page
+            pass
@@ -0,0 +1,301 @@
+"""
+Walk-forward price prediction from the technical indicators.
+
+Features are built column-wise from the output of calculate_technical_indicators.
+Small CPU models, ridge regression for the forward return and logistic
+regression for its direction, are refit on an expanding window every `step`
+bars and scored only on the bars after each fit, the way they would have been
+used live. Fitted models and their scores are cached on disk by symbol, range
+and model settings together with the data version, so reopening a symbol does
+not retrain.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+from terminal.indicators import IndicatorEngine
+from terminal.store import DATA_DIR, bars_before
+
+FEATURE_COLUMNS = [
+    'ret_1', 'ret_5', 'ret_10', 'ret_20', 'vol_20', 'rsi', 'macd', 'macd_hist',
+    'band_position', 'sma_20_gap', 'sma_50_gap', 'obv_slope',
+]
+
+# Trading days ahead the target return is measured over
+DEFAULT_HORIZON = 5
+# Bars between refits, about a month of trading days
+DEFAULT_STEP = 21
+# Labelled bars needed before the first fit
+MIN_TRAIN = 252
+
+
+def build_features(df: pd.DataFrame, horizon: int = DEFAULT_HORIZON) -> pd.DataFrame:
+    """
+    Feature matrix from a frame with OHLCV and indicator columns
+
+    Every feature is scale free (returns, ratios or centred oscillators) so
+    one model fits across price levels. 'target' is the log return over the
+    next `horizon` bars, NaN for the last `horizon` bars.
+
+    Parameters:
+        df (pd.DataFrame): Output of calculate_technical_indicators
+        horizon (int): Bars ahead the target return is measured over
+
+    Returns:
+        pd.DataFrame: FEATURE_COLUMNS plus 'target', indexed like df
+    """
+    close = df['Close'].astype(float)
+    log_close = np.log(close)
+    out = {f'ret_{lag}': log_close.diff(lag) for lag in (1, 5, 10, 20)}
+    out['vol_20'] = out['ret_1'].rolling(20).std()
+    out['rsi'] = df['RSI'] / 100 - 0.5
+    out['macd'] = df['MACD'] / close
+    out['macd_hist'] = (df['MACD'] - df['MACD_Signal']) / close
+    width = df['BB_Upper'] - df['BB_Lower']
+    out['band_position'] = (close - df['BB_Lower']) / width.where(width > 0) - 0.5
+    out['sma_20_gap'] = close / df['SMA_20'] - 1
+    out['sma_50_gap'] = close / df['SMA_50'] - 1
+    # OBV change over a week, in units of the average daily volume
+    average_volume = df['Volume'].astype(float).rolling(20).mean()
+    out['obv_slope'] = df['OBV'].diff(5) / (5 * average_volume.where(average_volume > 0))
+    features = pd.DataFrame(out, index=df.index)
+    features['target'] = log_close.shift(-horizon) - log_close
+    return features
+
+
+class RidgeModel:
+    """
+    L2-regularised linear regression on standardised features, solved in closed form
+
+    `predict` returns the expected forward log return.
+    """
+
+    threshold = 0.0
+
+    def __init__(self, alpha: float = 10.0):
+        self.alpha = alpha
+
+    def _standardize(self, X: np.ndarray) -> np.ndarray:
+        return (X - self.mean) / self.scale
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "RidgeModel":
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        Z = self._standardize(X)
+        self.intercept = y.mean()
+        self.coef = np.linalg.solve(Z.T @ Z + self.alpha * np.eye(Z.shape[1]), Z.T @ (y - self.intercept))
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._standardize(X) @ self.coef + self.intercept
+
+
+class LogisticModel(RidgeModel):
+    """
+    L2-regularised logistic regression for the sign of the forward return
+
+    Fitted with a few Newton steps; `predict` returns the probability of a rise.
+    """
+
+    threshold = 0.5
+
+    def __init__(self, alpha: float = 1.0, iterations: int = 8):
+        super().__init__(alpha)
+        self.iterations = iterations
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "LogisticModel":
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        Z = np.column_stack([np.ones(len(X)), self._standardize(X)])
+        up = (y > 0).astype(float)
+        w = np.zeros(Z.shape[1])
+        penalty = self.alpha * np.eye(Z.shape[1])
+        penalty[0, 0] = 0.0  # the intercept is not shrunk
+        for _ in range(self.iterations):
+            p = 1 / (1 + np.exp(-Z @ w))
+            gradient = Z.T @ (p - up) + penalty @ w
+            hessian = (Z * (p * (1 - p))[:, None]).T @ Z + penalty
+            w -= np.linalg.solve(hessian, gradient)
+        self.intercept, self.coef = w[0], w[1:]
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return 1 / (1 + np.exp(-(self._standardize(X) @ self.coef + self.intercept)))
+
+
+MODELS: Dict[str, Callable[[], RidgeModel]] = {
+    "ridge": RidgeModel,
+    "logistic": LogisticModel,
+}
+
+
+def walk_forward(
+    features: pd.DataFrame,
+    model: str = "ridge",
+    start=None,
+    horizon: int = DEFAULT_HORIZON,
+    step: int = DEFAULT_STEP,
+    min_train: int = MIN_TRAIN,
+) -> Optional[Dict]:
+    """
+    Expanding-window walk-forward fit and evaluation
+
+    At each refit bar t the model is trained on every row whose target was
+    already known at t (row i needs the close of bar i + horizon, so i <=
+    t - horizon) and predicts bars t to t + step - 1.
+
+    Parameters:
+        features (pd.DataFrame): Output of build_features with the same horizon
+        model (str): Key of MODELS
+        start: First bar to predict and score, default as early as min_train allows
+        horizon (int): Bars ahead the target covers
+        step (int): Bars between refits
+        min_train (int): Labelled rows needed before the first fit
+
+    Returns:
+        Optional[Dict]: 'predictions' (prediction, actual and position per bar),
+        'equity' (cumulative log return of the strategy and of buy and hold),
+        'metrics', 'coefficients', 'forecast' for the latest bar and the fitted
+        'model'; None when there is not enough history
+    """
+    X = features[FEATURE_COLUMNS].to_numpy(dtype=float)
+    y = features['target'].to_numpy(dtype=float)
+    valid = np.isfinite(X).all(axis=1)
+    labelled = valid & np.isfinite(y)
+    n = len(X)
+
+    first = bars_before(features, start) if start is not None else 0
+    # Earliest bar with min_train labelled rows behind it
+    known = np.cumsum(labelled)
+    enough = np.flatnonzero(known >= min_train)
+    if not len(enough):
+        return None
+    first = max(first, int(enough[0]) + horizon)
+    if first >= n:
+        return None
+
+    make = MODELS[model]
+    predictions = np.full(n, np.nan)
+    for t in range(first, n, step):
+        train = labelled[:t - horizon + 1]
+        fitted = make().fit(X[:t - horizon + 1][train], y[:t - horizon + 1][train])
+        block = np.arange(t, min(t + step, n))
+        block = block[valid[block]]
+        predictions[block] = fitted.predict(X[block])
+
+    threshold = make.threshold
+    position = np.where(np.isnan(predictions), 0.0, np.sign(predictions - threshold))
+    scored = ~np.isnan(predictions) & labelled
+    hit_rate = float(np.mean(np.sign(predictions[scored] - threshold) == np.sign(y[scored]))) if scored.any() else np.nan
+    ic = float(np.corrcoef(predictions[scored], y[scored])[0, 1]) if scored.sum() > 2 else np.nan
+
+    # Daily returns of holding `position` from each close to the next one
+    next_return = np.nan_to_num(np.append(features['ret_1'].to_numpy(dtype=float)[1:], np.nan))
+    shown = slice(first, n)
+    equity = pd.DataFrame({
+        'Strategy': np.cumsum(position[shown] * next_return[shown]),
+        'Buy & Hold': np.cumsum(next_return[shown]),
+    }, index=features.index[shown])
+
+    final = make().fit(X[labelled], y[labelled])
+    latest = np.flatnonzero(valid)
+    forecast = float(final.predict(X[latest[-1:]])[0]) if len(latest) else np.nan
+
+    return {
+        'model': model,
+        'horizon': horizon,
+        'predictions': pd.DataFrame({
+            'prediction': predictions[shown],
+            'actual': y[shown],
+            'position': position[shown],
+        }, index=features.index[shown]),
+        'equity': equity,
+        'metrics': {
+            'hit_rate': hit_rate,
+            'ic': ic,
+            'scored': int(scored.sum()),
+            'refits': len(range(first, n, step)),
+            'strategy_return': float(equity['Strategy'].iloc[-1]),
+            'buy_hold_return': float(equity['Buy & Hold'].iloc[-1]),
+        },
+        'coefficients': pd.Series(final.coef, index=FEATURE_COLUMNS),
+        'forecast': forecast,
+        'fitted': final,
+    }
+
+
+def predict_history(history: pd.DataFrame, model: str = "ridge", start=None,
+                    horizon: int = DEFAULT_HORIZON, step: int = DEFAULT_STEP) -> Optional[Dict]:
+    """Indicators, features and walk_forward for one OHLCV history"""
+    if history is None or history.empty:
+        return None
+    indicators = IndicatorEngine().update(history)
+    return walk_forward(build_features(indicators, horizon), model, start, horizon, step)
+
+
+def predict_many(histories: Dict[str, pd.DataFrame], model: str = "ridge", start=None,
+                 horizon: int = DEFAULT_HORIZON, step: int = DEFAULT_STEP,
+                 max_workers: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+    """predict_history for many symbols, one process per core"""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            symbol: pool.submit(predict_history, history, model, start, horizon, step)
+            for symbol, history in histories.items()
+        }
+        return {symbol: future.result() for symbol, future in futures.items()}
+
+
+class ModelCache:
+    """
+    Fitted models and walk-forward results on disk, one pickle per key
+
+    Keys should name the symbol, range and model settings. The data version,
+    such as the last bar and close, is stored inside the file: a result for
+    another version is a miss and is overwritten in place, so the folder
+    holds one file per key rather than one per data version.
+
+    Parameters:
+        root (str): Folder holding the cached results
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(DATA_DIR, "models")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.root, f"{digest}.pkl")
+
+    def get(self, key: Hashable, version: Hashable = None):
+        """The stored value for key, None if there is none or it is for another version"""
+        try:
+            with open(self.path(key), "rb") as f:
+                stored_version, value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, TypeError, ValueError):
+            return None
+        return value if stored_version == version else None
+
+    def put(self, key: Hashable, value, version: Hashable = None):
+        """Stores value for key, replacing whatever version was stored before"""
+        path = self.path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((version, value), f)
+        os.replace(tmp, path)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], object], version: Hashable = None):
+        """Returns the cached value for key and version, building and storing it on a miss"""
+        value = self.get(key, version)
+        if value is None:
+            value = build()
+            if value is not None:
+                self.put(key, value, version)
+        return value
@@ -0,0 +1,181 @@
+"""
+Startup and rerun timings of the app.
+
+A Profiler lives for the whole server process. Home.py times its import block
+and every script run, split into named phases (sidebar, market overview,
+analysis tabs ...), with its CPU time and upstream calls. Sections drawn by
+fragments that rerun on their own are profiled as runs of their own. The
+first run of the process is kept apart as the cold start; later runs feed
+per-phase percentiles over a sliding window. The profile is published as
+JSON so cold-start and per-interaction latency can be tracked across deploys.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from terminal.store import DATA_DIR
+
+# Runs kept per phase for the percentiles
+DEFAULT_WINDOW = 200
+
+# Seconds between writes of the published profile
+PUBLISH_INTERVAL = 5.0
+
+
+class Profiler:
+    """
+    Thread-safe timings of script runs and their phases
+
+    Parameters:
+        path (str): JSON file the profile is published to, data/profile.json by default
+        window (int): Latest runs kept per phase
+        calls (Callable): Returns the number of upstream calls made so far,
+            e.g. CountingProvider.calls, to record calls per run
+        on_run (Callable): Called with the section (None for a page run) and
+            the phases of every finished run, e.g. Metrics.record_run
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window: int = DEFAULT_WINDOW,
+        calls: Optional[Callable[[], int]] = None,
+        on_run: Optional[Callable[[Optional[str], Dict[str, float]], None]] = None,
+    ):
+        self.path = path or os.path.join(DATA_DIR, "profile.json")
+        self.calls = calls
+        self.on_run = on_run
+        self.created = time.time()
+        self.imports: Dict[str, float] = {}
+        self.cold_start: Optional[Dict[str, float]] = None
+        self._timings: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._runs = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._published = 0.0
+
+    def record_import(self, name: str, seconds: float):
+        """Import time of a module or block, kept from the first time it is seen"""
+        with self._lock:
+            self.imports.setdefault(name, seconds)
+
+    @contextmanager
+    def run(self, section: Optional[str] = None):
+        """
+        Times one script run; phases entered inside it on this thread belong to it
+
+        Besides wall time, a run records the CPU time of this thread ('cpu') and,
+        when the profiler has a call counter, the upstream calls made meanwhile
+        by the whole process ('upstream calls'). A section rerunning on its own
+        is recorded apart from page runs, as "<section> rerun: total" and so on.
+        """
+        phases: Dict[str, float] = {}
+        start = time.perf_counter()
+        cpu = time.thread_time()
+        calls = self.calls() if self.calls is not None else None
+        self._local.phases = phases
+        self._local.lap = start
+        try:
+            yield
+        finally:
+            phases['total'] = time.perf_counter() - start
+            phases['cpu'] = time.thread_time() - cpu
+            if calls is not None:
+                phases['upstream calls'] = float(self.calls() - calls)
+            self._local.phases = None
+            with self._lock:
+                first = False
+                if section is None:
+                    self._runs += 1
+                    first = self.cold_start is None
+                    if first:
+                        self.cold_start = phases
+                if not first:
+                    prefix = "" if section is None else f"{section} rerun: "
+                    for name, seconds in phases.items():
+                        self._timings[prefix + name].append(seconds)
+            if self.on_run is not None:
+                self.on_run(section, phases)
+            self.publish(force=first)
+
+    @contextmanager
+    def section(self, name: str):
+        """
+        Times a page section drawn by a fragment
+
+        A phase of the page run drawing it, or a run of its own when the
+        section's fragment reruns without the rest of the page.
+        """
+        if getattr(self._local, 'phases', None) is not None:
+            with self.phase(name):
+                yield
+        else:
+            with self.run(section=name):
+                yield
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times a part of the current run, added up if entered more than once"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases = getattr(self._local, 'phases', None)
+            if phases is not None:
+                now = time.perf_counter()
+                phases[name] = phases.get(name, 0.0) + now - start
+                # The next lap starts here, so a phase is not charged twice
+                self._local.lap = now
+
+    def lap(self, name: str):
+        """Charges the time since the run started, the previous lap or phase to `name`"""
+        phases = getattr(self._local, 'phases', None)
+        if phases is None:
+            return
+        now = time.perf_counter()
+        phases[name] = phases.get(name, 0.0) + now - self._local.lap
+        self._local.lap = now
+
+    def summary(self) -> Dict:
+        """Imports, cold start phases and p50/p95/max of the later runs per phase, in seconds or calls"""
+        with self._lock:
+            timings = {name: np.array(values) for name, values in self._timings.items() if values}
+            return {
+                'process_started': self.created,
+                'runs': self._runs,
+                'imports': dict(self.imports),
+                'cold_start': dict(self.cold_start or {}),
+                'reruns': {
+                    name: {
+                        'count': len(values),
+                        'p50': float(np.percentile(values, 50)),
+                        'p95': float(np.percentile(values, 95)),
+                        'max': float(values.max()),
+                    }
+                    for name, values in timings.items()
+                },
+            }
+
+    def publish(self, force: bool = False):
+        """Writes the summary to `path`, at most every PUBLISH_INTERVAL seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._published < PUBLISH_INTERVAL:
+                return
+            self._published = now
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(self.summary(), f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            # A read-only data folder must not break the page
+            pass
+
@@ -0,0 +1,456 @@
+"""
+Market data providers.
+
+Everything the app reads from upstream goes through a MarketDataProvider:
+price history, fast quotes, company info and income statements. The
+yfinance provider talks to Yahoo Finance, RecordingProvider saves whatever
+another provider returns to disk, and ReplayProvider serves those files back
+with optional latency and failure injection, so every data path can be
+profiled and load-tested without network access. CountingProvider wraps any
+of them to count, time and size the calls the app makes.
+
+The provider is picked with environment variables:
+
+    ML_TERMINAL_PROVIDER        yfinance (default), record or replay
+    ML_TERMINAL_REPLAY_DIR      folder for recordings (default data/replay)
+    ML_TERMINAL_REPLAY_LATENCY  seconds added to every replayed call
+    ML_TERMINAL_REPLAY_JITTER   extra random seconds added to every replayed call
+    ML_TERMINAL_REPLAY_FAILURE_RATE  probability (0-1) that a replayed call fails
+"""
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from terminal.quotes import make_quote
+from terminal.store import DATA_DIR, PERIOD_OFFSETS, symbol_filename
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot serve a request"""
+
+
+class MarketDataProvider(ABC):
+    """
+    Interface for market data sources
+
+    Every method is abstract, so a provider missing one fails when it is
+    constructed instead of in the middle of a page run.
+    """
+
+    @abstractmethod
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        """OHLCV bars, accepting yfinance `history` keywords (period, start, end, interval)"""
+
+    @abstractmethod
+    def quote(self, symbol: str) -> Dict:
+        """Last price and previous close as built by quotes.make_quote"""
+
+    @abstractmethod
+    def info(self, symbol: str) -> Dict:
+        """Company information and ratios"""
+
+    @abstractmethod
+    def income_stmt(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Annual income statement, line items as rows and periods as columns"""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance"""
+
+    def __init__(self):
+        self._module = None
+
+    @property
+    def _yf(self):
+        # Imported on first use, so replay runs work without yfinance installed
+        # and the app draws its first page before paying for the import
+        if self._module is None:
+            import yfinance
+            self._module = yfinance
+        return self._module
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self._yf.Ticker(symbol).history(**kwargs)
+
+    def quote(self, symbol: str) -> Dict:
+        info = self._yf.Ticker(symbol).fast_info
+        current_price = info.last_price if hasattr(info, 'last_price') else 0
+        prev_close = info.previous_close if hasattr(info, 'previous_close') else 0
+        return make_quote(symbol, current_price or 0, prev_close or 0)
+
+    def info(self, symbol: str) -> Dict:
+        return self._yf.Ticker(symbol).info
+
+    def income_stmt(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._yf.Ticker(symbol).income_stmt
+
+
+class _RecordingFiles:
+    """File layout shared by the recording and replay providers"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def folder(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol_filename(symbol, ""))
+
+    def path(self, symbol: str, name: str) -> str:
+        return os.path.join(self.folder(symbol), name)
+
+    @staticmethod
+    def history_name(interval: str) -> str:
+        return f"history_{interval}.parquet"
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Passes calls through to another provider and records every response
+
+    History responses are merged into one file per symbol and interval, so a
+    recording built from delta fetches still replays full windows.
+
+    Parameters:
+        inner (MarketDataProvider): Provider that serves the calls
+        root (str): Folder to write recordings to
+    """
+
+    def __init__(self, inner: MarketDataProvider, root: str):
+        self.inner = inner
+        self.files = _RecordingFiles(root)
+        self._lock = threading.Lock()
+
+    def _write(self, symbol: str, name: str, write):
+        os.makedirs(self.files.folder(symbol), exist_ok=True)
+        path = self.files.path(symbol, name)
+        tmp_path = path + ".tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        df = self.inner.history(symbol, **kwargs)
+        if df is not None and not df.empty:
+            name = self.files.history_name(kwargs.get('interval', '1d'))
+            with self._lock:
+                path = self.files.path(symbol, name)
+                if os.path.exists(path):
+                    old = pd.read_parquet(path)
+                    merged = pd.concat([old, df])
+                    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                else:
+                    merged = df
+                self._write(symbol, name, merged.to_parquet)
+        return df
+
+    def quote(self, symbol: str) -> Dict:
+        quote = self.inner.quote(symbol)
+        self._write(symbol, "quote.json", lambda p: _dump_json(quote, p))
+        return quote
+
+    def info(self, symbol: str) -> Dict:
+        info = self.inner.info(symbol)
+        self._write(symbol, "info.json", lambda p: _dump_json(info, p))
+        return info
+
+    def income_stmt(self, symbol: str) -> Optional[pd.DataFrame]:
+        stmt = self.inner.income_stmt(symbol)
+        if stmt is not None and not stmt.empty:
+            # Parquet needs string column names, periods are restored on replay
+            stored = stmt.copy()
+            stored.columns = [str(c) for c in stored.columns]
+            self._write(symbol, "income_stmt.parquet", stored.to_parquet)
+        return stmt
+
+
+class CountingProvider(MarketDataProvider):
+    """
+    Passes calls through to another provider, counting and timing them per method
+
+    Parameters:
+        inner (MarketDataProvider): Provider that serves the calls
+        observe (Callable): Called after each call with the method, symbol,
+            seconds, in-memory size of the response (see payload_memory) and
+            whether it raised, e.g. Metrics.observe_call
+    """
+
+    def __init__(self, inner: MarketDataProvider,
+                 observe: Optional[Callable[[str, str, float, int, bool], None]] = None):
+        self.inner = inner
+        self.observe = observe
+        self.counts: Dict[str, int] = {}
+        self.calls = 0
+        self.payload_memory = 0
+        self._lock = threading.Lock()
+
+    def _call(self, method: str, symbol: str, fetch: Callable):
+        with self._lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+            self.calls += 1
+        start = time.perf_counter()
+        try:
+            result = fetch()
+        except Exception:
+            if self.observe is not None:
+                self.observe(method, symbol, time.perf_counter() - start, 0, True)
+            raise
+        seconds = time.perf_counter() - start
+        memory = payload_memory(result)
+        with self._lock:
+            self.payload_memory += memory
+        if self.observe is not None:
+            self.observe(method, symbol, seconds, memory, False)
+        return result
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self._call("history", symbol, lambda: self.inner.history(symbol, **kwargs))
+
+    def quote(self, symbol: str) -> Dict:
+        return self._call("quote", symbol, lambda: self.inner.quote(symbol))
+
+    def info(self, symbol: str) -> Dict:
+        return self._call("info", symbol, lambda: self.inner.info(symbol))
+
+    def income_stmt(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._call("income_stmt", symbol, lambda: self.inner.income_stmt(symbol))
+
+
+def payload_memory(response) -> int:
+    """
+    In-memory size of a parsed provider response: frame memory or JSON length
+
+    Not the bytes transferred, which the providers do not see; compressed
+    responses are smaller on the wire and parsed frames can be larger.
+    """
+    if response is None:
+        return 0
+    if isinstance(response, pd.DataFrame):
+        return int(response.memory_usage(deep=True, index=True).sum())
+    return len(json.dumps(response, default=str))
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded responses from disk, with optional latency and failures
+
+    Parameters:
+        root (str): Folder written by RecordingProvider or write_synthetic_recording
+        latency (float): Seconds every call sleeps before answering
+        jitter (float): Extra uniformly random seconds added to the latency
+        failure_rate (float): Probability that a call raises ProviderError
+        seed (int): Seed for jitter and failures, for deterministic runs
+    """
+
+    def __init__(
+        self,
+        root: str,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.files = _RecordingFiles(root)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.calls = 0
+
+    def _simulate(self, what: str, symbol: str):
+        with self._rng_lock:
+            self.calls += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.failure_rate > 0 and self._rng.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise ProviderError(f"Injected failure for {what} {symbol}")
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        self._simulate("history", symbol)
+        path = self.files.path(symbol, self.files.history_name(kwargs.get('interval', '1d')))
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return _slice_history(pd.read_parquet(path), **kwargs)
+
+    def quote(self, symbol: str) -> Dict:
+        self._simulate("quote", symbol)
+        path = self.files.path(symbol, "quote.json")
+        if not os.path.exists(path):
+            raise ProviderError(f"No recorded quote for {symbol}")
+        quote = _load_json(path)
+        quote['timestamp'] = time.time()
+        return quote
+
+    def info(self, symbol: str) -> Dict:
+        self._simulate("info", symbol)
+        path = self.files.path(symbol, "info.json")
+        return _load_json(path) if os.path.exists(path) else {}
+
+    def income_stmt(self, symbol: str) -> Optional[pd.DataFrame]:
+        self._simulate("income_stmt", symbol)
+        path = self.files.path(symbol, "income_stmt.parquet")
+        if not os.path.exists(path):
+            return None
+        stmt = pd.read_parquet(path)
+        stmt.columns = pd.to_datetime(stmt.columns)
+        return stmt
+
+
+def _slice_history(df: pd.DataFrame, period: Optional[str] = None, start=None, end=None, **_) -> pd.DataFrame:
+    """Applies yfinance style period/start/end arguments to a recorded history"""
+    if df.empty:
+        return df
+    tz = df.index.tz
+    if start is not None:
+        df = df[df.index >= _as_timestamp(start, tz)]
+    if end is not None:
+        df = df[df.index < _as_timestamp(end, tz)]
+    if start is None and end is None and period is not None:
+        offset = PERIOD_OFFSETS.get(period)
+        if offset is not None and not df.empty:
+            df = df[df.index >= df.index[-1] - offset]
+    return df
+
+
+def _as_timestamp(value, tz) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if tz is not None and ts.tz is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tz is not None:
+        return ts.tz_convert(None)
+    return ts
+
+
+def _dump_json(obj, path: str):
+    with open(path, "w") as f:
+        json.dump(obj, f, default=str)
+
+
+def _load_json(path: str):
+    with open(path) as f:
+        return json.load(f)
+
+
+def synthetic_history(
+    bars: int,
+    seed: int = 0,
+    end: Optional[str] = None,
+    tz: str = 'America/New_York',
+    freq: str = 'B',
+) -> pd.DataFrame:
+    """Random walk OHLCV bars (business days by default) ending at `end`, default today"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+    spread = close * rng.uniform(0, 0.01, bars)
+    index = pd.date_range(end=end or pd.Timestamp.now().normalize(), periods=bars, freq=freq, tz=tz)
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.5, bars) * spread,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(100_000, 5_000_000, bars).astype(float),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+
+
+def write_synthetic_recording(root: str, symbols: Iterable[str], years: int = 10, seed: int = 0):
+    """
+    Writes a replayable recording of synthetic data for `symbols`
+
+    Useful for benchmarks and for running the app on a machine without
+    network access.
+    """
+    recorder = RecordingProvider(_SyntheticProvider(years, seed), root)
+    for symbol in symbols:
+        recorder.history(symbol, period="max")
+        recorder.quote(symbol)
+        recorder.info(symbol)
+        recorder.income_stmt(symbol)
+
+
+class _SyntheticProvider(MarketDataProvider):
+    """Generates deterministic fake data, only used to build recordings"""
+
+    def __init__(self, years: int, seed: int):
+        self.years = years
+        self.seed = seed
+
+    def _seed(self, symbol: str) -> int:
+        return self.seed + sum(ord(c) * 31 ** i for i, c in enumerate(symbol)) % 100_000
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return synthetic_history(self.years * 252, seed=self._seed(symbol))
+
+    def quote(self, symbol: str) -> Dict:
+        close = self.history(symbol)['Close']
+        return make_quote(symbol, float(close.iloc[-1]), float(close.iloc[-2]))
+
+    def info(self, symbol: str) -> Dict:
+        rng = np.random.default_rng(self._seed(symbol))
+        market_cap = int(rng.uniform(1e9, 2e12))
+        return {
+            'longName': f"{symbol} Synthetic Inc.",
+            'marketCap': market_cap,
+            '52WeekChange': float(rng.normal(0.1, 0.2)),
+            'trailingPE': round(float(rng.uniform(8, 40)), 2),
+            'forwardPE': round(float(rng.uniform(8, 35)), 2),
+            'pegRatio': round(float(rng.uniform(0.5, 3)), 2),
+            'beta': round(float(rng.uniform(0.5, 2)), 2),
+            'revenueGrowth': round(float(rng.normal(0.08, 0.05)), 3),
+            'grossMargins': round(float(rng.uniform(0.2, 0.7)), 3),
+            'profitMargins': round(float(rng.uniform(0.02, 0.3)), 3),
+            'operatingMargins': round(float(rng.uniform(0.05, 0.4)), 3),
+            'institutionPercentHeld': round(float(rng.uniform(0.3, 0.9)), 3),
+            'insiderPercentHeld': round(float(rng.uniform(0, 0.1)), 3),
+            'shortRatio': round(float(rng.uniform(0.5, 5)), 2),
+            'shortPercentOfFloat': round(float(rng.uniform(0, 0.1)), 3),
+            'sharesOutstanding': int(market_cap / self.history(symbol)['Close'].iloc[-1]),
+        }
+
+    def income_stmt(self, symbol: str) -> Optional[pd.DataFrame]:
+        rng = np.random.default_rng(self._seed(symbol))
+        periods = pd.date_range(end=pd.Timestamp.now().normalize(), periods=4, freq='YE')[::-1]
+        revenue = rng.uniform(1e9, 1e11) * np.linspace(1, 0.8, 4)
+        return pd.DataFrame(
+            [revenue, revenue * rng.uniform(0.05, 0.25)],
+            index=['Total Revenue', 'Net Income'],
+            columns=periods,
+        )
+
+
+def provider_from_env() -> MarketDataProvider:
+    """Builds the provider selected by the ML_TERMINAL_* environment variables"""
+    kind = os.environ.get("ML_TERMINAL_PROVIDER", "yfinance").lower()
+    root = os.environ.get("ML_TERMINAL_REPLAY_DIR", os.path.join(DATA_DIR, "replay"))
+    if kind == "replay":
+        return ReplayProvider(
+            root,
+            latency=float(os.environ.get("ML_TERMINAL_REPLAY_LATENCY", 0)),
+            jitter=float(os.environ.get("ML_TERMINAL_REPLAY_JITTER", 0)),
+            failure_rate=float(os.environ.get("ML_TERMINAL_REPLAY_FAILURE_RATE", 0)),
+        )
+    if kind == "record":
+        return RecordingProvider(YFinanceProvider(), root)
+    if kind == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"Unknown ML_TERMINAL_PROVIDER '{kind}'")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic replay recording")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--root", default=os.path.join(DATA_DIR, "replay"))
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+    write_synthetic_recording(args.root, args.symbols, years=args.years)
+    print(f"Recorded {len(args.symbols)} symbols to {args.root}")
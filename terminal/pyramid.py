@@ -0,0 +1,172 @@
+"""
+Multi-timeframe OHLCV resampling pyramid (1m -> 5m -> 1h -> 1d -> 1wk -> 1mo).
+
+Like image mipmaps, every level is a coarser copy of the one below it, kept
+in the memory-mapped BarStore. New base bars only re-aggregate the last
+bucket of each level and append after it. Charts read the finest level whose
+bar count over the requested range fits the point budget, so a 10 year chart
+reads about 520 weekly bars instead of 2,500 daily ones.
+"""
+import bisect
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from terminal.barstore import RECORD, BarStore, _ns, to_frame
+from terminal.downsample import DEFAULT_POINT_BUDGET
+
+LEVELS = ["1m", "5m", "1h", "1d", "1wk", "1mo"]
+
+_MINUTE = 60 * 10**9
+_DAY = 86400 * 10**9
+_FIXED = {"1m": _MINUTE, "5m": 5 * _MINUTE, "1h": 60 * _MINUTE}
+
+
+def bucket_starts(ts: np.ndarray, interval: str, tz: Optional[str]) -> np.ndarray:
+    """
+    Start of the `interval` bucket each UTC nanosecond timestamp falls in
+
+    Buckets follow the exchange's wall clock: hours start on the clock hour,
+    days at local midnight, weeks on Monday and months on the 1st, the way
+    yfinance stamps daily and longer bars.
+    """
+    offset = np.zeros(len(ts), dtype=np.int64)
+    if tz and len(ts):
+        local = pd.DatetimeIndex(ts.astype("datetime64[ns]")).tz_localize("UTC").tz_convert(tz)
+        offset = local.tz_localize(None).asi8 - ts
+    local = ts + offset
+    if interval in ("1m", "5m", "1h"):
+        # Within an hour the UTC offset only changes at a DST switch, so the
+        # bar's own offset maps the bucket start back to UTC
+        return local - local % _FIXED[interval] - offset
+    if interval == "1d":
+        start = local - local % _DAY
+    elif interval == "1wk":
+        days = local // _DAY
+        # 1970-01-01 was a Thursday, so Monday is (days + 3) % 7 == 0
+        start = (days - (days + 3) % 7) * _DAY
+    elif interval == "1mo":
+        start = local.astype("datetime64[ns]").astype("datetime64[M]").astype("datetime64[ns]").view("i8")
+    else:
+        raise ValueError(f"Unknown interval '{interval}', expected one of {LEVELS}")
+    if not tz:
+        return start
+    # Days and longer can span a DST switch, so convert each distinct
+    # bucket start with its own offset rather than the bar's
+    starts, inverse = np.unique(start, return_inverse=True)
+    utc = (pd.DatetimeIndex(starts.astype("datetime64[ns]"))
+           .tz_localize(tz, ambiguous=True, nonexistent="shift_forward")
+           .tz_convert("UTC").tz_localize(None).asi8)
+    return utc[inverse]
+
+
+def resample(records: np.ndarray, interval: str, tz: Optional[str]) -> np.ndarray:
+    """Aggregates RECORD bars into `interval` buckets: first open, max high, min low, last close, summed volume"""
+    if not len(records):
+        return np.empty(0, dtype=RECORD)
+    keys = bucket_starts(np.asarray(records["ts"]), interval, tz)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    lasts = np.append(starts[1:], len(records)) - 1
+    out = np.empty(len(starts), dtype=RECORD)
+    out["ts"] = keys[starts]
+    out["open"] = records["open"][starts]
+    out["high"] = np.fmax.reduceat(np.asarray(records["high"]), starts)
+    out["low"] = np.fmin.reduceat(np.asarray(records["low"]), starts)
+    out["close"] = records["close"][lasts]
+    out["volume"] = np.add.reduceat(np.nan_to_num(np.asarray(records["volume"])), starts)
+    return out
+
+
+class BarPyramid:
+    """
+    Resampling levels above a base interval, kept in a BarStore
+
+    Parameters:
+        store (BarStore): Where every level is stored, one file per interval
+        base (str): Finest level, "1m" for intraday data or "1d" for daily
+    """
+
+    def __init__(self, store: BarStore, base: str = "1m"):
+        if base not in LEVELS:
+            raise ValueError(f"Unknown base interval '{base}', expected one of {LEVELS}")
+        self.store = store
+        self.base = base
+        self.levels: List[str] = LEVELS[LEVELS.index(base):]
+
+    def append(self, symbol: str, bars: pd.DataFrame) -> int:
+        """
+        Adds new base bars and updates every level above incrementally
+
+        Bars older than the last stored base bar are ignored, use `rebuild`
+        to replace the history.
+
+        Returns:
+            int: Base bars written
+        """
+        written = self.store.append(symbol, self.base, bars)
+        if written:
+            tz = self.store.timezone(symbol, self.base)
+            for lower, upper in zip(self.levels, self.levels[1:]):
+                last = self.store.last_timestamp(symbol, upper)
+                source = self.store.records(symbol, lower)
+                # Only the last bucket of the level above can change, re-aggregate
+                # from its start; the store replaces it and appends the rest
+                i = bisect.bisect_left(source["ts"], last.value) if last is not None else 0
+                self.store.append(symbol, upper, to_frame(resample(source[i:], upper, tz), tz))
+        return written
+
+    def rebuild(self, symbol: str, bars: pd.DataFrame) -> int:
+        """Replaces all levels of a symbol with the given base bars"""
+        for interval in self.levels:
+            self.store.delete(symbol, interval)
+        return self.append(symbol, bars)
+
+    def sync(self, symbol: str, bars: pd.DataFrame) -> int:
+        """
+        Brings the pyramid in line with a symbol's full base history
+
+        New bars are appended. The levels are rebuilt when `bars` starts
+        earlier than the stored base level, or when its first close differs,
+        which means the history was re-adjusted for a split or dividend.
+        """
+        if bars is None or bars.empty:
+            return 0
+        stored = self.store.records(symbol, self.base)
+        if len(stored) and (
+            _ns(bars.index[0]) != int(stored[0]["ts"])
+            or not np.isclose(float(bars["Close"].iloc[0]), float(stored[0]["close"]), rtol=1e-6)
+        ):
+            return self.rebuild(symbol, bars)
+        return self.append(symbol, bars)
+
+    def count(self, symbol: str, interval: str, start=None, end=None) -> int:
+        """Bars of a level in [start, end), found by binary search"""
+        return len(self.store.read(symbol, interval, start, end))
+
+    def choose_level(self, symbol: str, start=None, end=None, max_points: int = DEFAULT_POINT_BUDGET) -> str:
+        """Finest level with at most `max_points` bars over the range, else the coarsest"""
+        for interval in self.levels:
+            if self.count(symbol, interval, start, end) <= max_points:
+                return interval
+        return self.levels[-1]
+
+    def read_frame(self, symbol: str, interval: str, start=None, end=None,
+                   warmup: int = 0) -> Tuple[pd.DataFrame, int]:
+        """
+        Bars of one level in [start, end) plus up to `warmup` bars before start
+
+        Returns:
+            Tuple[pd.DataFrame, int]: OHLCV bars and how many of them are warm-up
+        """
+        records = self.store.records(symbol, interval)
+        tz = self.store.timezone(symbol, interval)
+        timestamps = records["ts"]
+        i = 0
+        if start is not None:
+            # Include the bar whose bucket holds start, e.g. the week it falls in
+            first_bucket = bucket_starts(np.array([_ns(start, tz)]), interval, tz)[0]
+            i = bisect.bisect_left(timestamps, first_bucket)
+        j = bisect.bisect_left(timestamps, _ns(end, tz)) if end is not None else len(records)
+        first = max(0, i - warmup)
+        return to_frame(records[first:j], tz), i - first
@@ -0,0 +1,207 @@
+"""Concurrent quote fetching and the quote table behind the watchlist."""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+# Shared pool so a rerun never waits for the previous batch's stragglers to exit
+MAX_WORKERS = 16
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="quotes")
+_REFRESHER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="quote-refresh")
+
+# Seconds a quote request may run, counted from when a worker starts it
+DEFAULT_TIMEOUT = 5.0
+
+
+def make_quote(symbol: str, price: float, prev_close: float) -> Dict:
+    """Builds the quote dictionary used throughout the app"""
+    change = ((price - prev_close) / prev_close) * 100 if prev_close != 0 else 0
+    return {
+        "symbol": symbol,
+        "price": price,
+        "prev_close": prev_close,
+        "change": change,
+        "timestamp": time.time(),
+    }
+
+
+def fetch_quotes(
+    symbols: Iterable[str],
+    fetch_quote: Callable[[str], Dict],
+    timeout: float = DEFAULT_TIMEOUT,
+    queue_timeout: Optional[float] = None,
+) -> Dict[str, Dict]:
+    """
+    Fetches quotes for all symbols concurrently
+
+    Requests run in parallel on a shared pool, so a batch of up to MAX_WORKERS
+    symbols takes about as long as its slowest quote. Every request has its
+    own deadline of `timeout` seconds from when a worker starts it, so quotes
+    queued behind a busy pool are not charged for the wait. A request that
+    has not started after `queue_timeout` seconds is cancelled, which bounds
+    the whole batch by queue_timeout + timeout. Symbols that fail or miss
+    their deadline are left out of the result.
+
+    Parameters:
+        symbols (Iterable[str]): Ticker symbols, duplicates are fetched once
+        fetch_quote (Callable): Function returning a quote dict for one symbol,
+            usually a provider's `quote` method
+        timeout (float): Seconds each request may run once started
+        queue_timeout (float): Seconds a request may wait for a worker, `timeout` by default
+
+    Returns:
+        Dict[str, Dict]: Quotes keyed by symbol for the calls that succeeded
+    """
+    queue_timeout = timeout if queue_timeout is None else queue_timeout
+    started: Dict[str, float] = {}
+
+    def run(symbol: str) -> Dict:
+        started[symbol] = time.monotonic()
+        return fetch_quote(symbol)
+
+    submitted = time.monotonic()
+    futures = {_EXECUTOR.submit(run, symbol): symbol for symbol in dict.fromkeys(symbols)}
+    pending = set(futures)
+    finished = []
+    while pending:
+        now = time.monotonic()
+        deadlines = []
+        for future in list(pending):
+            if future.done():
+                pending.discard(future)
+                finished.append(future)
+                continue
+            start = started.get(futures[future])
+            deadline = submitted + queue_timeout if start is None else start + timeout
+            if now < deadline:
+                deadlines.append(deadline)
+            elif start is not None or future.cancel():
+                # Past its deadline; a running request finishes in the background, unused
+                pending.discard(future)
+        if pending:
+            # A request that just started has no deadline yet, look again shortly
+            next_deadline = min(deadlines, default=now + 0.01)
+            wait(pending, timeout=max(next_deadline - now, 0), return_when=FIRST_COMPLETED)
+
+    quotes = {}
+    for future in finished:
+        try:
+            quotes[futures[future]] = future.result()
+        except Exception:
+            continue
+    return quotes
+
+
+class QuoteTable:
+    """
+    Compact array-backed table of the latest quote per symbol
+
+    Each symbol owns one row in parallel NumPy arrays of last price, previous
+    close, change and quote time, so reading a watchlist of any length is a
+    single fancy-index instead of a dictionary walk. Refreshes run on the
+    shared quote pool; a symbol already being refreshed is not requested
+    again until its batch finishes.
+
+    Parameters:
+        capacity (int): Initial number of rows, doubled when full
+    """
+
+    COLUMNS = ("price", "prev_close", "change", "timestamp")
+
+    def __init__(self, capacity: int = 64):
+        self._rows: Dict[str, int] = {}
+        self._arrays = {col: np.full(capacity, np.nan) for col in self.COLUMNS}
+        # time.time() of the last failed refresh per row, NaN if it succeeded
+        self._failed_at = np.full(capacity, np.nan)
+        self._inflight: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _row(self, symbol: str) -> int:
+        row = self._rows.get(symbol)
+        if row is None:
+            row = self._rows[symbol] = len(self._rows)
+            if row == len(self._failed_at):
+                grow = lambda a: np.concatenate([a, np.full(len(a), np.nan)])
+                self._arrays = {col: grow(a) for col, a in self._arrays.items()}
+                self._failed_at = grow(self._failed_at)
+        return row
+
+    def update(self, quotes: Dict[str, Dict], failed: Iterable[str] = ()):
+        """Writes fetched quotes into their rows and marks failed symbols"""
+        with self._lock:
+            for symbol, quote in quotes.items():
+                row = self._row(symbol.upper())
+                for col in self.COLUMNS:
+                    self._arrays[col][row] = quote[col]
+                self._failed_at[row] = np.nan
+            now = time.time()
+            for symbol in failed:
+                self._failed_at[self._row(symbol.upper())] = now
+
+    def refresh(self, symbols: Iterable[str], fetch_quote: Callable[[str], Dict],
+                timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Dict]:
+        """Fetches quotes for all symbols in one concurrent batch and stores them"""
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        try:
+            quotes = fetch_quotes(symbols, fetch_quote, timeout)
+            self.update(quotes, failed=[s for s in symbols if s not in quotes])
+            return quotes
+        finally:
+            with self._lock:
+                self._inflight.difference_update(symbols)
+
+    def refresh_async(self, symbols: Iterable[str], fetch_quote: Callable[[str], Dict],
+                      timeout: float = DEFAULT_TIMEOUT) -> Optional[Future]:
+        """Starts a background refresh of the symbols not already being refreshed"""
+        with self._lock:
+            pending = [s.upper() for s in dict.fromkeys(symbols) if s.upper() not in self._inflight]
+            self._inflight.update(pending)
+        if not pending:
+            return None
+        # Runs off the quote pool, whose workers the batch itself needs
+        return _REFRESHER.submit(self.refresh, pending, fetch_quote, timeout)
+
+    def snapshot(self, symbols: Iterable[str], max_age: float) -> pd.DataFrame:
+        """
+        Quotes for the given symbols, with staleness marks
+
+        Parameters:
+            symbols (Iterable[str]): Symbols in display order
+            max_age (float): Seconds after which a quote is marked stale
+
+        Returns:
+            pd.DataFrame: price, prev_close, change, age in seconds and a
+            status of "live", "stale" or "unavailable", indexed by symbol
+        """
+        symbols = [s.upper() for s in symbols]
+        with self._lock:
+            rows = np.array([self._rows.get(s, -1) for s in symbols], dtype=int)
+            known = rows >= 0
+            picked = np.where(known, rows, 0)
+            table = {col: np.where(known, a[picked], np.nan) for col, a in self._arrays.items()}
+            failed = np.where(known, self._failed_at[picked], np.nan)
+
+        age = time.time() - table.pop("timestamp")
+        status = np.where(np.isnan(age), "unavailable",
+                          np.where((age > max_age) | ~np.isnan(failed), "stale", "live"))
+        frame = pd.DataFrame(table, index=pd.Index(symbols, name="symbol"))
+        frame["age"] = age
+        frame["status"] = status
+        return frame
+
+    def due_for_refresh(self, symbols: Iterable[str], max_age: float) -> List[str]:
+        """Symbols without a quote or with one older than max_age, skipping recent failures"""
+        symbols = [s.upper() for s in symbols]
+        now = time.time()
+        with self._lock:
+            rows = np.array([self._rows.get(s, -1) for s in symbols], dtype=int)
+            known = rows >= 0
+            picked = np.where(known, rows, 0)
+            # NaN compares False, so rows that never succeeded or never failed count as not recent
+            fresh = now - self._arrays["timestamp"][picked] <= max_age
+            failed_recently = now - self._failed_at[picked] < max_age
+        due = ~known | ~(fresh | failed_recently)
+        return [s for s, d in zip(symbols, due) if d]
@@ -0,0 +1,42 @@
+"""
+Rolling window and exponential smoothing primitives on 2-D NumPy arrays.
+
+Both work along axis 0 (bars) for every column (symbol) at once. They are
+shared by the screener's indicator panel and the backtester's signal features.
+"""
+import numpy as np
+
+
+def ewm(values: np.ndarray, alpha) -> np.ndarray:
+    """
+    pandas `ewm(adjust=False)` along axis 0 for every column at once
+
+    Columns may only have leading NaNs; each one is seeded on its first value.
+    """
+    out = np.empty(values.shape)
+    if not len(values):
+        return out
+    missing = np.isnan(values)
+    first = np.argmax(~missing, axis=0)
+    seed = np.take_along_axis(values, first[None], axis=0)[0]
+    filled = np.where(missing, seed, values)
+
+    alpha = np.broadcast_to(alpha, values.shape[1:])
+    decay = 1 - alpha
+    state = filled[0].copy()
+    step = np.empty(values.shape[1:])
+    for t in range(values.shape[0]):
+        state *= decay
+        np.multiply(filled[t], alpha, out=step)
+        state += step
+        out[t] = state
+    return out
+
+
+def window_total(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """Sum over the trailing `window` rows given a cumulative sum along axis 0"""
+    out = np.full(cumulative.shape, np.nan)
+    if cumulative.shape[0] >= window:
+        out[window - 1] = cumulative[window - 1]
+        out[window:] = cumulative[window:] - cumulative[:-window]
+    return out
@@ -0,0 +1,214 @@
+"""
+Background refresh of the data sessions are currently viewing.
+
+One RefreshScheduler per server process re-fetches each watched key on its
+own interval and writes the result into the SharedCache, where sessions pick
+it up with a non-blocking `get`. Upstream calls therefore scale with the
+number of distinct symbols being viewed, not with the number of viewers.
+"""
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from terminal.cache import SharedCache
+
+# Longest delay between retries of a failing refresh
+MAX_BACKOFF = 600.0
+
+# Seconds a watch stays alive without being renewed by its session; watches
+# with a longer interval live for two of their intervals instead
+DEFAULT_LEASE = 120.0
+
+
+class _Watch:
+    """One refreshed key and the sessions interested in it"""
+
+    def __init__(self, key: Hashable, fetch: Callable[[], Any]):
+        self.key = key
+        self.fetch = fetch
+        # Viewer id -> (interval, lease expiry)
+        self.viewers: Dict[str, tuple] = {}
+        self.ttl: Optional[float] = None
+        self.due = 0.0
+        self.failures = 0
+        self.running = False
+        self.last_refresh: Optional[float] = None
+
+    def interval(self, now: float) -> Optional[float]:
+        """Shortest interval asked for by a viewer whose lease has not run out"""
+        self.viewers = {v: w for v, w in self.viewers.items() if w[1] > now}
+        return min((w[0] for w in self.viewers.values()), default=None)
+
+
+class RefreshScheduler:
+    """
+    Keeps watched cache entries fresh from a single background thread
+
+    Sessions call `watch` on every rerun to renew their interest in a key;
+    a key nobody has renewed for `lease` seconds, or for two of its
+    intervals when that is longer, is dropped. Each key is
+    refreshed at the shortest interval any of its viewers asked for, waits
+    for its market to open while it is closed and backs off exponentially
+    after errors.
+
+    Parameters:
+        cache (SharedCache): Cache the refreshed values are written to
+        seconds_until_open (Callable): Seconds until the market of a key
+            opens, 0 while it is open
+        max_workers (int): Refreshes allowed to run at the same time
+        lease (float): Seconds a watch lives without being renewed, at least
+            twice its interval
+    """
+
+    def __init__(
+        self,
+        cache: SharedCache,
+        seconds_until_open: Callable[[Hashable], float] = lambda key: 0.0,
+        max_workers: int = 4,
+        lease: float = DEFAULT_LEASE,
+    ):
+        self.cache = cache
+        self.seconds_until_open = seconds_until_open
+        self.lease = lease
+        self._watches: Dict[Hashable, _Watch] = {}
+        self._queue: list = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh")
+        self._stats = {"refreshes": 0, "errors": 0}
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+
+    def watch(self, key: Hashable, fetch: Callable[[], Any], interval: float, viewer: str,
+              ttl: Optional[float] = None):
+        """
+        Registers or renews a session's interest in keeping `key` fresh
+
+        Parameters:
+            key (Hashable): Cache key the refreshed value is stored under
+            fetch (Callable): Produces the new value; None results are skipped
+            interval (float): Seconds between refreshes wanted by this viewer
+            viewer (str): Id of the session, one watch per session and key
+            ttl (float): Cache TTL for refreshed values, twice the interval by default
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._watches.get(key)
+            if entry is None:
+                entry = self._watches[key] = _Watch(key, fetch)
+                entry.due = now + max(interval, self._closed_for(key))
+                self._push(entry)
+            entry.fetch = fetch
+            entry.ttl = ttl
+            previous = entry.interval(now)
+            entry.viewers[viewer] = (interval, self._expiry(now, interval))
+            if previous is not None and interval < previous and not entry.running:
+                # A faster viewer joined, pull the next refresh forward
+                entry.due = min(entry.due, now + max(interval, self._closed_for(key)))
+                self._push(entry)
+            self._wakeup.notify()
+
+    def renew(self, viewer: str):
+        """Extends the lease of every watch held by a session without rerunning it"""
+        now = time.monotonic()
+        with self._lock:
+            for entry in self._watches.values():
+                if viewer in entry.viewers:
+                    interval = entry.viewers[viewer][0]
+                    entry.viewers[viewer] = (interval, self._expiry(now, interval))
+
+    def unwatch(self, key: Hashable, viewer: str):
+        """Drops a session's interest in a key"""
+        with self._lock:
+            entry = self._watches.get(key)
+            if entry is not None:
+                entry.viewers.pop(viewer, None)
+
+    def last_refresh(self, key: Hashable) -> Optional[float]:
+        """time.time() of the last successful refresh of `key`, None if there was none"""
+        with self._lock:
+            entry = self._watches.get(key)
+            return entry.last_refresh if entry is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """Refresh and error counters plus the number of watched keys"""
+        with self._lock:
+            return dict(self._stats, watched=len(self._watches))
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
+        self._thread.join()
+        self._pool.shutdown(wait=False)
+
+    def _expiry(self, now: float, interval: float) -> float:
+        # Outlive the viewer's own interval, or the watch would expire before its first refresh
+        return now + max(self.lease, 2 * interval)
+
+    def _push(self, entry: _Watch):
+        heapq.heappush(self._queue, (entry.due, next(self._order), entry.key))
+
+    def _run(self):
+        with self._lock:
+            while not self._stopped:
+                now = time.monotonic()
+                if not self._queue:
+                    self._wakeup.wait()
+                    continue
+                due, _, key = self._queue[0]
+                if due > now:
+                    self._wakeup.wait(due - now)
+                    continue
+                heapq.heappop(self._queue)
+                entry = self._watches.get(key)
+                # Skip stale heap items left behind when a due time moved
+                if entry is None or entry.running or entry.due != due:
+                    continue
+                if entry.interval(now) is None:
+                    del self._watches[key]
+                    continue
+                entry.running = True
+                self._pool.submit(self._refresh, entry)
+
+    def _refresh(self, entry: _Watch):
+        try:
+            value = entry.fetch()
+            error = False
+        except Exception:
+            value, error = None, True
+
+        now = time.monotonic()
+        with self._lock:
+            entry.running = False
+            interval = entry.interval(now)
+            if interval is None:
+                self._watches.pop(entry.key, None)
+                return
+            if value is not None:
+                self.cache.set(entry.key, value, entry.ttl or 2 * interval)
+                entry.last_refresh = time.time()
+                self._stats["refreshes"] += 1
+            if error:
+                entry.failures += 1
+                self._stats["errors"] += 1
+                delay = min(interval * 2 ** entry.failures, MAX_BACKOFF)
+            else:
+                entry.failures = 0
+                delay = interval
+            # A closed market has no new data, sleep until it opens
+            delay = max(delay, self._closed_for(entry.key))
+            entry.due = now + delay
+            self._push(entry)
+            self._wakeup.notify()
+
+    def _closed_for(self, key: Hashable) -> float:
+        try:
+            return self.seconds_until_open(key)
+        except Exception:
+            return 0.0
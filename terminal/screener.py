@@ -0,0 +1,195 @@
+"""
+Vectorized multi-symbol indicator panel and screener.
+
+Histories for a universe of symbols are aligned into one 2-D price panel
+(bars x symbols) and every indicator from calculate_technical_indicators is
+computed for all symbols at once with NumPy array operations.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from terminal.indicators import (
+    BB_DEV, BB_WINDOW, INDICATOR_COLUMNS, MACD_FAST, MACD_SIGN, MACD_SLOW, RSI_WINDOW,
+)
+from terminal.rolling import ewm, window_total
+
+# Default screen shown in the UI
+DEFAULT_QUERY = "RSI < 30 and Close > SMA_200"
+
+
+class PricePanel:
+    """
+    Close and volume arrays for many symbols, aligned on their latest bar
+
+    Row -1 holds every symbol's most recent bar, row -2 the one before and so
+    on. Aligning by bar rather than by calendar date keeps symbols from
+    exchanges with different holidays free of gaps, so rolling windows and
+    averages match the single-symbol results. Shorter histories are padded
+    with NaN at the top.
+
+    Parameters:
+        symbols (List[str]): Column order of the arrays
+        dates (np.ndarray): Bar timestamps, shape (bars, symbols), NaT where padded
+        close (np.ndarray): Close prices, shape (bars, symbols), NaN where padded
+        volume (np.ndarray): Volumes, same shape as close
+    """
+
+    def __init__(self, symbols: List[str], dates: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        self.symbols = symbols
+        self.dates = dates
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_histories(cls, histories: Dict[str, pd.DataFrame]) -> "PricePanel":
+        """Builds a panel from per-symbol OHLCV frames"""
+        # Plain arrays per symbol, pandas indexing per frame dominates otherwise
+        columns = {}
+        for symbol, df in histories.items():
+            if df is None or df.empty:
+                continue
+            close = df['Close'].to_numpy(dtype=float)
+            keep = ~np.isnan(close)
+            index = df.index
+            if getattr(index, 'tz', None) is not None:
+                index = index.tz_localize(None)
+            columns[symbol] = (
+                close[keep],
+                np.nan_to_num(df['Volume'].to_numpy(dtype=float)[keep]),
+                index.to_numpy(dtype='datetime64[ns]')[keep],
+            )
+        columns = {s: c for s, c in columns.items() if len(c[0])}
+        bars = max((len(c[0]) for c in columns.values()), default=0)
+        close = np.full((bars, len(columns)), np.nan)
+        volume = np.full((bars, len(columns)), np.nan)
+        dates = np.full((bars, len(columns)), np.datetime64('NaT'), dtype='datetime64[ns]')
+        for col, (c, v, d) in enumerate(columns.values()):
+            n = len(c)
+            close[bars - n:, col] = c
+            volume[bars - n:, col] = v
+            dates[bars - n:, col] = d
+        return cls(list(columns), dates, close, volume)
+
+
+def panel_indicators(close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Computes the calculate_technical_indicators columns for a whole panel
+
+    Columns may only have leading NaNs, as produced by PricePanel.
+
+    Parameters:
+        close (np.ndarray): Close prices, shape (bars, symbols)
+        volume (np.ndarray): Volumes, same shape
+
+    Returns:
+        Dict[str, np.ndarray]: Indicator arrays keyed by column name, same shape as close
+    """
+    valid = ~np.isnan(close)
+    count = np.cumsum(valid, axis=0)
+    nan = np.nan
+
+    # Prices are centred per symbol so cumulative sums stay small and precise
+    offset = np.nanmean(close, axis=0) if close.size else 0.0
+    offset = np.where(np.isnan(offset), 0.0, offset)
+    centred = np.where(valid, close - offset, 0.0)
+    csum = np.cumsum(centred, axis=0)
+    csumsq = np.cumsum(centred * centred, axis=0)
+
+    def rolling_mean(cumulative, window):
+        with np.errstate(invalid='ignore'):
+            full = window_total(count, window) == window
+            return np.where(full, window_total(cumulative, window) / window, nan)
+
+    # First bar of every symbol has no previous close and counts as unchanged
+    diff = np.full(close.shape, np.nan)
+    diff[1:] = close[1:] - close[:-1]
+    diff = np.where(valid & (count == 1), 0.0, diff)
+    up = np.maximum(diff, 0.0)
+    down = np.maximum(-diff, 0.0)
+
+    # All exponential averages of the close series share one time loop
+    alphas = np.array([2 / 10, 2 / (MACD_FAST + 1), 2 / (MACD_SLOW + 1), 1 / RSI_WINDOW, 1 / RSI_WINDOW])
+    stacked = np.stack([close, close, close, up, down], axis=1)
+    ema9, ema_fast, ema_slow, avg_up, avg_down = np.moveaxis(ewm(stacked, alphas[:, None]), 1, 0)
+
+    out = {}
+    out['EMA_9'] = np.where(count >= 9, ema9, nan)
+    for w in (20, 50, 200):
+        out[f'SMA_{w}'] = rolling_mean(csum, w) + offset
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down))
+    out['RSI'] = np.where(count >= RSI_WINDOW, rsi, nan)
+
+    macd = np.where(count >= MACD_SLOW, ema_fast - ema_slow, nan)
+    signal = ewm(macd, 2 / (MACD_SIGN + 1))
+    signal_count = np.cumsum(~np.isnan(macd), axis=0)
+    out['MACD'] = macd
+    out['MACD_Signal'] = np.where(signal_count >= MACD_SIGN, signal, nan)
+
+    mean = rolling_mean(csum, BB_WINDOW)
+    std = np.sqrt(np.maximum(rolling_mean(csumsq, BB_WINDOW) - mean * mean, 0.0))
+    out['BB_Middle'] = mean + offset
+    out['BB_Upper'] = out['BB_Middle'] + BB_DEV * std
+    out['BB_Lower'] = out['BB_Middle'] - BB_DEV * std
+
+    signed = np.where(diff < 0, -volume, volume)
+    obv = np.cumsum(np.where(valid, signed, 0.0), axis=0)
+    out['OBV'] = np.where(count > 0, obv, nan)
+    return out
+
+
+def snapshot(panel: PricePanel, indicators: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+    """Latest close, daily change and indicator values, one row per symbol"""
+    if indicators is None:
+        indicators = panel_indicators(panel.close, panel.volume)
+    if not len(panel.close):
+        return pd.DataFrame(columns=['Close', 'Change %', 'Date'] + INDICATOR_COLUMNS)
+    close = panel.close[-1]
+    prev_close = panel.close[-2] if len(panel.close) > 1 else np.full(close.shape, np.nan)
+    table = pd.DataFrame({
+        'Close': close,
+        'Change %': (close / prev_close - 1) * 100,
+        'Date': panel.dates[-1],
+    }, index=pd.Index(panel.symbols, name='Symbol'))
+    for col in INDICATOR_COLUMNS:
+        table[col] = indicators[col][-1]
+    return table
+
+
+def screen(table: pd.DataFrame, query: str = DEFAULT_QUERY, sort_by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Filters a snapshot table with a pandas query such as "RSI < 30 and Close > SMA_200"
+
+    Raises:
+        ValueError: If the query cannot be evaluated
+    """
+    try:
+        result = table.query(query) if query.strip() else table
+    except Exception as e:
+        raise ValueError(f"Invalid screen '{query}': {e}") from e
+    if sort_by and sort_by in result.columns:
+        result = result.sort_values(sort_by)
+    return result
+
+
+def load_histories(
+    symbols: Iterable[str],
+    load: Callable[[str], Optional[pd.DataFrame]],
+    max_workers: int = 8,
+) -> Dict[str, pd.DataFrame]:
+    """Loads histories for a universe concurrently, skipping symbols that fail"""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+
+    def safe_load(symbol):
+        try:
+            return load(symbol)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screener") as pool:
+        results = pool.map(safe_load, symbols)
+    return {s: df for s, df in zip(symbols, results) if df is not None and not df.empty}
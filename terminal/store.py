@@ -0,0 +1,330 @@
+"""Persistent per-symbol OHLCV store with incremental (delta) fetching."""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from terminal.calendars import calendar_for
+
+# Root folder for everything the terminal persists on disk
+DATA_DIR = os.environ.get(
+    "ML_TERMINAL_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"),
+)
+
+# yfinance style periods mapped to how far back the returned window reaches
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+    "max": None,
+}
+
+# Covered-from date recorded after a period="max" download
+EARLIEST = pd.Timestamp("1900-01-01")
+
+# Seconds the latest bars are reused while the symbol's exchange is in session;
+# outside sessions they are reused until the next one starts
+DELTA_TTL = 5.0
+
+# Symbols whose history is kept in memory, least recently used ones are dropped
+DEFAULT_MAX_FRAMES = 64
+
+
+def symbol_filename(symbol: str, suffix: str) -> str:
+    """Turns a ticker such as ^GSPC or EURUSD=X into a safe file name"""
+    return quote(symbol.upper(), safe="") + suffix
+
+
+def _day(ts: pd.Timestamp) -> str:
+    return ts.strftime("%Y-%m-%d")
+
+
+def _localize(value, tz) -> pd.Timestamp:
+    """A naive date as a timestamp in the index time zone"""
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert(None) if tz is None else ts.tz_convert(tz)
+    elif tz is not None:
+        ts = ts.tz_localize(tz)
+    return ts
+
+
+def bars_before(df: pd.DataFrame, start) -> int:
+    """Number of bars dated before `start`, found by binary search on the index"""
+    if df.empty:
+        return 0
+    return int(df.index.searchsorted(_localize(pd.Timestamp(start).normalize(), df.index.tz)))
+
+
+def slice_range(df: pd.DataFrame, start=None, end=None, warmup: int = 0) -> pd.DataFrame:
+    """
+    Bars from `start` through the whole `end` day plus `warmup` bars before start
+
+    Both bounds are located by binary search on the sorted index, so the
+    slice costs O(log n) and returns a view of the stored frame.
+    """
+    if df.empty:
+        return df
+    i = bars_before(df, start) if start is not None else 0
+    j = len(df)
+    if end is not None:
+        day_after = _localize(pd.Timestamp(end).normalize() + pd.Timedelta(days=1), df.index.tz)
+        j = int(df.index.searchsorted(day_after))
+    return df.iloc[max(0, i - warmup):j]
+
+
+class HistoryStore:
+    """
+    Keeps daily OHLCV history for each symbol as a Parquet file and only asks
+    the upstream for what is missing: bars after the last stored one and any
+    part of a requested range older than what has been downloaded so far.
+
+    Parameters:
+        root (str): Folder holding one Parquet file per symbol
+        max_frames (int): Histories kept in memory, the rest are read from disk
+    """
+
+    def __init__(self, root: Optional[str] = None, max_frames: int = DEFAULT_MAX_FRAMES):
+        self.root = root or os.path.join(DATA_DIR, "history")
+        os.makedirs(self.root, exist_ok=True)
+        self.max_frames = max_frames
+        self._frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._frames_lock = threading.Lock()
+        self._covered: Dict[str, pd.Timestamp] = {}
+        self._checked: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol.upper(), threading.Lock())
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol_filename(symbol, ".parquet"))
+
+    def _meta_path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol_filename(symbol, ".json"))
+
+    def _cached(self, key: str) -> Optional[pd.DataFrame]:
+        with self._frames_lock:
+            df = self._frames.get(key)
+            if df is not None:
+                self._frames.move_to_end(key)
+            return df
+
+    def _remember(self, key: str, df: pd.DataFrame):
+        with self._frames_lock:
+            self._frames[key] = df
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Returns the stored history for a symbol, or None if nothing is stored"""
+        key = symbol.upper()
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+        except Exception:
+            # A corrupt or half-written file is treated as a cold start
+            return None
+        self._remember(key, df)
+        return df
+
+    def covered_start(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Earliest date the stored history is known to be complete from"""
+        key = symbol.upper()
+        if key not in self._covered:
+            try:
+                with open(self._meta_path(symbol)) as f:
+                    meta = json.load(f)
+                self._covered[key] = pd.Timestamp(meta["covered_start"])
+                if meta.get("checked") is not None:
+                    self._checked[key] = float(meta["checked"])
+            except Exception:
+                # Files written before coverage was tracked start at their first bar
+                stored = self.load(symbol)
+                if stored is None or stored.empty:
+                    return None
+                self._covered[key] = stored.index[0].tz_localize(None).normalize()
+        return self._covered[key]
+
+    def _write_meta(self, symbol: str):
+        key = symbol.upper()
+        tmp_path = self._meta_path(symbol) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"covered_start": _day(self._covered[key]), "checked": self._checked.get(key)}, f)
+        os.replace(tmp_path, self._meta_path(symbol))
+
+    def _set_covered(self, symbol: str, start: pd.Timestamp):
+        self._covered[symbol.upper()] = start
+        self._write_meta(symbol)
+
+    def _set_checked(self, symbol: str, t: float):
+        self._checked[symbol.upper()] = t
+        if symbol.upper() in self._covered:
+            self._write_meta(symbol)
+
+    def is_current(self, symbol: str, t: Optional[float] = None) -> bool:
+        """
+        True when the latest stored bars need no delta fetch at time t
+
+        That is when they were fetched less than DELTA_TTL seconds ago, or when
+        no session of the symbol's exchange has started since they were fetched.
+        """
+        t = time.time() if t is None else t
+        self.covered_start(symbol)
+        checked = self._checked.get(symbol.upper())
+        if checked is None:
+            return False
+        if t - checked < DELTA_TTL:
+            return True
+        # next_open is `checked` itself when a session was in progress then
+        opens = calendar_for(symbol).next_open(checked)
+        return opens is not None and opens > t
+
+    def save(self, symbol: str, df: pd.DataFrame):
+        """Writes the full history for a symbol atomically"""
+        path = self.path(symbol)
+        tmp_path = path + ".tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        self._remember(symbol.upper(), df)
+
+    def merge(self, symbol: str, new: pd.DataFrame) -> pd.DataFrame:
+        """Adds freshly fetched bars, replacing stored ones in the same span, and persists"""
+        stored = self.load(symbol)
+        if new is None or new.empty:
+            return stored if stored is not None else pd.DataFrame()
+        if stored is None or stored.empty:
+            merged = new
+        else:
+            first, last = new.index[0], new.index[-1]
+            overlap = stored[(stored.index >= first) & (stored.index <= last)]
+            if overlap.index.equals(new.index) and overlap.equals(new):
+                # Nothing changed, skip rewriting the file
+                return stored
+            merged = pd.concat([stored[stored.index < first], new, stored[stored.index > last]])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self.save(symbol, merged)
+        return merged
+
+    def _ensure(self, symbol: str, fetch: Callable[..., pd.DataFrame], start: Optional[pd.Timestamp],
+                end: pd.Timestamp) -> pd.DataFrame:
+        """Fetches whatever part of [start, end] is missing from the store"""
+        wanted = EARLIEST if start is None else start
+        stored = self.load(symbol)
+        covered = self.covered_start(symbol)
+
+        if stored is None or stored.empty or covered is None:
+            fetched_at = time.time()
+            history = self.merge(
+                symbol, fetch(period="max") if start is None else fetch(start=_day(start))
+            )
+            self._checked[symbol.upper()] = fetched_at
+            self._set_covered(symbol, wanted)
+            return history
+
+        history = stored
+        if wanted < covered:
+            # Only the older sub-range is missing
+            older = (fetch(period="max", end=_day(covered)) if start is None
+                     else fetch(start=_day(start), end=_day(covered)))
+            history = self.merge(symbol, older)
+            self._set_covered(symbol, wanted)
+
+        last = history.index[-1].tz_localize(None).normalize()
+        if end >= last and not self.is_current(symbol):
+            # Re-request the last stored bar as well, it may have been partial
+            fetched_at = time.time()
+            delta = fetch(start=_day(last))
+            self._set_checked(symbol, fetched_at)
+            if _has_corporate_action(delta[delta.index > history.index[-1]]):
+                # Splits and dividends rewrite adjusted prices, so start over
+                covered = self.covered_start(symbol)
+                fresh = fetch(period="max") if covered <= EARLIEST else fetch(start=_day(covered))
+                if not fresh.empty:
+                    self.save(symbol, fresh)
+                    return fresh
+            history = self.merge(symbol, delta)
+        return history
+
+    def get_range(
+        self,
+        symbol: str,
+        fetch: Callable[..., pd.DataFrame],
+        start=None,
+        end=None,
+        warmup: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Returns bars from `start` through `end`, plus `warmup` bars before start
+
+        Only sub-ranges that are not stored yet are requested upstream, so
+        widening or moving the range does not re-download what is on disk.
+
+        Parameters:
+            symbol (str): Ticker symbol
+            fetch (Callable): Upstream fetcher accepting yfinance `history` keywords
+            start: First date to show, None for the full history
+            end: Last date to show, None for today
+            warmup (int): Extra bars before start, e.g. 200 for SMA_200
+
+        Returns:
+            pd.DataFrame: OHLCV history indexed by timestamp
+        """
+        today = pd.Timestamp.now().normalize()
+        start = pd.Timestamp(start).normalize() if start is not None else None
+        end = pd.Timestamp(end).normalize() if end is not None else today
+        fetch_start = start
+        if start is not None and warmup:
+            # Calendar days that hold `warmup` trading days, with room for holidays
+            fetch_start = start - pd.Timedelta(days=int(warmup * 7 / 5) + 15)
+
+        with self._lock(symbol):
+            history = self._ensure(symbol, fetch, fetch_start, end)
+        return slice_range(history, start, end, warmup)
+
+    def get_history(
+        self,
+        symbol: str,
+        fetch: Callable[..., pd.DataFrame],
+        period: str = "1y",
+    ) -> pd.DataFrame:
+        """
+        Returns the last `period` of history for a symbol, topping up the store first
+
+        Parameters:
+            symbol (str): Ticker symbol
+            fetch (Callable): Upstream fetcher accepting yfinance `history` keywords
+            period (str): Window to return, one of PERIOD_OFFSETS
+
+        Returns:
+            pd.DataFrame: OHLCV history indexed by timestamp
+        """
+        offset = PERIOD_OFFSETS.get(period)
+        start = None if offset is None else pd.Timestamp.now().normalize() - offset
+        return self.get_range(symbol, fetch, start=start)
+
+
+def _has_corporate_action(df: pd.DataFrame) -> bool:
+    """True when a fetched slice contains a split or dividend"""
+    for column in ("Stock Splits", "Dividends"):
+        if column in df.columns and (df[column].fillna(0) != 0).any():
+            return True
+    return False
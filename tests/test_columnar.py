@@ -0,0 +1,28 @@
+from terminal.columnar import BufferPool
+from terminal.indicators import IndicatorEngine
+from terminal.providers import synthetic_history
+
+
+def test_engine_state_counts_against_the_budget():
+    history = synthetic_history(2520)
+    pool = BufferPool(budget_mb=1)
+    engine = pool.get_or_create(("AAPL", "indicator state"), IndicatorEngine)
+    assert pool.get_or_create(("AAPL", "indicator state"), IndicatorEngine) is engine
+    assert pool.resident_bytes() == 0
+
+    engine.update(history)
+    pool.resize(("AAPL", "indicator state"))
+    assert pool.resident_bytes() == engine.nbytes > 11 * 8 * len(history)
+    assert pool.report().loc["AAPL", "bars"] == len(history)
+
+
+def test_growing_engine_evicts_frames_over_the_budget():
+    history = synthetic_history(2520)
+    pool = BufferPool(budget_mb=0.3)
+    pool.put(("MSFT", "history"), history)
+    engine = pool.get_or_create(("AAPL", "indicator state"), IndicatorEngine)
+    engine.update(history)
+    pool.resize(("AAPL", "indicator state"))
+    assert pool.get(("MSFT", "history")) is None
+    assert pool.resident_bytes() == engine.nbytes
+    assert pool.stats()["evictions"] == 1
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from terminal.downsample import downsample_lines, lttb_indices, minmax_indices, ohlc_buckets
+from terminal.indicators import IndicatorEngine
+from terminal.providers import synthetic_history
+
+BUDGETS = [1, 2, 3, 50, 1500]
+
+
+@pytest.fixture(scope="module")
+def history():
+    return IndicatorEngine().update(synthetic_history(2520, seed=3))
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+def test_ohlc_buckets_keep_the_extremes_and_ends(history, budget):
+    candles = ohlc_buckets(history, budget)
+    assert len(candles) <= budget
+    assert candles['High'].max() == history['High'].max()
+    assert candles['Low'].min() == history['Low'].min()
+    assert candles['Open'].iloc[0] == history['Open'].iloc[0]
+    assert candles['Close'].iloc[-1] == history['Close'].iloc[-1]
+    assert candles['Volume'].sum() == pytest.approx(history['Volume'].sum())
+
+
+def test_ohlc_buckets_return_short_histories_as_is(history):
+    short = history.iloc[:40]
+    assert ohlc_buckets(short, 50) is short
+
+
+def test_ohlc_buckets_with_a_nan_column(history):
+    df = history[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+    df['High'] = np.nan
+    candles = ohlc_buckets(df, 50)
+    assert len(candles) <= 50
+    assert candles['High'].isna().all()
+    assert candles['Low'].min() == df['Low'].min()
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+def test_minmax_keeps_every_extreme(history, budget):
+    values = history['Close'].to_numpy()
+    rows = minmax_indices(values, budget)
+    assert len(rows) <= budget
+    if budget >= 4:
+        assert values[rows].max() == values.max() and values[rows].min() == values.min()
+    if budget >= 2:
+        assert rows[0] == 0 and rows[-1] == len(values) - 1
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+def test_lttb_keeps_the_ends(history, budget):
+    values = history['Close'].to_numpy()
+    rows = lttb_indices(values, budget)
+    assert len(rows) <= budget
+    assert np.all(np.diff(rows) > 0)
+    assert rows[0] == 0
+    if budget >= 2:
+        assert rows[-1] == len(values) - 1
+
+
+@pytest.mark.parametrize("pick", [lttb_indices, minmax_indices])
+def test_fewer_rows_than_the_budget_are_all_kept(pick):
+    values = np.arange(10.0)
+    assert list(pick(values, 50)) == list(range(10))
+
+
+def test_lttb_skips_nan_rows(history):
+    # SMA_200 is NaN over its first 199 rows
+    values = history['SMA_200'].to_numpy()
+    rows = lttb_indices(values, 50)
+    assert len(rows) == 50
+    assert not np.isnan(values[rows]).any()
+    assert rows[0] == 199 and rows[-1] == len(values) - 1
+    assert len(lttb_indices(np.full(100, np.nan), 10)) == 0
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("budget", BUDGETS)
+def test_lines_stay_within_budget(history, method, budget):
+    columns = ['Close', 'SMA_20', 'SMA_200']
+    frame = history[columns].copy()
+    frame['Empty'] = np.nan
+    lines = downsample_lines(frame, budget, method)
+    assert len(lines) <= budget
+    assert lines.index.is_monotonic_increasing
+    if method == "minmax" and budget >= 4 * len(frame.columns):
+        for column in columns:
+            assert lines[column].max() == frame[column].max()
+            assert lines[column].min() == frame[column].min()
+
+
+def test_lines_reject_an_unknown_method(history):
+    with pytest.raises(ValueError):
+        downsample_lines(history[['Close']], 50, "every_nth")
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("ta")
+
+from benchmarks.bench_indicators import ta_indicators
+from terminal.indicators import INDICATOR_COLUMNS, IndicatorEngine
+from terminal.providers import synthetic_history
+
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope="module")
+def history() -> pd.DataFrame:
+    return synthetic_history(1000)
+
+
+@pytest.fixture(scope="module")
+def expected(history) -> pd.DataFrame:
+    return ta_indicators(history)
+
+
+def assert_parity(result: pd.DataFrame, expected: pd.DataFrame):
+    """Same NaN pattern as ta and a relative error within TOLERANCE in every column"""
+    for col in INDICATOR_COLUMNS:
+        got = result[col].to_numpy(dtype=float)
+        want = expected[col].to_numpy(dtype=float)
+        np.testing.assert_array_equal(np.isnan(got), np.isnan(want), err_msg=col)
+        valid = ~np.isnan(want)
+        error = np.abs(got[valid] - want[valid]) / np.maximum(1.0, np.abs(want[valid]))
+        assert error.max(initial=0.0) <= TOLERANCE, f"{col}: {error.max():.2e}"
+
+
+def test_full_pass_matches_ta(history, expected):
+    assert_parity(IndicatorEngine().update(history), expected)
+
+
+@pytest.mark.parametrize("step", [1, 7, 250])
+def test_incremental_updates_match_ta(history, expected, step):
+    engine = IndicatorEngine()
+    for end in range(2, len(history) + 1, step):
+        engine.update(history.iloc[:end])
+    assert_parity(engine.update(history), expected)
+
+
+def test_short_history_matches_ta():
+    history = synthetic_history(30)
+    assert_parity(IndicatorEngine().update(history), ta_indicators(history))
@@ -0,0 +1,14 @@
+import time
+
+from terminal.cache import SharedCache
+from terminal.jobs import JobExecutor
+
+
+def test_shutdown_waits_for_the_workers():
+    executor = JobExecutor(SharedCache(), max_workers=2)
+    job = executor.submit("sleep", time.sleep, [(0.2,)] * 4)
+    job.futures[0].result()
+    workers = list(executor._pool._processes.values())
+    executor.shutdown()
+    assert workers and not any(process.is_alive() for process in workers)
+    assert job.done()
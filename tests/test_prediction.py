@@ -0,0 +1,27 @@
+import os
+
+from terminal.prediction import ModelCache
+
+
+def test_new_data_version_overwrites_the_stored_models(tmp_path):
+    models = ModelCache(str(tmp_path))
+    key = ("AAPL", "prediction", "ridge", 5, "2025-01-01:2026-01-01")
+    models.put(key, {"refits": 1}, version=key + (250,))
+    models.put(key, {"refits": 2}, version=key + (251,))
+    assert os.listdir(tmp_path) == [os.path.basename(models.path(key))]
+    assert models.get(key, version=key + (250,)) is None
+    assert models.get(key, version=key + (251,)) == {"refits": 2}
+
+
+def test_get_or_build_rebuilds_for_a_new_version(tmp_path):
+    models = ModelCache(str(tmp_path))
+    builds = []
+
+    def build():
+        builds.append(1)
+        return len(builds)
+
+    assert models.get_or_build("AAPL", build, version=1) == 1
+    assert models.get_or_build("AAPL", build, version=1) == 1
+    assert models.get_or_build("AAPL", build, version=2) == 2
+    assert len(builds) == 2 and len(os.listdir(tmp_path)) == 1
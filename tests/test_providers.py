@@ -0,0 +1,21 @@
+import pytest
+
+from terminal.providers import MarketDataProvider, ReplayProvider, write_synthetic_recording
+
+
+def test_incomplete_provider_fails_on_construction():
+    class QuotesOnly(MarketDataProvider):
+        def quote(self, symbol):
+            return {}
+
+    with pytest.raises(TypeError, match="abstract"):
+        QuotesOnly()
+
+
+def test_replay_serves_a_recording(tmp_path):
+    write_synthetic_recording(str(tmp_path), ["AAPL"], years=1)
+    provider = ReplayProvider(str(tmp_path))
+    assert not provider.history("AAPL", period="1y").empty
+    assert provider.quote("AAPL")["symbol"] == "AAPL"
+    assert provider.info("AAPL")["longName"]
+    assert provider.income_stmt("AAPL") is not None
@@ -0,0 +1,33 @@
+import time
+
+from terminal.quotes import MAX_WORKERS, fetch_quotes, make_quote
+
+
+def sleeping_quote(delays):
+    def fetch_quote(symbol):
+        time.sleep(delays.get(symbol, 0))
+        return make_quote(symbol, 100.0, 99.0)
+    return fetch_quote
+
+
+def test_queued_requests_get_their_own_deadline():
+    # Three waves of requests on the shared pool, each well within its deadline
+    symbols = [f"Q{i}" for i in range(3 * MAX_WORKERS)]
+    quotes = fetch_quotes(symbols, sleeping_quote({s: 0.2 for s in symbols}), timeout=0.5, queue_timeout=2.0)
+    assert set(quotes) == set(symbols)
+
+
+def test_slow_request_is_dropped_after_its_timeout():
+    started = time.monotonic()
+    quotes = fetch_quotes(["FAST", "SLOW"], sleeping_quote({"SLOW": 2.0}), timeout=0.3)
+    assert set(quotes) == {"FAST"}
+    assert time.monotonic() - started < 1.0
+
+
+def test_requests_that_never_start_are_cancelled():
+    blockers = [f"B{i}" for i in range(MAX_WORKERS)]
+    started = time.monotonic()
+    quotes = fetch_quotes(blockers + ["QUEUED"], sleeping_quote({s: 1.0 for s in blockers}),
+                          timeout=5.0, queue_timeout=0.2)
+    assert "QUEUED" not in quotes
+    assert time.monotonic() - started < 5.0
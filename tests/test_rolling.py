@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from terminal.rolling import ewm, window_total
+
+
+def test_ewm_matches_pandas_with_leading_nans():
+    values = np.random.default_rng(0).normal(size=(300, 3)).cumsum(axis=0)
+    values[:40, 1] = np.nan
+    alphas = np.array([0.1, 2 / 13, 1 / 14])
+    expected = np.column_stack([
+        pd.Series(values[:, i]).ewm(alpha=a, adjust=False).mean().bfill().to_numpy()
+        for i, a in enumerate(alphas)
+    ])
+    np.testing.assert_allclose(ewm(values, alphas), expected, rtol=1e-12)
+
+
+def test_window_total_matches_a_rolling_sum():
+    values = np.random.default_rng(1).normal(size=(100, 2))
+    totals = window_total(np.cumsum(values, axis=0), 20)
+    expected = pd.DataFrame(values).rolling(20).sum().to_numpy()
+    np.testing.assert_allclose(totals, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+    assert np.isnan(window_total(np.cumsum(values[:5], axis=0), 20)).all()
@@ -0,0 +1,49 @@
+import time
+
+from terminal.cache import SharedCache
+from terminal.scheduler import RefreshScheduler
+
+
+def wait_for(condition, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_interval_longer_than_the_lease_is_still_refreshed():
+    calls = []
+    scheduler = RefreshScheduler(SharedCache(), lease=0.1)
+    try:
+        scheduler.watch("AAPL", lambda: calls.append(1) or len(calls), interval=0.3, viewer="s1")
+        # Never renewed: the watch lives for two intervals, so it is refreshed once
+        assert wait_for(lambda: scheduler.stats()["refreshes"] == 1)
+        assert wait_for(lambda: scheduler.stats()["watched"] == 0)
+        assert len(calls) == 1
+    finally:
+        scheduler.stop()
+
+
+def test_unrenewed_watch_is_dropped_after_its_lease():
+    scheduler = RefreshScheduler(SharedCache(), lease=0.2)
+    try:
+        scheduler.watch("AAPL", lambda: 1, interval=0.05, viewer="s1")
+        assert wait_for(lambda: scheduler.stats()["refreshes"] >= 1)
+        assert wait_for(lambda: scheduler.stats()["watched"] == 0)
+    finally:
+        scheduler.stop()
+
+
+def test_renewed_watch_outlives_its_lease():
+    scheduler = RefreshScheduler(SharedCache(), lease=0.2)
+    try:
+        scheduler.watch("AAPL", lambda: 1, interval=0.05, viewer="s1")
+        for _ in range(6):
+            time.sleep(0.1)
+            scheduler.renew("s1")
+        assert scheduler.stats()["watched"] == 1
+        assert scheduler.stats()["refreshes"] >= 5
+    finally:
+        scheduler.stop()
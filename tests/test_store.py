@@ -0,0 +1,61 @@
+import time
+
+import pandas as pd
+
+from terminal.calendars import calendar_for
+from terminal.providers import synthetic_history
+from terminal.store import DELTA_TTL, HistoryStore
+
+
+class CountingFetch:
+    """yfinance style history fetcher over a fixed frame, counting its calls"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.calls = []
+
+    def __call__(self, period=None, start=None, end=None, **kwargs):
+        self.calls.append({"period": period, "start": start, "end": end})
+        df = self.df
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start).tz_localize(df.index.tz)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end).tz_localize(df.index.tz)]
+        return df
+
+
+def test_repeated_loads_skip_the_delta_fetch(tmp_path):
+    fetch = CountingFetch(synthetic_history(300))
+    store = HistoryStore(str(tmp_path))
+    store.get_history("AAPL", fetch, period="1y")
+    store.get_history("AAPL", fetch, period="1y")
+    store.get_range("AAPL", fetch, start=pd.Timestamp.now() - pd.Timedelta(days=200))
+    assert len(fetch.calls) == 1
+
+
+def test_delta_fetch_once_a_session_has_started(tmp_path):
+    fetch = CountingFetch(synthetic_history(300))
+    store = HistoryStore(str(tmp_path))
+    store.get_history("AAPL", fetch, period="1y")
+    checked = store._checked["AAPL"]
+    opens = calendar_for("AAPL").next_open(checked)
+
+    # Reloaded by a new process, the fetch time comes from the stored metadata
+    store = HistoryStore(str(tmp_path))
+    assert store.is_current("AAPL", checked + DELTA_TTL / 2)
+    assert not store.is_current("AAPL", max(opens, checked + DELTA_TTL) + 1)
+
+    store._checked["AAPL"] = time.time() - 30 * 86400
+    store.get_history("AAPL", fetch, period="1y")
+    assert len(fetch.calls) == 2 and fetch.calls[-1]["start"] is not None
+
+
+def test_in_memory_histories_are_bounded(tmp_path):
+    fetch = CountingFetch(synthetic_history(300))
+    store = HistoryStore(str(tmp_path), max_frames=2)
+    for symbol in ("AAPL", "MSFT", "AAPL", "GOOGL"):
+        store.get_history(symbol, fetch, period="1y")
+    assert list(store._frames) == ["AAPL", "GOOGL"]
+    # Dropped histories are read back from disk without an upstream call
+    assert not store.load("MSFT").empty
+    assert len(fetch.calls) == 3